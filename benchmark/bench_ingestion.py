@@ -0,0 +1,349 @@
+"""
+入库基准测试
+
+使用离线的 ``FakeProApi`` 代替 Tushare，对独立的本地 MySQL 基准库执行同步和补全函数，
+报告每个用例的写入行数、每秒行数、接口调用次数、耗时和内存峰值，并与保存的基线比较。
+
+每个用例在单独的子进程中运行，内存峰值互不影响；运行前清空用例涉及的数据表及其水位和补全进度。
+股票列表和交易日历在开始时写入一次，供所有用例使用。
+
+用法（在仓库根目录执行）：
+
+    PYTHONPATH=src:. python -m benchmark.bench_ingestion --scale small
+    PYTHONPATH=src:. python -m benchmark.bench_ingestion --scale full --case backfill_daily_data
+    PYTHONPATH=src:. python -m benchmark.bench_ingestion --scale small --update-baseline
+
+基准库名称默认为 ``fin_data_hub_bench``，不会写入业务库。
+合成数据从 ``--end-date``（默认今天）往前推算，固定该日期可以得到可复现的调用次数和行数。
+"""
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+from sqlalchemy import create_engine, text
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare.constants import (
+    ADJ_FACTOR_TABLE,
+    BACKFILL_PROGRESS_TABLE,
+    BACKFILL_RUN_TABLE,
+    BALANCESHEET_TABLE,
+    CASHFLOW_TABLE,
+    DAILY_BASIC_TABLE,
+    DAILY_HFQ_TABLE,
+    DAILY_QFQ_TABLE,
+    DAILY_TABLE,
+    HSGT_TOP10_TABLE,
+    INCOME_TABLE,
+    MONTHLY_TABLE,
+    STOCK_BASIC_TABLE,
+    STOCK_ST_TABLE,
+    TRADE_CALENDAR_TABLE,
+    WATERMARK_TABLE,
+    WEEKLY_TABLE,
+)
+from fin_data_hub.foundation.utils.date_utils import add_days
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+
+
+class Scale(NamedTuple):
+    stocks: int
+    years: int
+
+
+SCALES = {
+    'small': Scale(stocks=100, years=3),
+    'medium': Scale(stocks=1000, years=10),
+    # 接近真实规模：约 5500 只股票、30 年历史
+    'full': Scale(stocks=5500, years=30),
+}
+
+
+# 按缺口补全的用例使用截止日期前 13 周（91 天）的区间，交易日数不随截止日期是星期几变化
+_GAP_DAYS = 91
+
+
+class Case(NamedTuple):
+    """基准用例"""
+    target: str
+    tables: tuple[str, ...]
+    # 按数据截止日期生成调用参数
+    kwargs: Callable[[str], dict[str, Any]] | None = None
+    # 计时前准备依赖的数据，参数为数据截止日期
+    prepare: Callable[[str], None] | None = None
+
+
+def _gap_range(end_date: str) -> dict[str, Any]:
+    return {'start_date': add_days(end_date, 1 - _GAP_DAYS), 'end_date': end_date}
+
+
+def _prepare_adjusted(end_date: str):
+    """按缺口补全日线和复权因子，供生成复权日线"""
+    from script.script_tushare_backfill import backfill_gaps
+    _clear_tables((DAILY_TABLE, ADJ_FACTOR_TABLE))
+    backfill_gaps('daily', **_gap_range(end_date))
+    backfill_gaps('adj_factor', **_gap_range(end_date))
+
+
+CASES: dict[str, Case] = {
+    # 日线表为空时按股票全量拉取
+    'sync_daily_data': Case('fin_data_hub.data.tushare.tushare_data:sync_daily_data', (DAILY_TABLE,)),
+    'sync_stock_st_data': Case('fin_data_hub.data.tushare.tushare_data:sync_stock_st_data', (STOCK_ST_TABLE,)),
+    'backfill_stock_basic_data': Case('script.script_tushare_backfill:backfill_stock_basic_data', (STOCK_BASIC_TABLE,)),
+    'backfill_trade_calendar_data': Case(
+        'script.script_tushare_backfill:backfill_trade_calendar_data', (TRADE_CALENDAR_TABLE,)
+    ),
+    'backfill_stock_st_data': Case('script.script_tushare_backfill:backfill_stock_st_data', (STOCK_ST_TABLE,)),
+    'backfill_daily_data': Case('script.script_tushare_backfill:backfill_daily_data', (DAILY_TABLE,)),
+    'backfill_daily_basic_data': Case('script.script_tushare_backfill:backfill_daily_basic_data', (DAILY_BASIC_TABLE,)),
+    'backfill_weekly_data': Case('script.script_tushare_backfill:backfill_weekly_data', (WEEKLY_TABLE,)),
+    'backfill_monthly_data': Case('script.script_tushare_backfill:backfill_monthly_data', (MONTHLY_TABLE,)),
+    'backfill_hsgt_top10_data': Case('script.script_tushare_backfill:backfill_hsgt_top10_data', (HSGT_TOP10_TABLE,)),
+    'backfill_adjusted_daily_data': Case(
+        'script.script_tushare_backfill:backfill_adjusted_daily_data', (DAILY_QFQ_TABLE, DAILY_HFQ_TABLE),
+        prepare=_prepare_adjusted,
+    ),
+    'backfill_gaps': Case(
+        'script.script_tushare_backfill:backfill_gaps', (DAILY_TABLE,),
+        kwargs=lambda end_date: {'dataset': 'daily', **_gap_range(end_date)},
+    ),
+    'backfill_income_data': Case('script.script_tushare_backfill_fin:backfill_income_data', (INCOME_TABLE,)),
+    'backfill_income_data_1': Case('script.script_tushare_backfill_fin:backfill_income_data_1', (INCOME_TABLE,)),
+    'backfill_balancesheet_data': Case(
+        'script.script_tushare_backfill_fin:backfill_balancesheet_data', (BALANCESHEET_TABLE,)
+    ),
+    'backfill_balancesheet_data_1': Case(
+        'script.script_tushare_backfill_fin:backfill_balancesheet_data_1', (BALANCESHEET_TABLE,)
+    ),
+    'backfill_cashflow_data': Case('script.script_tushare_backfill_fin:backfill_cashflow_data', (CASHFLOW_TABLE,)),
+}
+
+# 其他用例依赖的维表，开始时写入一次，不清空
+_FIXTURE_TABLES = (STOCK_BASIC_TABLE, TRADE_CALENDAR_TABLE)
+
+
+def main():
+    """命令行入口点"""
+    parser = argparse.ArgumentParser(description="入库基准测试")
+    parser.add_argument("--scale", choices=sorted(SCALES), default='small', help="数据规模")
+    parser.add_argument("--case", action='append', choices=sorted(CASES), help="只运行指定用例，可重复")
+    parser.add_argument("--database", default='fin_data_hub_bench', help="基准库名称，每次运行前重建")
+    parser.add_argument("--end-date", default=time.strftime('%Y%m%d'), help="合成数据截止日期，格式 YYYYMMDD")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟的单次接口调用延迟（秒）")
+    parser.add_argument("--fake-calls-per-minute", type=int, help="模拟的接口每分钟调用上限，超过时返回限流错误")
+    parser.add_argument("--client-calls-per-minute", type=int, default=1_000_000, help="客户端令牌桶的每分钟调用上限")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="基线文件")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果更新基线")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="判定退化的相对阈值")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+    options = {
+        'scale': args.scale,
+        'database': args.database,
+        'latency': args.latency,
+        'fake_calls_per_minute': args.fake_calls_per_minute,
+        'client_calls_per_minute': args.client_calls_per_minute,
+        'snapshot_dir': tempfile.mkdtemp(prefix='fin_data_hub_bench_'),
+        'end_date': args.end_date,
+    }
+    _recreate_database(args.database)
+    _run_in_subprocess(_prepare_fixtures, options)
+
+    results = {}
+    for name in args.case or list(CASES):
+        logger.info(f"[基准测试] 运行 {name}（{args.scale}）")
+        results[name] = _run_in_subprocess(_run_case, options, name)
+
+    baseline = _load_baseline(args.baseline).get(args.scale, {})
+    regressions = report(results, baseline, args.tolerance)
+    if args.update_baseline:
+        _save_baseline(args.baseline, args.scale, results)
+    sys.exit(1 if regressions and not args.update_baseline else 0)
+
+
+def report(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """
+    打印结果并与基线比较
+
+    以下情况视为退化：每秒行数下降超过阈值、内存峰值增加超过阈值、接口调用次数增加（合成数据确定，调用次数应完全一致）
+
+    Returns:
+        退化说明列表
+    """
+    regressions = []
+    header = f"{'用例':<32}{'行数':>12}{'行/秒':>12}{'调用次数':>10}{'耗时(秒)':>10}{'内存峰值(MB)':>14}"
+    print(header)
+    for name, result in results.items():
+        print(
+            f"{name:<32}{result['rows']:>12}{result['rows_per_second']:>12.0f}{result['api_calls']:>10}"
+            f"{result['wall_seconds']:>10.1f}{result['peak_rss_mb']:>14.1f}"
+        )
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['rows_per_second'] < base['rows_per_second'] * (1 - tolerance):
+            regressions.append(f"{name} 每秒行数 {result['rows_per_second']:.0f} 低于基线 {base['rows_per_second']:.0f}")
+        if result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{name} 内存峰值 {result['peak_rss_mb']:.1f} MB 高于基线 {base['peak_rss_mb']:.1f} MB")
+        if result['api_calls'] > base['api_calls']:
+            regressions.append(f"{name} 接口调用 {result['api_calls']} 次，多于基线 {base['api_calls']} 次")
+    for regression in regressions:
+        print(f"[退化] {regression}")
+    return regressions
+
+
+def _run_in_subprocess(func, *args) -> Any:
+    """在新的子进程中执行，返回其结果"""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def _setup_process(options: dict):
+    """子进程初始化：指向基准库，安装离线客户端"""
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+    config.mysql_database = options['database']
+    config.cache_snapshot_dir = options['snapshot_dir']
+    config.parquet_export_enabled = False
+    config.tushare_calls_per_minute = options['client_calls_per_minute']
+    config.tushare_default_endpoint_calls_per_minute = options['client_calls_per_minute']
+    config.tushare_endpoint_calls_per_minute = {}
+
+    from benchmark.fake_tushare import FakeProApi
+    from fin_data_hub.data.tushare import tushare_data
+    from fin_data_hub.data.tushare.tushare_client import RateLimitedClient
+
+    scale = SCALES[options['scale']]
+    fake = FakeProApi(
+        stocks=scale.stocks,
+        years=scale.years,
+        end_date=options['end_date'],
+        latency=options['latency'],
+        calls_per_minute=options['fake_calls_per_minute'],
+    )
+    tushare_data._tushare_client = RateLimitedClient(fake)
+    return fake
+
+
+def _prepare_fixtures(options: dict):
+    """写入股票列表和交易日历"""
+    _setup_process(options)
+    from fin_data_hub.data.tushare.tushare_schema import ensure_schemas
+    from script.script_tushare_backfill import backfill_stock_basic_data, backfill_trade_calendar_data
+    ensure_schemas()
+    backfill_stock_basic_data()
+    backfill_trade_calendar_data()
+
+
+def _run_case(options: dict, name: str) -> dict:
+    """在子进程中运行一个用例"""
+    fake = _setup_process(options)
+    case = CASES[name]
+    if case.prepare is not None:
+        case.prepare(options['end_date'])
+    _clear_tables(case.tables)
+
+    module_name, func_name = case.target.split(':')
+    func = getattr(importlib.import_module(module_name), func_name)
+    kwargs = case.kwargs(options['end_date']) if case.kwargs is not None else {}
+    # 准备数据的调用不计入
+    calls_before = fake.total_calls
+
+    start = time.perf_counter()
+    func(**kwargs)
+    wall_seconds = time.perf_counter() - start
+
+    rows = _count_rows(case.tables)
+    return {
+        'rows': rows,
+        'rows_per_second': rows / wall_seconds if wall_seconds > 0 else 0.0,
+        'api_calls': fake.total_calls - calls_before,
+        'rejected_calls': sum(fake.rejected.values()),
+        'wall_seconds': wall_seconds,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _recreate_database(database: str):
+    """重建基准库"""
+    if database == 'fin_data_hub':
+        raise SystemExit("基准测试不能使用业务库 fin_data_hub")
+    server_url = config.mysql_url.replace(f"/{config.mysql_database}?", "/?")
+    engine = create_engine(server_url)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP DATABASE IF EXISTS `{database}`"))
+        conn.execute(text(f"CREATE DATABASE `{database}` DEFAULT CHARSET utf8mb4"))
+    engine.dispose()
+
+
+def _clear_tables(tables: tuple[str, ...]):
+    """清空用例涉及的数据表、水位和补全进度"""
+    from fin_data_hub.data.tushare.tushare_backfill_progress import ensure_progress_tables
+    from fin_data_hub.data.tushare.tushare_watermark import ensure_watermark_table
+    from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine, table_exists
+
+    ensure_watermark_table()
+    ensure_progress_tables()
+    with mysql_engine().begin() as conn:
+        for table in tables:
+            if table in _FIXTURE_TABLES:
+                conn.execute(text(f"DELETE FROM {table}"))
+            elif table_exists(table):
+                conn.execute(text(f"TRUNCATE TABLE {table}"))
+            conn.execute(
+                text(f"DELETE FROM {WATERMARK_TABLE} WHERE dataset IN (:dataset, :parquet)"),
+                {'dataset': table, 'parquet': f'{table}@parquet'},
+            )
+        conn.execute(text(f"DELETE FROM {BACKFILL_PROGRESS_TABLE}"))
+        conn.execute(text(f"DELETE FROM {BACKFILL_RUN_TABLE}"))
+
+
+def _count_rows(tables: tuple[str, ...]) -> int:
+    from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
+    with mysql_engine().connect() as conn:
+        return sum(conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() or 0 for table in tables)
+
+
+def _peak_rss_mb() -> float:
+    """当前进程的内存峰值，Linux 上 ru_maxrss 单位为 KB，macOS 上为字节"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _load_baseline(path: Path) -> dict:
+    if not path.exists():
+        logger.info(f"[基准测试] 基线文件 {path} 不存在，跳过比较")
+        return {}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def _save_baseline(path: Path, scale: str, results: dict[str, dict]):
+    baseline = _load_baseline(path)
+    baseline.setdefault(scale, {}).update(results)
+    path.write_text(json.dumps(baseline, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    logger.info(f"[基准测试] 已更新基线 {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+离线 Tushare 客户端
+
+模拟 ``ts.pro_api()`` 返回的客户端，按确定性的规则生成合成数据，用于在没有网络和配额的情况下测量入库吞吐：
+- 同样的参数总是返回同样的数据，与调用顺序和调用区间无关
+- 行情按 (股票, 交易日) 计算，截面请求和按股票区间请求得到的数据一致
+- 可配置每次调用的延迟和每个接口的每分钟调用上限，超过上限时抛出与 Tushare 相同文案的限流错误
+
+列结构取自 ``tushare_schema.SCHEMAS``，日期以 'YYYYMMDD' 字符串、数值以 float64 返回，与真实接口一致。
+"""
+import datetime
+import threading
+import time
+from collections import Counter, deque
+
+import numpy as np
+import pandas as pd
+
+from fin_data_hub.data.tushare.constants import (
+    ADJ_FACTOR_TABLE,
+    BALANCESHEET_TABLE,
+    CASHFLOW_TABLE,
+    DAILY_BASIC_TABLE,
+    DAILY_TABLE,
+    HSGT_TOP10_TABLE,
+    INCOME_TABLE,
+    MONTHLY_TABLE,
+    STOCK_BASIC_FIELDS,
+    WEEKLY_TABLE,
+)
+from fin_data_hub.data.tushare.tushare_schema import SCHEMAS
+from fin_data_hub.foundation.utils.date_utils import get_all_quarter_end
+
+# ST 数据、沪深股通数据的起始日期
+_ST_START_DATE = 20160101
+_HSGT_START_DATE = 20141117
+
+_AREAS = ['深圳', '上海', '北京', '浙江', '江苏', '广东']
+_INDUSTRIES = ['银行', '证券', '软件服务', '元器件', '化学制药', '汽车配件', '电气设备', '食品']
+_MARKETS = ['主板', '创业板', '科创板']
+
+
+class FakeProApi:
+    """合成数据的 Tushare 客户端"""
+
+    def __init__(
+        self,
+        stocks: int = 5500,
+        years: int = 30,
+        end_date: str | None = None,
+        latency: float = 0.0,
+        calls_per_minute: int | None = None,
+    ):
+        """
+        Args:
+            stocks: 股票数量
+            years: 历史年数，交易日历从 end_date 往前推算
+            end_date: 数据截止日期，默认今天
+            latency: 每次调用的延迟（秒）
+            calls_per_minute: 每个接口的每分钟调用上限，为 None 时不限流
+        """
+        end = datetime.datetime.strptime(end_date, '%Y%m%d').date() if end_date else datetime.date.today()
+        start = end.replace(year=end.year - years)
+        days = pd.date_range(start, end, freq='D')
+        self.calendar = np.asarray(days.strftime('%Y%m%d'), dtype=np.int64)
+        # 周一至周五为交易日
+        self.is_open = np.asarray(days.dayofweek < 5)
+        self.trade_days = self.calendar[self.is_open]
+        self._trade_day_set = set(self.trade_days.tolist())
+        # 每周、每月最后一个交易日
+        periods = pd.Series(days[self.is_open])
+        self.period_ends = {
+            freq: self.trade_days[(periods.dt.to_period(freq) != periods.dt.to_period(freq).shift(-1)).to_numpy()]
+            for freq in ('W', 'M')
+        }
+
+        self.latency = latency
+        self.calls_per_minute = calls_per_minute
+        self.calls: Counter[str] = Counter()
+        self.rejected: Counter[str] = Counter()
+        self._call_times: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+        index = np.arange(stocks)
+        self.codes = np.array([_ts_code(i) for i in index])
+        # 约五分之一在区间开始时已上市，其余在区间内陆续上市，每 25 只中有 1 只退市
+        n_days = len(self.trade_days)
+        list_positions = np.where(index % 5 == 0, 0, (index * 7919) % max(int(n_days * 0.9), 1))
+        self.list_dates = self.trade_days[list_positions]
+        delist_positions = np.minimum(list_positions + n_days // 3, n_days - 1)
+        self.delist_dates = np.where(index % 25 == 24, self.trade_days[delist_positions], 0)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    # ------------------------------------------------------------------
+    # 接口
+    # ------------------------------------------------------------------
+
+    def query(self, api_name: str, fields: str = '', **kwargs) -> pd.DataFrame:
+        return getattr(self, api_name)(**kwargs)
+
+    def stock_basic(self, exchange: str = '', list_status: str = 'L', fields: str = STOCK_BASIC_FIELDS, **kwargs) -> pd.DataFrame:
+        self._call('stock_basic')
+        delisted = self.delist_dates > 0
+        mask = delisted if list_status == 'D' else ~delisted
+        index = np.flatnonzero(mask)
+        df = pd.DataFrame({
+            'ts_code': self.codes[index],
+            'symbol': [code[:6] for code in self.codes[index]],
+            'name': [f'股票{i}' for i in index],
+            'area': [_AREAS[i % len(_AREAS)] for i in index],
+            'industry': [_INDUSTRIES[i % len(_INDUSTRIES)] for i in index],
+            'cnspell': [f'gp{i}' for i in index],
+            'market': [_MARKETS[i % len(_MARKETS)] for i in index],
+            'list_date': self.list_dates[index].astype(str),
+            'delist_date': [str(d) if d else None for d in self.delist_dates[index]],
+            'act_name': None,
+            'act_ent_type': None,
+        })
+        return df[[c for c in fields.split(',') if c in df.columns]]
+
+    def trade_cal(self, exchange: str = '', start_date: str | None = None, end_date: str | None = None, **kwargs) -> pd.DataFrame:
+        self._call('trade_cal')
+        mask = self._date_mask(self.calendar, start_date, end_date)
+        open_positions = np.cumsum(self.is_open) - 1
+        pretrade = np.where(open_positions > 0, self.trade_days[np.maximum(open_positions - 1, 0)], 0)
+        df = pd.DataFrame({
+            'exchange': 'SSE',
+            'cal_date': self.calendar[mask].astype(str),
+            'is_open': self.is_open[mask].astype(int),
+            'pretrade_date': pretrade[mask].astype(str),
+        })
+        # 与真实接口一致，按日期倒序返回
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def daily(self, ts_code: str | None = None, trade_date: str | None = None,
+              start_date: str | None = None, end_date: str | None = None, **kwargs) -> pd.DataFrame:
+        self._call('daily')
+        return self._bars(DAILY_TABLE, ts_code, trade_date, start_date, end_date)
+
+    def daily_basic(self, ts_code: str | None = None, trade_date: str | None = None,
+                    start_date: str | None = None, end_date: str | None = None, **kwargs) -> pd.DataFrame:
+        self._call('daily_basic')
+        return self._bars(DAILY_BASIC_TABLE, ts_code, trade_date, start_date, end_date)
+
+    def adj_factor(self, ts_code: str | None = None, trade_date: str | None = None,
+                   start_date: str | None = None, end_date: str | None = None, **kwargs) -> pd.DataFrame:
+        self._call('adj_factor')
+        return self._bars(ADJ_FACTOR_TABLE, ts_code, trade_date, start_date, end_date)
+
+    def weekly(self, ts_code: str | None = None, trade_date: str | None = None,
+               start_date: str | None = None, end_date: str | None = None, **kwargs) -> pd.DataFrame:
+        self._call('weekly')
+        return self._period_bars(WEEKLY_TABLE, 'W', ts_code, trade_date, start_date, end_date)
+
+    def monthly(self, ts_code: str | None = None, trade_date: str | None = None,
+                start_date: str | None = None, end_date: str | None = None, **kwargs) -> pd.DataFrame:
+        self._call('monthly')
+        return self._period_bars(MONTHLY_TABLE, 'M', ts_code, trade_date, start_date, end_date)
+
+    def stock_st(self, trade_date: str | None = None, **kwargs) -> pd.DataFrame:
+        self._call('stock_st')
+        date = int(trade_date) if trade_date else int(self.trade_days[-1])
+        if date < _ST_START_DATE or date not in self._trade_day_set:
+            return _empty('ts_code name trade_date type type_name')
+        index = np.flatnonzero(self._listed(date) & (np.arange(len(self.codes)) % 40 == 3))
+        return pd.DataFrame({
+            'ts_code': self.codes[index],
+            'name': [f'ST股票{i}' for i in index],
+            'trade_date': str(date),
+            'type': 'ST',
+            'type_name': '风险警示',
+        })
+
+    def hsgt_top10(self, trade_date: str | None = None, market_type: str = '1', **kwargs) -> pd.DataFrame:
+        self._call('hsgt_top10')
+        date = int(trade_date) if trade_date else int(self.trade_days[-1])
+        if date < _HSGT_START_DATE or date not in self._trade_day_set:
+            return _empty(' '.join(SCHEMAS[HSGT_TOP10_TABLE].column_names))
+        suffix = '.SH' if market_type == '1' else '.SZ'
+        candidates = np.flatnonzero(self._listed(date) & np.char.endswith(self.codes, suffix))
+        if len(candidates) == 0:
+            return _empty(' '.join(SCHEMAS[HSGT_TOP10_TABLE].column_names))
+        offset = int(np.searchsorted(self.trade_days, date))
+        index = candidates[(offset + np.arange(min(10, len(candidates)))) % len(candidates)]
+        df = self._frame(HSGT_TOP10_TABLE, index, np.full(len(index), date))
+        df['rank'] = np.arange(1, len(index) + 1)
+        df['market_type'] = market_type
+        df['name'] = [f'股票{i}' for i in index]
+        return df
+
+    def income(self, ts_code: str | None = None, start_date: str | None = None, end_date: str | None = None,
+               period: str | None = None, **kwargs) -> pd.DataFrame:
+        self._call('income')
+        return self._statement(INCOME_TABLE, ts_code, start_date, end_date, period)
+
+    def income_vip(self, period: str | None = None, limit: int | None = None, offset: int = 0,
+                   **kwargs) -> pd.DataFrame:
+        self._call('income_vip')
+        return _page(self._statement(INCOME_TABLE, None, None, None, period), limit, offset)
+
+    def balancesheet(self, ts_code: str | None = None, start_date: str | None = None, end_date: str | None = None,
+                     period: str | None = None, **kwargs) -> pd.DataFrame:
+        self._call('balancesheet')
+        return self._statement(BALANCESHEET_TABLE, ts_code, start_date, end_date, period)
+
+    def balancesheet_vip(self, period: str | None = None, limit: int | None = None, offset: int = 0,
+                         **kwargs) -> pd.DataFrame:
+        self._call('balancesheet_vip')
+        return _page(self._statement(BALANCESHEET_TABLE, None, None, None, period), limit, offset)
+
+    def cashflow_vip(self, period: str | None = None, limit: int | None = None, offset: int = 0,
+                     **kwargs) -> pd.DataFrame:
+        self._call('cashflow_vip')
+        return _page(self._statement(CASHFLOW_TABLE, None, None, None, period), limit, offset)
+
+    # ------------------------------------------------------------------
+    # 数据生成
+    # ------------------------------------------------------------------
+
+    def _call(self, endpoint: str):
+        """计数、模拟延迟和限流"""
+        if self.calls_per_minute is not None:
+            now = time.monotonic()
+            with self._lock:
+                times = self._call_times.setdefault(endpoint, deque())
+                while times and now - times[0] >= 60:
+                    times.popleft()
+                if len(times) >= self.calls_per_minute:
+                    self.rejected[endpoint] += 1
+                    raise Exception(f'抱歉，您每分钟最多访问该接口{self.calls_per_minute}次')
+                times.append(now)
+        with self._lock:
+            self.calls[endpoint] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _listed(self, date: int) -> np.ndarray:
+        return (self.list_dates <= date) & ((self.delist_dates == 0) | (self.delist_dates > date))
+
+    def _code_index(self, ts_code: str) -> int | None:
+        position = np.flatnonzero(self.codes == ts_code)
+        return int(position[0]) if len(position) else None
+
+    @staticmethod
+    def _date_mask(dates: np.ndarray, start_date: str | None, end_date: str | None) -> np.ndarray:
+        mask = np.ones(len(dates), dtype=bool)
+        if start_date:
+            mask &= dates >= int(start_date)
+        if end_date:
+            mask &= dates <= int(end_date)
+        return mask
+
+    def _select(self, days: np.ndarray, ts_code: str | None, trade_date: str | None,
+                start_date: str | None, end_date: str | None) -> tuple[np.ndarray, np.ndarray]:
+        """请求覆盖的 (股票位置, 日期)，只包含上市期间的日期"""
+        if trade_date:
+            date = int(trade_date)
+            position = np.searchsorted(days, date)
+            if position >= len(days) or days[position] != date:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            index = np.flatnonzero(self._listed(date))
+            if ts_code:
+                index = index[self.codes[index] == ts_code]
+            return index, np.full(len(index), date)
+        position = self._code_index(ts_code) if ts_code else None
+        if position is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        dates = days[self._date_mask(days, start_date, end_date)]
+        dates = dates[dates >= self.list_dates[position]]
+        if self.delist_dates[position]:
+            dates = dates[dates < self.delist_dates[position]]
+        return np.full(len(dates), position), dates
+
+    def _bars(self, table: str, ts_code, trade_date, start_date, end_date) -> pd.DataFrame:
+        index, dates = self._select(self.trade_days, ts_code, trade_date, start_date, end_date)
+        # 按股票区间请求时与真实接口一致，按日期倒序返回
+        order = np.lexsort((-dates, index))
+        return self._frame(table, index[order], dates[order])
+
+    def _period_bars(self, table: str, freq: str, ts_code, trade_date, start_date, end_date) -> pd.DataFrame:
+        index, dates = self._select(self.period_ends[freq], ts_code, trade_date, start_date, end_date)
+        order = np.lexsort((-dates, index))
+        return self._frame(table, index[order], dates[order])
+
+    def _statement(self, table: str, ts_code, start_date, end_date, period) -> pd.DataFrame:
+        first, last = str(self.calendar[0]), str(self.calendar[-1])
+        if period:
+            periods = [period] if first <= period <= last else []
+        else:
+            periods = get_all_quarter_end(max(start_date or first, first), min(end_date or last, last))
+        rows_index, rows_period = [], []
+        candidates = np.arange(len(self.codes)) if not ts_code else np.flatnonzero(self.codes == ts_code)
+        for end in periods:
+            listed = candidates[self.list_dates[candidates] <= int(end)]
+            rows_index.append(listed)
+            rows_period.append(np.full(len(listed), int(end)))
+        if not rows_index:
+            return _empty(' '.join(SCHEMAS[table].column_names))
+        return self._frame(table, np.concatenate(rows_index), np.concatenate(rows_period))
+
+    def _frame(self, table: str, index: np.ndarray, dates: np.ndarray) -> pd.DataFrame:
+        """按表结构生成数据：行情列按 (股票, 日期) 计算，其余数值列为确定性的伪随机数"""
+        index = np.asarray(index, dtype=np.int64)
+        dates = np.asarray(dates, dtype=np.int64)
+        t = _day_number(dates)
+        bars = _bar_values(index, t)
+        columns: dict[str, object] = {}
+        for position, (name, column_type) in enumerate(SCHEMAS[table].columns):
+            if name == 'ts_code':
+                columns[name] = self.codes[index]
+            elif name in ('trade_date', 'end_date', 'cal_date'):
+                columns[name] = dates.astype(str)
+            elif name in ('ann_date', 'f_ann_date'):
+                columns[name] = _announce_dates(dates)
+            elif name in bars:
+                columns[name] = bars[name]
+            elif name == 'adj_factor':
+                columns[name] = _adj_factor(index, t)
+            elif column_type.startswith(('DECIMAL', 'DOUBLE')):
+                columns[name] = np.round(1e6 * (1 + _noise(index, t + position * 7)), 2)
+            elif column_type.startswith(('TINYINT', 'INT')):
+                columns[name] = 1
+            elif name == 'update_flag':
+                columns[name] = '1'
+            elif name in ('report_type', 'comp_type'):
+                columns[name] = '1'
+            elif name == 'end_type':
+                columns[name] = '4'
+            else:
+                columns[name] = None
+        return pd.DataFrame(columns, index=range(len(index)))
+
+
+def _ts_code(i: int) -> str:
+    # 偶数在深市、奇数在沪市
+    if i % 2 == 0:
+        return f'{1 + i // 2:06d}.SZ'
+    return f'{600000 + i // 2:06d}.SH'
+
+
+def _page(df: pd.DataFrame, limit: int | None, offset: int) -> pd.DataFrame:
+    """按 limit / offset 分页，与接口一致"""
+    if limit is None:
+        return df.iloc[offset:].reset_index(drop=True)
+    return df.iloc[offset:offset + limit].reset_index(drop=True)
+
+
+def _empty(columns: str) -> pd.DataFrame:
+    return pd.DataFrame(columns=columns.split())
+
+
+def _day_number(dates: np.ndarray) -> np.ndarray:
+    """YYYYMMDD 转为连续的天数"""
+    if len(dates) == 0:
+        return np.empty(0, dtype=np.int64)
+    return pd.to_datetime(dates.astype(str), format='%Y%m%d').to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def _noise(index: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """(股票, 天) 上的确定性伪随机数，取值 [-0.5, 0.5)"""
+    return ((index * 2654435761 + t * 40503) % 10007) / 10007 - 0.5
+
+
+def _close(index: np.ndarray, t: np.ndarray) -> np.ndarray:
+    base = 5 + (index * 37) % 95
+    return np.round(base * (1 + 0.4 * np.sin(t / 60 + index * 0.7)) * (1 + 0.02 * _noise(index, t)), 2)
+
+
+def _bar_values(index: np.ndarray, t: np.ndarray) -> dict[str, np.ndarray]:
+    close = _close(index, t)
+    pre_close = _close(index, t - 1)
+    open_ = np.round((close + pre_close) / 2, 2)
+    change = np.round(close - pre_close, 2)
+    vol = np.round(1e4 + (_noise(index, t * 3) + 0.5) * 1e5, 2)
+    return {
+        'open': open_,
+        'high': np.round(np.maximum(open_, close) * 1.01, 2),
+        'low': np.round(np.minimum(open_, close) * 0.99, 2),
+        'close': close,
+        'pre_close': pre_close,
+        'change': change,
+        'pct_chg': np.round(change / pre_close * 100, 4),
+        'vol': vol,
+        'amount': np.round(vol * close / 10, 3),
+        'turnover_rate': np.round(1 + (_noise(index, t * 5) + 0.5) * 5, 4),
+    }
+
+
+def _adj_factor(index: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """复权因子：每只股票约每年除权一次，期间不变"""
+    return np.round(1 + 0.05 * ((t + index * 37) // 250 + index % 7), 6)
+
+
+def _announce_dates(dates: np.ndarray) -> np.ndarray:
+    """报告期后 30 天公告"""
+    if len(dates) == 0:
+        return dates.astype(str)
+    announced = pd.to_datetime(dates.astype(str), format='%Y%m%d') + pd.Timedelta(days=30)
+    return announced.strftime('%Y%m%d').to_numpy()
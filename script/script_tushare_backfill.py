@@ -1,38 +1,53 @@
 import logging
 import argparse
-import time
 import pandas as pd
 import sys
 
-from fin_data_hub.data.tushare.tushare_data import get_tushare_client
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare.tushare_data import (
+    get_tushare_client,
+    get_trade_days
+)
+from fin_data_hub.data.tushare.tushare_backfill_planner import (
+    DATASETS,
+    plan_backfill,
+    estimate_plan,
+    execute_plan
+)
+from fin_data_hub.data.tushare.tushare_backfill_progress import (
+    CROSS_SECTION_UNIT,
+    BackfillRunActiveError,
+    backfill_run,
+    get_run_status,
+    year_windows
+)
+from fin_data_hub.data.tushare.tushare_adjust import update_adjusted_prices
+from fin_data_hub.data.tushare.tushare_parquet import export_tables
+from fin_data_hub.data.tushare.tushare_resample import resample_table, verify_resampled
+from fin_data_hub.data.tushare.tushare_schema import compact_frame, ensure_schemas, normalize_date_columns
+from fin_data_hub.data.tushare.tushare_storage import save_data
+from fin_data_hub.data.tushare.tushare_watermark import get_dataset_watermark, get_watermarks
 from fin_data_hub.data.tushare.constants import (
     STOCK_BASIC_TABLE, 
+    STOCK_BASIC_FIELDS,
     TRADE_CALENDAR_TABLE, 
     STOCK_ST_TABLE,
     DAILY_TABLE,
     DAILY_BASIC_TABLE,
-    WEEKLY_TABLE,
-    MONTHLY_TABLE,
     HSGT_TOP10_TABLE
 )
-from script.script_tushare_backfill_fin import (
-    backfill_income_data,
-    backfill_balancesheet_data
-)
-
-
 from fin_data_hub.foundation.mysql.mysql_engine import (
     mysql_engine, 
     table_exists_and_not_empty
 )
 from fin_data_hub.foundation.utils.date_utils import (
-    add_year, 
     get_stock_start_date, 
     future_year_end, 
     current_date_ymd, 
     next_day,
-    get_all_month_end
+    add_days
 )
+from fin_data_hub.foundation.pipeline import run_pipeline
 
 logging.basicConfig(
     level=logging.INFO,
@@ -46,7 +61,7 @@ def backfill_stock_basic_data():
     """
     补全股票基础数据
 
-    字段：ts_code symbol name area industry cnspell market list_date act_name act_ent_type
+    字段：ts_code symbol name area industry cnspell market list_date delist_date act_name act_ent_type
     """
     client = get_tushare_client()
 
@@ -54,16 +69,16 @@ def backfill_stock_basic_data():
         logger.info(f"股票基础数据表 {STOCK_BASIC_TABLE} 已存在，跳过补全")
         return
     
-    l_data = client.stock_basic(exchange='', list_status='L')
+    l_data = client.stock_basic(exchange='', list_status='L', fields=STOCK_BASIC_FIELDS)
     l_data['status'] = 'L'
 
-    d_data = client.stock_basic(exchange='', list_status='D')
+    d_data = client.stock_basic(exchange='', list_status='D', fields=STOCK_BASIC_FIELDS)
     d_data['status'] = 'D'
 
     data = pd.concat([l_data, d_data], ignore_index=True)
 
     if data is not None and not data.empty:
-        data.to_sql(STOCK_BASIC_TABLE, con=mysql_engine(), if_exists='replace', index=False)
+        save_data(data, STOCK_BASIC_TABLE, date_column=None)
     logger.info(f"[股票基础数据] 获取到 {len(data)} 条股票数据")
     return
 
@@ -84,12 +99,12 @@ def backfill_trade_calendar_data():
     df = client.trade_cal(exchange='', start_date=start_date, end_date=end_date)
 
     if df is not None and not df.empty:
-        df.to_sql(TRADE_CALENDAR_TABLE, con=mysql_engine(), if_exists='replace', index=False)
+        save_data(df, TRADE_CALENDAR_TABLE, date_column=None)
     logger.info(f"[交易日历数据] 获取到 {len(df)} 条交易日历数据")
     return
 
 
-def backfill_stock_st_data():
+def backfill_stock_st_data(resume: bool = False):
     """
     补全ST股票列表数据
 
@@ -97,31 +112,21 @@ def backfill_stock_st_data():
     """
     client = get_tushare_client()
 
-    if table_exists_and_not_empty(STOCK_ST_TABLE):
-        query = f"SELECT MAX(trade_date) as last_date FROM {STOCK_ST_TABLE}"
-        result = pd.read_sql(query, mysql_engine())
-        start_date = result['last_date'].iloc[0]
-    else:
-        start_date = '20160101'
-    
-    current_date = current_date_ymd()
-    
-    if start_date and str(start_date) >= current_date:
-        logger.info(f"[ST股票列表数据] 已是最新（{start_date}），无需更新")
-        return None
-    
-    while start_date <= current_date:
-        time.sleep(0.5)
-        df = client.stock_st(trade_date=start_date)
-        if df is None or df.empty:
-            logger.info(f"[ST股票列表数据] 从 {start_date} 获取到 0 条ST股票列表数据")
-            start_date = next_day(start_date)
-            continue
-        
-        df.to_sql(STOCK_ST_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        logger.info(f"[ST股票列表数据] 从 {start_date} 获取到 {len(df)} 条ST股票列表数据")
+    last_date = get_dataset_watermark(STOCK_ST_TABLE)
+    start_date = next_day(last_date) if last_date else '20160101'
 
-        start_date = next_day(start_date)
+    with backfill_run(STOCK_ST_TABLE, current_date_ymd(), resume) as run:
+        if start_date > run.end_date:
+            logger.info(f"[ST股票列表数据] 已是最新（{last_date}），无需更新")
+            return None
+
+        completed = run.completed()
+        for trade_date in get_trade_days(start_date, run.end_date):
+            if (CROSS_SECTION_UNIT, trade_date) in completed:
+                continue
+            df = client.stock_st(trade_date=trade_date)
+            save_data(df, STOCK_ST_TABLE, checkpoint=run.checkpoint(CROSS_SECTION_UNIT, trade_date))
+            logger.info(f"[ST股票列表数据] 从 {trade_date} 获取到 {0 if df is None else len(df)} 条ST股票列表数据")
 
     return
 
@@ -132,187 +137,222 @@ def backfill_bak_basic_data():
     # todo: 补全股票历史列表
     return
 
-def backfill_daily_data():
+def backfill_daily_data(resume: bool = False):
     """
     A股日线行情
 
+    每只股票从上市日期起按20年切分窗口，以 (股票, 窗口) 为任务，拉取与写入流水线并行执行，按任务顺序写入；
+    每个窗口单独写入并与进度一同提交，中断后恢复不会重新拉取已完成的窗口
+
     字段：ts_code trade_date open high low close pre_close change pct_chg vol amount
     """
     stock_list = get_stock_list()
     client = get_tushare_client()
 
-    end_date = current_date_ymd()
-
-    for index, row in stock_list.iterrows():
-        ts_code = row['ts_code']
-        list_date = row['list_date']
-        
-        # 分批拉取数据，每20年拉一次
-        all_data = []
-        current_start = list_date
-
-        if table_exists_and_not_empty(DAILY_TABLE):
-            query = f"SELECT MAX(trade_date) as last_date FROM {DAILY_TABLE} WHERE ts_code = '{ts_code}'"
-            df = pd.read_sql(query, mysql_engine())
-            if df is not None and not df.empty:
-                last_date = df['last_date'].iloc[0]
-                current_start = next_day(last_date)
-        
-        while current_start < end_date:
-            time.sleep(0.5)
-
-            # 计算20年后的日期
-            current_end = min(add_year(current_start, 20), end_date)
-            df_batch = client.daily(ts_code=ts_code, start_date=current_start, end_date=current_end)
-            logger.info(f"[日线行情数据] 拉取 {ts_code} 从 {current_start} 到 {current_end} 的 {len(df_batch)} 条数据")
-            if df_batch is not None and not df_batch.empty:
-                all_data.append(df_batch)
-            
-            current_start = next_day(current_end)
-           
-        
-        # 合并并排序
-        if all_data:
-            df_combined = pd.concat(all_data, ignore_index=True)
-            df_combined = df_combined.sort_values('trade_date', ascending=True)
-            df_combined.to_sql(DAILY_TABLE, con=mysql_engine(), if_exists='append', index=False)
-            logger.info(f"[日线行情数据] 保存 {ts_code} 的 {len(df_combined)} 条数据")
-    
+    last_dates = get_watermarks(DAILY_TABLE)
+
+    with backfill_run(DAILY_TABLE, current_date_ymd(), resume) as run:
+        end_date = run.end_date
+        completed = run.completed()
+
+        def tasks():
+            for ts_code, list_date in zip(stock_list['ts_code'], stock_list['list_date']):
+                last_date = last_dates.get(ts_code)
+                for window_start, window_end in year_windows(list_date, end_date):
+                    if (ts_code, window_start) in completed or (last_date and window_end <= last_date):
+                        continue
+                    # 窗口内已有部分数据时从水位之后开始拉取
+                    fetch_start = max(window_start, next_day(last_date)) if last_date else window_start
+                    yield ts_code, window_start, window_end, fetch_start
+
+        def fetch(task):
+            ts_code, _, window_end, fetch_start = task
+            df = client.daily(ts_code=ts_code, start_date=fetch_start, end_date=window_end)
+            logger.info(f"[日线行情数据] 拉取 {ts_code} 从 {fetch_start} 到 {window_end} 的 {0 if df is None else len(df)} 条数据")
+            if df is None or df.empty:
+                # 没有数据的窗口也需要写入进度
+                return pd.DataFrame()
+            return compact_frame(df, DAILY_TABLE)
+
+        def write(task, df):
+            ts_code, window_start, window_end, _ = task
+            rows = save_data(df, DAILY_TABLE, checkpoint=run.checkpoint(ts_code, window_start, window_end))
+            if rows:
+                logger.info(f"[日线行情数据] 保存 {ts_code} 的 {rows} 条数据")
+
+        # 按任务顺序写入：同一股票靠后的窗口不会先于靠前的窗口提交并推进水位，
+        # 否则中断后不带 --resume 重新运行时，按水位会跳过尚未写入的靠前窗口
+        run_pipeline(tasks(), fetch, write, ordered=True, name="日线行情数据")
     return
 
 
-def backfill_daily_basic_data():
+def backfill_daily_basic_data(resume: bool = False):
     """
     补全每日指标
 
+    以交易日为任务，拉取与写入流水线并行执行，按日期顺序写入
+
     字段：ts_code trade_date close turnover_rate turnover_rate_f volume_ratio pe pe_ttm pb ps ps_ttm dv_ratio dv_ttm total_share float_share free_share total_mv circ_mv
     """
     start_date = get_stock_start_date()
 
-    if table_exists_and_not_empty(DAILY_BASIC_TABLE):
-        query = f"SELECT MAX(trade_date) as last_date FROM {DAILY_BASIC_TABLE}"
-        df = pd.read_sql(query, mysql_engine())
-        last_date = df['last_date'].iloc[0]
-        if last_date:
-            start_date = next_day(last_date)
-
-    current_date = current_date_ymd()
+    last_date = get_dataset_watermark(DAILY_BASIC_TABLE)
+    if last_date:
+        start_date = next_day(last_date)
 
     client = get_tushare_client()
-    while start_date < current_date:
-        time.sleep(1)
-        df = client.daily_basic(ts_code='', trade_date=start_date)
-        if df is not None and not df.empty:
-            df.to_sql(DAILY_BASIC_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        logger.info(f"[每日指标数据] 获取到 {len(df)} 条 {start_date} 的每日指标数据")
-        start_date = next_day(start_date)
 
+    with backfill_run(DAILY_BASIC_TABLE, add_days(current_date_ymd(), -1), resume) as run:
+        def fetch(trade_date):
+            df = client.daily_basic(ts_code='', trade_date=trade_date)
+            logger.info(f"[每日指标数据] 获取到 {0 if df is None else len(df)} 条 {trade_date} 的每日指标数据")
+            return pd.DataFrame() if df is None else compact_frame(df, DAILY_BASIC_TABLE)
+
+        def write(trade_date, df):
+            save_data(df, DAILY_BASIC_TABLE, checkpoint=run.checkpoint(CROSS_SECTION_UNIT, trade_date))
+
+        trade_days = _pending_trade_days(run, get_trade_days(start_date, run.end_date))
+        run_pipeline(trade_days, fetch, write, ordered=True, name="每日指标数据")
     return
 
 
-def backfill_weekly_data():
+def backfill_weekly_data(start_date: str | None = None):
     """
-    补全周线行情
+    补全周线行情：从日线重采样生成，不调用接口
 
-    字段：ts_code trade_date open high low close vol amount
-    """
-    start_date = get_stock_start_date()
+    字段：ts_code trade_date open high low close pre_close change pct_chg vol amount
 
-    if table_exists_and_not_empty(WEEKLY_TABLE):
-        query = f"SELECT MAX(trade_date) as last_date FROM {WEEKLY_TABLE}"
-        df = pd.read_sql(query, mysql_engine())
-        last_date = df['last_date'].iloc[0]
-        if last_date:
-            start_date = next_day(last_date)
-    
-    current_date = current_date_ymd()
-
-    client = get_tushare_client() 
-    while start_date < current_date:
-        time.sleep(1)
-        df = client.weekly(trade_date=start_date)
-        if df is not None and not df.empty:
-            df.to_sql(WEEKLY_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        logger.info(f"[周线行情数据] 获取到 {len(df)} 条 {start_date} 的周线行情数据")
-        start_date = next_day(start_date)
+    Args:
+        start_date: 从该日期所在的周开始重新生成，默认从周线水位之后开始
+    """
+    rows = resample_table('W', start_date)
+    logger.info(f"[周线行情数据] 从日线生成 {rows} 条周线行情数据")
     return
 
-def backfill_monthly_data():
+def backfill_monthly_data(start_date: str | None = None):
     """
-    补全月线行情
+    补全月线行情：从日线重采样生成，不调用接口
 
-    字段：ts_code trade_date close open high low pre_close change pct_chg vol amount
-    """
-    start_date = get_stock_start_date()
+    字段：ts_code trade_date open high low close pre_close change pct_chg vol amount
 
-    if table_exists_and_not_empty(MONTHLY_TABLE):
-        query = f"SELECT MAX(trade_date) as last_date FROM {MONTHLY_TABLE}"
-        df = pd.read_sql(query, mysql_engine())
-        last_date = df['last_date'].iloc[0]
-        if last_date:
-            start_date = next_day(last_date)
+    Args:
+        start_date: 从该日期所在的月开始重新生成，默认从月线水位之后开始
+    """
+    rows = resample_table('M', start_date)
+    logger.info(f"[月线行情数据] 从日线生成 {rows} 条月线行情数据")
+    return
 
-    month_end_dates = get_all_month_end(start_date, current_date_ymd())
+def backfill_adjusted_daily_data(rebuild: bool = False):
+    """
+    生成前复权、后复权日线，需先补全日线和复权因子（--plan adj_factor）
 
-    client = get_tushare_client()
-    for date in month_end_dates:
-        time.sleep(1)
-        df = client.monthly(trade_date=date)
-        if df is not None and not df.empty:
-            df.to_sql(MONTHLY_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        else:
-            # 如果获取不到数据，则调用该月每天的数据
-            for day in range(1, 31):
-                date_str = f"{date[:4]}{date[4:6]}{day:02d}"
-                time.sleep(1)
-                df = client.monthly(trade_date=date_str)
-                if df is not None and not df.empty:
-                    df.to_sql(MONTHLY_TABLE, con=mysql_engine(), if_exists='append', index=False)
-                    break
-
-        logger.info(f"[月线行情数据] 获取到 {len(df)} 条 {date} 的月线行情数据")
+    Args:
+        rebuild: 整段重新计算全部股票，历史复权因子被修正时使用
+    """
+    written = update_adjusted_prices(rebuild=rebuild)
+    logger.info(f"[复权行情数据] 写入 {written}")
     return
 
+def verify_period_bars(freq: str, trade_date: str):
+    """把指定周期末的重采样结果与 weekly / monthly 接口比较并打印不一致的股票"""
+    mismatches = verify_resampled(freq, trade_date)
+    if mismatches.empty:
+        print(f"{trade_date} 重采样结果与接口一致")
+        return
+    with pd.option_context('display.max_rows', 100, 'display.width', 200):
+        print(mismatches['mismatch'].value_counts())
+        print(mismatches.head(20))
+
 
-def backfill_hsgt_top10_data():
+def backfill_hsgt_top10_data(resume: bool = False):
     """
     补全沪深股通十大成交股
 
+    以交易日为任务，拉取与写入流水线并行执行，按日期顺序写入
+
     字段：trade_date ts_code name close change rank market_type amount net_amount buy sell
     """
     # 跑过一段时间，在这之前都没有数据
     start_date = "20030717"
 
-    if table_exists_and_not_empty(HSGT_TOP10_TABLE):
-        query = f"SELECT MAX(trade_date) as last_date FROM {HSGT_TOP10_TABLE}"
-        df = pd.read_sql(query, mysql_engine())
-        last_date = df['last_date'].iloc[0]
-        if last_date:
-            start_date = next_day(last_date)
-
-    current_date = current_date_ymd()
+    last_date = get_dataset_watermark(HSGT_TOP10_TABLE)
+    if last_date:
+        start_date = next_day(last_date)
 
     client = get_tushare_client()
 
-    while start_date < current_date:
-        time.sleep(1)
-        df_1 = client.hsgt_top10(trade_date=start_date, market_type='1')
-        time.sleep(1)
-        df_3 = client.hsgt_top10(trade_date=start_date, market_type='3')
-        df = pd.concat([df_1, df_3], ignore_index=True)
-        if df is not None and not df.empty:
-            df.to_sql(HSGT_TOP10_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        logger.info(f"[沪深股通十大成交股数据] 获取到 {len(df)} 条 {start_date} 的沪深股通十大成交股数据，其中沪股通 {len(df_1)} 条，深股通 {len(df_3)} 条")
-        start_date = next_day(start_date)
+    with backfill_run(HSGT_TOP10_TABLE, add_days(current_date_ymd(), -1), resume) as run:
+        def fetch(trade_date):
+            df_1 = client.hsgt_top10(trade_date=trade_date, market_type='1')
+            df_3 = client.hsgt_top10(trade_date=trade_date, market_type='3')
+            df = pd.concat([df_1, df_3], ignore_index=True)
+            logger.info(f"[沪深股通十大成交股数据] 获取到 {len(df)} 条 {trade_date} 的沪深股通十大成交股数据，其中沪股通 {len(df_1)} 条，深股通 {len(df_3)} 条")
+            return compact_frame(df, HSGT_TOP10_TABLE)
+
+        def write(trade_date, df):
+            save_data(df, HSGT_TOP10_TABLE, checkpoint=run.checkpoint(CROSS_SECTION_UNIT, trade_date))
+
+        trade_days = _pending_trade_days(run, get_trade_days(start_date, run.end_date))
+        run_pipeline(trade_days, fetch, write, ordered=True, name="沪深股通十大成交股数据")
     return
 
 
+def backfill_gaps(
+    dataset: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    dry_run: bool = False,
+    recheck: bool = False,
+):
+    """
+    按缺口补全数据集：只请求交易日历与已存储数据之间缺失的部分
+
+    Args:
+        dataset: 数据集名称
+        start_date: 开始日期
+        end_date: 结束日期
+        dry_run: 只打印计划，不执行
+        recheck: 重新请求已确认过没有数据的窗口
+    """
+    plan = plan_backfill(dataset, start_date, end_date, recheck)
+    calls, seconds = estimate_plan(plan)
+    date_requests = sum(1 for request in plan if request.trade_date)
+    logger.info(
+        f"[补全计划] {dataset}：截面请求 {date_requests} 个，区间请求 {len(plan) - date_requests} 个，"
+        f"共 {calls} 次接口调用，预计耗时 {seconds / 60:.1f} 分钟"
+    )
+    if dry_run:
+        for request in plan[:20]:
+            logger.info(f"[补全计划] {request}")
+        return
+    execute_plan(plan)
+
+
+def show_backfill_status():
+    """打印最近的补全任务及其进度"""
+    status = get_run_status()
+    if status.empty:
+        logger.info("[补全进度] 没有补全任务")
+        return
+    for row in status.itertuples(index=False):
+        logger.info(
+            f"[补全进度] {row.run_id} {row.dataset} 结束日期 {row.end_date} 状态 {row.status}："
+            f"已完成窗口 {row.windows} 个，写入 {row.rows} 行，最后进度 {row.last_progress_at}"
+        )
+
+
+def _pending_trade_days(run, trade_days) -> list[str]:
+    """过滤掉补全任务中已完成的截面日期"""
+    completed = run.completed()
+    return [trade_date for trade_date in trade_days if (CROSS_SECTION_UNIT, trade_date) not in completed]
+
+
 def get_stock_list() -> pd.DataFrame:
     """
     获取股票列表
     """
     query = f"SELECT * FROM {STOCK_BASIC_TABLE}"
-    df = pd.read_sql(query, mysql_engine())
+    df = normalize_date_columns(pd.read_sql(query, mysql_engine()))
     return df
 
 
@@ -321,7 +361,7 @@ def get_trade_calendar_list() -> pd.DataFrame:
     获取交易日历列表
     """
     query = f"SELECT * FROM {TRADE_CALENDAR_TABLE}"
-    df = pd.read_sql(query, mysql_engine())
+    df = normalize_date_columns(pd.read_sql(query, mysql_engine()))
     return df
 
 def main():
@@ -333,33 +373,76 @@ def main():
     parser.add_argument("--bak_basic", action="store_true", help="补全股票历史列表")
     parser.add_argument("--daily", action="store_true", help="补全日线数据")
     parser.add_argument("--daily_basic", action="store_true", help="补全每日指标")
-    parser.add_argument("--weekly", action="store_true", help="补全周线行情")
-    parser.add_argument("--monthly", action="store_true", help="补全月线行情")
+    parser.add_argument("--weekly", action="store_true", help="补全周线行情（从日线生成，--start-date 指定时从该日期重新生成）")
+    parser.add_argument("--monthly", action="store_true", help="补全月线行情（从日线生成，--start-date 指定时从该日期重新生成）")
+    parser.add_argument("--verify", metavar="TRADE_DATE", help="与 --weekly / --monthly 一起使用：把该周期末的生成结果与接口比较，不写入")
     parser.add_argument("--hsgt_top10", action="store_true", help="补全沪深股通十大成交股")
+    parser.add_argument("--adjusted", action="store_true", help="生成前复权、后复权日线（复权因子用 --plan adj_factor 补全）")
+    parser.add_argument("--rebuild-adjusted", action="store_true", help="整段重新计算全部股票的复权日线")
+    parser.add_argument("--fetch-workers", type=int, default=config.backfill_fetch_workers, help="拉取线程数")
+    parser.add_argument("--write-workers", type=int, default=config.backfill_write_workers, help="写入线程数")
+    parser.add_argument("--queue-size", type=int, default=config.backfill_queue_size, help="等待写入的结果数上限")
+    parser.add_argument("--plan", choices=sorted(DATASETS), help="按缺口补全指定数据集")
+    parser.add_argument("--dry-run", action="store_true", help="只打印补全计划的调用次数和预计耗时，不执行")
+    parser.add_argument("--recheck", action="store_true", help="与 --plan 一起使用：重新请求已确认过没有数据的窗口（如停牌区间）")
+    parser.add_argument("--start-date", help="补全计划开始日期，格式 YYYYMMDD")
+    parser.add_argument("--end-date", help="补全计划结束日期，格式 YYYYMMDD")
+    parser.add_argument("--export-parquet", action="store_true", help="补全完成后重建 Parquet 镜像")
+    parser.add_argument("--resume", action="store_true", help="恢复各数据集最近一次未完成的补全任务，跳过已完成的窗口")
+    parser.add_argument("--status", action="store_true", help="打印最近的补全任务及其进度")
     args = parser.parse_args()
+
+    config.backfill_fetch_workers = args.fetch_workers
+    config.backfill_write_workers = args.write_workers
+    config.backfill_queue_size = args.queue_size
+
+    if args.status:
+        show_backfill_status()
+        return
+
+    ensure_schemas()
+
+    if args.plan:
+        backfill_gaps(args.plan, args.start_date, args.end_date, args.dry_run, args.recheck)
+        if args.export_parquet and not args.dry_run:
+            export_tables(rebuild=True)
+        return
     
     if args.stock_basic:
         backfill_stock_basic_data()
     if args.trade_calendar:
         backfill_trade_calendar_data()
     if args.stock_st:
-        backfill_stock_st_data()
+        backfill_stock_st_data(args.resume)
     if args.bak_basic:
         backfill_bak_basic_data()
     if args.daily:
-        backfill_daily_data()
+        backfill_daily_data(args.resume)
     if args.daily_basic:
-        backfill_daily_basic_data()
+        backfill_daily_basic_data(args.resume)
+    if args.verify:
+        if args.weekly:
+            verify_period_bars('W', args.verify)
+        if args.monthly:
+            verify_period_bars('M', args.verify)
+        return
+
     if args.weekly:
-        backfill_weekly_data()
+        backfill_weekly_data(args.start_date)
     if args.monthly:
-        backfill_monthly_data()
+        backfill_monthly_data(args.start_date)
     if args.hsgt_top10:
-        backfill_hsgt_top10_data()
+        backfill_hsgt_top10_data(args.resume)
+    if args.adjusted or args.rebuild_adjusted:
+        backfill_adjusted_daily_data(args.rebuild_adjusted)
 
-    # backfill_income_data()
-    backfill_balancesheet_data()
+    if args.export_parquet:
+        export_tables(rebuild=True)
 
         
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except BackfillRunActiveError as e:
+        logger.error(f"[补全进度] {e}")
+        sys.exit(1)
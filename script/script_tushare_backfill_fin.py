@@ -2,24 +2,21 @@ import logging
 import sys
 import pandas as pd
 import argparse
-import time
-from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine, table_exists_and_not_empty
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
 from fin_data_hub.data.tushare.constants import (
     STOCK_BASIC_TABLE,
     TRADE_CALENDAR_TABLE,
     INCOME_TABLE,
     BALANCESHEET_TABLE
 )
-from fin_data_hub.foundation.mysql.mysql_engine import (
-    mysql_engine, 
-)
+from fin_data_hub.data.tushare.tushare_backfill_progress import BackfillRunActiveError
 from fin_data_hub.data.tushare.tushare_data import get_tushare_client
-
-from fin_data_hub.foundation.utils.date_utils import (
-    get_stock_start_date, 
-    current_date_ymd, 
-    get_all_quarter_end
-)
+from fin_data_hub.foundation.pipeline import run_pipeline
+from fin_data_hub.data.tushare.tushare_schema import ensure_schemas, normalize_date_columns
+from fin_data_hub.data.tushare.tushare_statements import backfill_statement
+from fin_data_hub.data.tushare.tushare_storage import save_data
+from fin_data_hub.data.tushare.tushare_watermark import get_watermarks
+from fin_data_hub.foundation.utils.date_utils import get_stock_start_date, current_date_ymd
 
 
 logging.basicConfig(
@@ -36,13 +33,15 @@ def get_stock_list() -> pd.DataFrame:
     获取股票列表
     """
     query = f"SELECT * FROM {STOCK_BASIC_TABLE}"
-    df = pd.read_sql(query, mysql_engine())
+    df = normalize_date_columns(pd.read_sql(query, mysql_engine()))
     return df
 
 
-def backfill_income_data():
+def backfill_income_data(resume: bool = False):
     """
     补全财务数据
+
+    以报告期为任务，使用 income_vip 按报告期拉取全市场数据，按报告期记录进度
     
     ts_code	str	Y	TS代码
     ann_date	str	Y	公告日期
@@ -139,14 +138,18 @@ def backfill_income_data():
     end_net_profit	float	N	终止经营净利润
     update_flag	str	Y	更新标识
 
+    Args:
+        resume: 恢复最近一次未完成的补全任务，跳过已完成的报告期
     """
-    backfill_income_data_1()
+    backfill_statement('income', resume=resume)
 
 
-def backfill_balancesheet_data():
+def backfill_balancesheet_data(resume: bool = False):
     """
     补全资产负债表
 
+    以报告期为任务，使用 balancesheet_vip 按报告期拉取全市场数据，按报告期记录进度
+
     ts_code	str	Y	TS股票代码
     ann_date	str	Y	公告日期
     f_ann_date	str	Y	实际公告日期
@@ -305,85 +308,87 @@ def backfill_balancesheet_data():
     oth_rcv_total	float	Y	其他应收款(合计)（元）
     fix_assets_total	float	Y	固定资产(合计)(元)
     update_flag	str	Y	更新标识
-    """
-    
-    backfill_balancesheet_data_1()
 
-def backfill_income_data_1():
+    Args:
+        resume: 恢复最近一次未完成的补全任务，跳过已完成的报告期
     """
-    补全财务数据
+    backfill_statement('balancesheet', resume=resume)
+
+
+def backfill_cashflow_data(resume: bool = False):
     """
-    stock_list = get_stock_list()
-    client = get_tushare_client()
+    补全现金流量表
 
-    start_date = get_stock_start_date()
-    end_date = current_date_ymd()
+    以报告期为任务，使用 cashflow_vip 按报告期拉取全市场数据，按报告期记录进度
 
-    for index, row in stock_list.iterrows():
-        ts_code = row['ts_code']
-
-        if table_exists_and_not_empty(INCOME_TABLE):
-            query = f"SELECT COUNT(*) as count FROM {INCOME_TABLE} WHERE ts_code = '{ts_code}'"
-            df = pd.read_sql(query, mysql_engine())
-            if df is not None and not df.empty:
-                count = df['count'].iloc[0]
-                if count > 0:
-                    logger.info(f"[财务数据] {ts_code} 的财务数据已存在，跳过")
-                    continue
-        time.sleep(1)   
-        df = client.income(ts_code=ts_code, start_date=start_date, end_date=end_date)
-        if df is not None and not df.empty:
-            df.to_sql(INCOME_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        logger.info(f"[财务数据] 获取到 {len(df)} 条 {ts_code} 的财务数据")
-
-def backfill_income_data_2():
+    字段：ts_code ann_date f_ann_date end_date report_type comp_type end_type
+    net_profit c_fr_sale_sg c_inf_fr_operate_a c_paid_goods_s c_paid_to_for_empl c_paid_for_taxes
+    st_cash_out_act n_cashflow_act stot_inflows_inv_act c_pay_acq_const_fiolta stot_out_inv_act
+    n_cashflow_inv_act c_recp_borrow stot_cash_in_fnc_act free_cashflow stot_cashout_fnc_act
+    n_cash_flows_fnc_act n_incr_cash_cash_equ c_cash_equ_beg_period c_cash_equ_end_period ... update_flag
+    （完整字段见 tushare_schema 中的现金流量表结构）
+
+    Args:
+        resume: 恢复最近一次未完成的补全任务，跳过已完成的报告期
     """
-    补全财务数据
+    backfill_statement('cashflow', resume=resume)
+
+def backfill_income_data_1():
     """
-    client = get_tushare_client()
-    
-    start_date = get_stock_start_date()
-    end_date = current_date_ymd()
-    quarter_end_dates = get_all_quarter_end(start_date, end_date)
-    for date in quarter_end_dates:
-        df = client.income_vip(period=date)
-        if df is not None and not df.empty:
-            df.to_sql(INCOME_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        logger.info(f"[财务数据] 获取到 {len(df)} 条 {date} 的财务数据")
+    补全财务数据
 
+    以股票为任务，拉取与写入流水线并行执行；每只股票一次请求，用于没有 VIP 接口权限的账号
+    """
+    _backfill_statement_by_ts_code(INCOME_TABLE, 'income', '财务数据')
 
 def backfill_balancesheet_data_1():
     """
     补全资产负债表数据
+
+    以股票为任务，拉取与写入流水线并行执行；每只股票一次请求，用于没有 VIP 接口权限的账号
+    """
+    _backfill_statement_by_ts_code(BALANCESHEET_TABLE, 'balancesheet', '资产负债表数据')
+
+
+def _backfill_statement_by_ts_code(table: str, api_name: str, label: str):
+    """
+    按股票补全财务报表，已有数据的股票跳过
+
+    Args:
+        table: 目标数据表
+        api_name: Tushare 接口名称
+        label: 日志中的数据名称
     """
     stock_list = get_stock_list()
     client = get_tushare_client()
-    
+
     start_date = get_stock_start_date()
     end_date = current_date_ymd()
-    
-    for index, row in stock_list.iterrows():
-        ts_code = row['ts_code']
-        if table_exists_and_not_empty(BALANCESHEET_TABLE):
-            query = f"SELECT COUNT(*) as count FROM {BALANCESHEET_TABLE} WHERE ts_code = '{ts_code}'"
-            df = pd.read_sql(query, mysql_engine())
-            if df is not None and not df.empty:
-                count = df['count'].iloc[0]
-                if count > 0:
-                    logger.info(f"[资产负债表数据] {ts_code} 的资产负债表数据已存在，跳过")
-                    continue
-        time.sleep(1)
-        df = client.balancesheet(ts_code=ts_code, start_date=start_date, end_date=end_date)
-        if df is not None and not df.empty:
-            df.to_sql(BALANCESHEET_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        logger.info(f"[资产负债表数据] 获取到 {len(df)} 条 {ts_code} 的资产负债表数据")
+    last_dates = get_watermarks(table, date_column='end_date')
+
+    def tasks():
+        for ts_code in stock_list['ts_code']:
+            if ts_code in last_dates:
+                logger.info(f"[{label}] {ts_code} 的{label}已存在，跳过")
+                continue
+            yield ts_code
+
+    def fetch(ts_code):
+        df = getattr(client, api_name)(ts_code=ts_code, start_date=start_date, end_date=end_date)
+        logger.info(f"[{label}] 获取到 {0 if df is None else len(df)} 条 {ts_code} 的{label}")
+        return df if df is not None and not df.empty else None
+
+    def write(ts_code, df):
+        save_data(df, table, date_column='end_date')
+
+    run_pipeline(tasks(), fetch, write, name=label)
 
 def get_trade_calendar_list() -> pd.DataFrame:
     """
     获取交易日历列表
     """
     query = f"SELECT * FROM {TRADE_CALENDAR_TABLE}"
-    df = pd.read_sql(query, mysql_engine())
+    df = normalize_date_columns(pd.read_sql(query, mysql_engine()))
     return df
 
 
@@ -391,10 +396,23 @@ def main():
     """命令行入口点"""
     parser = argparse.ArgumentParser(description="Tushare数据补全")
     parser.add_argument("--income", action="store_true", help="补全财务数据")
+    parser.add_argument("--balancesheet", action="store_true", help="补全资产负债表")
+    parser.add_argument("--cashflow", action="store_true", help="补全现金流量表")
+    parser.add_argument("--resume", action="store_true", help="恢复最近一次未完成的补全任务")
     args = parser.parse_args()
+
+    ensure_schemas()
     
     if args.income:
-        backfill_income_data()
+        backfill_income_data(args.resume)
+    if args.balancesheet:
+        backfill_balancesheet_data(args.resume)
+    if args.cashflow:
+        backfill_cashflow_data(args.resume)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    except BackfillRunActiveError as e:
+        logger.error(f"[补全进度] {e}")
+        sys.exit(1)
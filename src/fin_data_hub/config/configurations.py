@@ -16,6 +16,111 @@ class Configurations(BaseSettings):
 
     # --- Tushare 配置 ---
     tushare_token: str = Field(default="", description="Tushare API Token")
+    tushare_calls_per_minute: int = Field(
+        default=500, description="Tushare 账号每分钟总调用预算（按接口权重扣减）"
+    )
+    tushare_endpoint_calls_per_minute: dict[str, int] = Field(
+        default={
+            "daily": 500,
+            "daily_basic": 200,
+            "stock_st": 200,
+            "hsgt_top10": 200,
+            "income": 200,
+            "balancesheet": 200,
+            "income_vip": 60,
+            "balancesheet_vip": 60,
+            "cashflow": 200,
+            "cashflow_vip": 60,
+        },
+        description="各接口每分钟调用上限，未配置的接口使用默认值",
+    )
+    tushare_default_endpoint_calls_per_minute: int = Field(
+        default=200, description="未单独配置的接口每分钟调用上限"
+    )
+    tushare_endpoint_weights: dict[str, int] = Field(
+        default={"income_vip": 2, "balancesheet_vip": 2, "cashflow_vip": 2},
+        description="各接口每次调用占用的总预算权重，未配置的接口权重为 1",
+    )
+    tushare_rate_limit_backoff_seconds: float = Field(
+        default=5.0, description="触发限流后的初始退避秒数，连续触发时指数增长"
+    )
+    tushare_rate_limit_max_backoff_seconds: float = Field(
+        default=60.0, description="触发限流后的最大退避秒数"
+    )
+    tushare_rate_limit_max_retries: int = Field(
+        default=5, description="触发限流后的最大重试次数"
+    )
+
+    # --- Tushare 响应缓存配置 ---
+    tushare_response_cache_enabled: bool = Field(
+        default=False, description="是否把历史区间的接口响应缓存到本地磁盘，重新补全时直接读取"
+    )
+    tushare_response_cache_dir: str = Field(default="data/tushare_cache", description="接口响应缓存目录")
+    tushare_response_cache_max_mb: int = Field(
+        default=4096, description="接口响应缓存占用磁盘上限（MB），超过后按最近使用时间淘汰"
+    )
+    tushare_response_cache_recent_trade_days: int = Field(
+        default=5, description="请求区间涉及最近 N 个交易日时不缓存，这些数据仍可能被修正"
+    )
+    tushare_response_cache_statement_lag_days: int = Field(
+        default=400, description="财务报表在报告期结束后该自然日数内不缓存，期间仍可能有更正公告"
+    )
+
+    # --- 财务报表配置 ---
+    statement_restatement_days: int = Field(
+        default=400, description="报告期结束后该自然日数内仍可能有新公告或更正，日常调度只重新拉取这些报告期"
+    )
+
+    # --- 补全流水线配置 ---
+    backfill_fetch_workers: int = Field(default=4, description="补全任务拉取线程数")
+    backfill_write_workers: int = Field(default=2, description="补全任务写入线程数")
+    backfill_queue_size: int = Field(
+        default=8, description="补全任务等待写入的结果数上限"
+    )
+    backfill_max_buffer_mb: int = Field(
+        default=512, description="补全任务等待写入的数据占用内存上限（MB），超过后暂停拉取"
+    )
+    backfill_plan_cross_section_threshold: int = Field(
+        default=200, description="补全计划中同一交易日缺失股票数达到该值时改为一次截面请求"
+    )
+    backfill_run_stale_seconds: float = Field(
+        default=1800.0, description="状态为 running 的补全任务超过该秒数没有进度时视为进程已退出，可以用 --resume 恢复"
+    )
+
+    # --- Parquet 镜像配置 ---
+    parquet_root: str = Field(default="data/parquet", description="Parquet 镜像根目录")
+    parquet_export_enabled: bool = Field(
+        default=True, description="同步任务完成后是否增量导出 Parquet 镜像"
+    )
+
+    # --- 调度配置 ---
+    scheduler_lease_ttl_seconds: float = Field(
+        default=60.0, description="定时任务租约有效期（秒），持有者每 1/3 有效期心跳续约，进程退出后超时由其他进程接管"
+    )
+
+    # --- 缓存快照配置 ---
+    cache_snapshot_dir: str = Field(default="data/cache", description="股票列表、交易日历缓存快照目录")
+    cache_refresh_interval_minutes: int = Field(
+        default=10, description="后台检查数据库版本戳并刷新缓存的间隔（分钟）"
+    )
+    cache_generation_check_seconds: int = Field(
+        default=5, description="检查其他工作进程发布的新一代缓存快照的间隔（秒）"
+    )
+
+    # --- 查询接口配置 ---
+    query_stream_batch_size: int = Field(
+        default=5000, description="流式查询每批从数据库读取的行数"
+    )
+    query_cache_enabled: bool = Field(default=True, description="是否缓存分页查询结果")
+    query_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024, description="查询结果缓存的内存上限（字节）"
+    )
+    query_cache_ttl_seconds: float = Field(
+        default=300.0, description="包含最新日期的查询结果缓存秒数，历史区间的结果只在失效事件时移除"
+    )
+    query_cache_change_poll_seconds: float = Field(
+        default=1.0, description="读取数据变更日志的最小间隔秒数，用于发现其他进程写入的数据并移除受影响的缓存"
+    )
 
     # --- 监控配置 ---
     telemetry_metrics_port: int = Field(
@@ -28,6 +133,13 @@ class Configurations(BaseSettings):
     mysql_user: str = Field(default="root", description="MySQL 用户")
     mysql_password: str = Field(default="123456", description="MySQL 密码")
     mysql_database: str = Field(default="fin_data_hub", description="MySQL 数据库")
+    mysql_bulk_method: str = Field(
+        default="insert",
+        description="批量写入方式：insert（多行 INSERT）或 load_data（LOAD DATA LOCAL INFILE）",
+    )
+    mysql_bulk_chunk_size: int = Field(default=5000, description="批量写入每批行数")
+    mysql_async_pool_size: int = Field(default=20, description="异步引擎连接池大小")
+    mysql_async_max_overflow: int = Field(default=30, description="异步引擎连接池最大溢出连接数")
 
     # Pydantic-settings 配置
     model_config = SettingsConfigDict(
@@ -46,5 +158,9 @@ class Configurations(BaseSettings):
     def mysql_url(self):
         return f"mysql+pymysql://{self.mysql_user}:{self.mysql_password}@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}?charset=utf8mb4"
 
+    @property
+    def mysql_async_url(self):
+        return f"mysql+aiomysql://{self.mysql_user}:{self.mysql_password}@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}?charset=utf8mb4"
+
 # 导出单例实例
 config = Configurations()
\ No newline at end of file
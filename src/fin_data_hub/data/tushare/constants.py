@@ -10,6 +10,41 @@ DAILY_TABLE = 'tushare_daily'
 DAILY_BASIC_TABLE = 'tushare_daily_basic'
 WEEKLY_TABLE = 'tushare_weekly'
 MONTHLY_TABLE = 'tushare_monthly'
+ADJ_FACTOR_TABLE = 'tushare_adj_factor'
+# 由日线和复权因子生成的前复权、后复权日线
+DAILY_QFQ_TABLE = 'tushare_daily_qfq'
+DAILY_HFQ_TABLE = 'tushare_daily_hfq'
 HSGT_TOP10_TABLE = 'tushare_hsgt_top10'
 INCOME_TABLE = 'tushare_income'
-BALANCESHEET_TABLE = 'tushare_balancesheet'
\ No newline at end of file
+BALANCESHEET_TABLE = 'tushare_balancesheet'
+CASHFLOW_TABLE = 'tushare_cashflow'
+# 股票列表接口请求的字段（默认字段之外补充退市日期，用于计算上市区间）
+STOCK_BASIC_FIELDS = 'ts_code,symbol,name,area,industry,cnspell,market,list_date,delist_date,act_name,act_ent_type'
+
+# 数据水位目录表
+WATERMARK_TABLE = 'tushare_watermark'
+
+# 数据变更日志：每次写入覆盖的日期范围，供其他进程的查询缓存失效
+CHANGE_LOG_TABLE = 'tushare_change_log'
+
+# 补全任务及其进度
+BACKFILL_RUN_TABLE = 'tushare_backfill_run'
+BACKFILL_PROGRESS_TABLE = 'tushare_backfill_progress'
+
+# 各数据表的自然键，用于幂等写入（INSERT ... ON DUPLICATE KEY UPDATE）
+TABLE_KEYS = {
+    TRADE_CALENDAR_TABLE: ('exchange', 'cal_date'),
+    STOCK_BASIC_TABLE: ('ts_code',),
+    STOCK_ST_TABLE: ('ts_code', 'trade_date'),
+    DAILY_TABLE: ('ts_code', 'trade_date'),
+    DAILY_BASIC_TABLE: ('ts_code', 'trade_date'),
+    WEEKLY_TABLE: ('ts_code', 'trade_date'),
+    MONTHLY_TABLE: ('ts_code', 'trade_date'),
+    ADJ_FACTOR_TABLE: ('ts_code', 'trade_date'),
+    DAILY_QFQ_TABLE: ('ts_code', 'trade_date'),
+    DAILY_HFQ_TABLE: ('ts_code', 'trade_date'),
+    HSGT_TOP10_TABLE: ('trade_date', 'ts_code', 'market_type'),
+    INCOME_TABLE: ('ts_code', 'end_date', 'report_type', 'f_ann_date'),
+    BALANCESHEET_TABLE: ('ts_code', 'end_date', 'report_type', 'f_ann_date'),
+    CASHFLOW_TABLE: ('ts_code', 'end_date', 'report_type', 'f_ann_date'),
+}
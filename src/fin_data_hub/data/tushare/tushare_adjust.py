@@ -0,0 +1,193 @@
+"""
+复权行情
+
+由 ``tushare_daily`` 和 ``tushare_adj_factor`` 生成前复权、后复权日线并物化到数据表，读取时不再逐只股票计算：
+- 后复权：价格 × 当日复权因子
+- 前复权：价格 × 当日复权因子 / 该股票最新复权因子
+- open high low close pre_close 按当日因子复权，change 由复权后的 close 和 pre_close 计算，
+  pct_chg、vol、amount 不变
+
+全市场在一次 join + 向量化运算中完成。增量更新：
+- 后复权只依赖当日因子，新的交易日只需追加
+- 前复权依赖最新因子：前复权表水位日的因子与最新因子相同的股票只追加新的交易日，
+  不同（期间发生除权除息）的股票整段重新计算，其他股票不受影响
+"""
+import logging
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from fin_data_hub.data.tushare.constants import (
+    ADJ_FACTOR_TABLE,
+    DAILY_HFQ_TABLE,
+    DAILY_QFQ_TABLE,
+    DAILY_TABLE,
+    WATERMARK_TABLE,
+)
+from fin_data_hub.data.tushare.tushare_schema import compact_frame
+from fin_data_hub.data.tushare.tushare_storage import save_data
+from fin_data_hub.data.tushare.tushare_watermark import get_dataset_watermark, get_watermarks
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
+
+logger = logging.getLogger(__name__)
+
+# 复权方式 -> 数据表
+ADJUST_TABLES = {
+    'qfq': DAILY_QFQ_TABLE,
+    'hfq': DAILY_HFQ_TABLE,
+}
+
+# 按复权因子调整的价格列
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'pre_close')
+
+_COLUMNS = ['ts_code', 'trade_date', *PRICE_COLUMNS, 'change', 'pct_chg', 'vol', 'amount', 'adj_factor']
+
+# 按股票读取日线时每批的股票数
+_REBUILD_BATCH_STOCKS = 100
+
+
+def adjust_prices(df: pd.DataFrame, latest_factors: pd.Series | None = None) -> pd.DataFrame:
+    """
+    计算复权价格
+
+    Args:
+        df: 日线与当日复权因子，包含 ts_code trade_date open high low close pre_close pct_chg vol amount adj_factor
+        latest_factors: 各股票的最新复权因子（索引为 ts_code），为 None 时计算后复权，否则计算前复权
+
+    Returns:
+        ts_code trade_date open high low close pre_close change pct_chg vol amount adj_factor
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=_COLUMNS)
+    factor = df['adj_factor'].to_numpy(dtype=np.float64)
+    if latest_factors is not None:
+        latest = df['ts_code'].map(latest_factors).to_numpy(dtype=np.float64)
+        factor = factor / latest
+
+    result = df[['ts_code', 'trade_date']].copy()
+    for column in PRICE_COLUMNS:
+        result[column] = np.round(df[column].to_numpy(dtype=np.float64) * factor, 4)
+    result['change'] = np.round(result['close'] - result['pre_close'], 4)
+    for column in ('pct_chg', 'vol', 'amount', 'adj_factor'):
+        result[column] = df[column].to_numpy()
+    # 缺少最新因子的股票无法计算前复权
+    return result[np.isfinite(factor)][_COLUMNS]
+
+
+def update_adjusted_prices(ts_codes: list[str] | None = None, rebuild: bool = False) -> dict[str, int]:
+    """
+    增量更新前复权、后复权日线
+
+    Args:
+        ts_codes: 只更新这些股票，默认全部
+        rebuild: 整段重新计算（历史复权因子被修正时使用）
+
+    Returns:
+        各复权表写入的行数
+    """
+    written = {table: 0 for table in ADJUST_TABLES.values()}
+    daily_last = get_dataset_watermark(DAILY_TABLE)
+    factor_last = get_dataset_watermark(ADJ_FACTOR_TABLE)
+    if daily_last is None or factor_last is None:
+        logger.info("[复权行情] 日线或复权因子数据表为空，跳过")
+        return written
+    end_date = min(daily_last, factor_last)
+
+    latest = latest_factors(end_date)
+    codes = latest.index if ts_codes is None else latest.index.intersection(ts_codes)
+    qfq_marks = get_watermarks(DAILY_QFQ_TABLE)
+    hfq_marks = {} if rebuild else get_watermarks(DAILY_HFQ_TABLE)
+
+    if rebuild:
+        stale = list(codes)
+    else:
+        # 前复权水位日的因子与最新因子不同（期间除权除息），或尚无前复权数据的股票整段重新计算
+        base = watermark_factors(DAILY_QFQ_TABLE).reindex(codes)
+        changed = ~np.isclose(base.to_numpy(dtype=np.float64), latest.reindex(codes).to_numpy(dtype=np.float64))
+        stale = list(codes[changed])
+    stale_set = set(stale)
+    appending = [code for code in codes if code not in stale_set]
+    logger.info(f"[复权行情] 截至 {end_date}：{len(stale)} 只股票整段重新计算，{len(appending)} 只股票追加")
+
+    if appending:
+        # 大多数股票的水位相同，按截面读取；长期停牌等水位落后的股票按股票读取
+        latest_mark = max(qfq_marks[code] for code in appending)
+        current = [code for code in appending if qfq_marks[code] == latest_mark]
+        lagging = [code for code in appending if qfq_marks[code] != latest_mark]
+        df = load_daily_with_factors(latest_mark, end_date)
+        _write(df[df['ts_code'].isin(current)], latest, qfq_marks, hfq_marks, written)
+        for batch in _batches(lagging):
+            after = min(qfq_marks[code] for code in batch)
+            _write(load_daily_with_factors(after, end_date, batch), latest, qfq_marks, hfq_marks, written)
+
+    for i, batch in enumerate(_batches(stale)):
+        _write(load_daily_with_factors(None, end_date, batch), latest, {}, hfq_marks, written)
+        logger.info(f"[复权行情] 已重新计算 {i * _REBUILD_BATCH_STOCKS + len(batch)}/{len(stale)} 只股票")
+    return written
+
+
+def _batches(codes: list[str]) -> list[list[str]]:
+    return [codes[i:i + _REBUILD_BATCH_STOCKS] for i in range(0, len(codes), _REBUILD_BATCH_STOCKS)]
+
+
+def _write(df: pd.DataFrame, latest: pd.Series, qfq_marks: dict[str, str], hfq_marks: dict[str, str], written: dict[str, int]):
+    """只写入晚于各股票水位的行"""
+    trade_dates = df['trade_date'].to_numpy(dtype=np.int64)
+    for table, marks, factors in ((DAILY_QFQ_TABLE, qfq_marks, latest), (DAILY_HFQ_TABLE, hfq_marks, None)):
+        after = pd.to_numeric(df['ts_code'].map(marks), errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+        rows = df[trade_dates > after]
+        if not rows.empty:
+            written[table] += save_data(compact_frame(adjust_prices(rows, factors), table), table)
+
+
+def latest_factors(end_date: str) -> pd.Series:
+    """各股票截至 ``end_date`` 的最新复权因子，索引为 ts_code"""
+    query = f"""
+    SELECT a.ts_code, a.adj_factor
+    FROM {ADJ_FACTOR_TABLE} a
+    JOIN (
+        SELECT ts_code, MAX(trade_date) AS trade_date FROM {ADJ_FACTOR_TABLE}
+        WHERE trade_date <= %(end_date)s GROUP BY ts_code
+    ) m ON m.ts_code = a.ts_code AND m.trade_date = a.trade_date
+    """
+    df = pd.read_sql(query, mysql_engine(), params={'end_date': int(end_date)})
+    return df.set_index('ts_code')['adj_factor'].astype(np.float64)
+
+
+def watermark_factors(table: str) -> pd.Series:
+    """各股票在复权表水位日的复权因子，即该表中最后一行使用的因子，索引为 ts_code"""
+    query = f"""
+    SELECT w.ts_code, a.adj_factor
+    FROM {WATERMARK_TABLE} w
+    JOIN {ADJ_FACTOR_TABLE} a ON a.ts_code = w.ts_code AND a.trade_date = CAST(w.last_date AS UNSIGNED)
+    WHERE w.dataset = %(dataset)s
+    """
+    df = pd.read_sql(query, mysql_engine(), params={'dataset': table})
+    return df.set_index('ts_code')['adj_factor'].astype(np.float64)
+
+
+def load_daily_with_factors(after: str | None, end_date: str, ts_codes: list[str] | None = None) -> pd.DataFrame:
+    """
+    读取 (after, end_date] 内的日线及当日复权因子，缺少因子的日线不返回
+
+    Args:
+        after: 不含的开始日期，为 None 时从最早的数据开始
+        end_date: 含的结束日期
+        ts_codes: 只读取这些股票
+    """
+    query = f"""
+    SELECT d.ts_code, d.trade_date, d.open, d.high, d.low, d.close, d.pre_close, d.pct_chg, d.vol, d.amount,
+           a.adj_factor
+    FROM {DAILY_TABLE} d
+    JOIN {ADJ_FACTOR_TABLE} a ON a.ts_code = d.ts_code AND a.trade_date = d.trade_date
+    WHERE d.trade_date > :after AND d.trade_date <= :end_date
+    """
+    params: dict[str, Any] = {'after': int(after or 0), 'end_date': int(end_date)}
+    statement = text(query)
+    if ts_codes is not None:
+        statement = text(query + " AND d.ts_code IN :ts_codes").bindparams(bindparam('ts_codes', expanding=True))
+        params['ts_codes'] = list(ts_codes)
+    with mysql_engine().connect() as conn:
+        return pd.read_sql(statement, conn, params=params)
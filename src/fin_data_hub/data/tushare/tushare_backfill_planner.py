@@ -0,0 +1,372 @@
+"""
+缺口感知的补全计划
+
+不再假设水位之前的数据都是完整的，而是把交易日历（以及每只股票的上市区间）
+与数据表中已存储的日期做反连接，找出真正缺失的单元格，生成最少的接口请求：
+- 整个交易日都没有数据：一次截面请求 (trade_date)
+- 个别股票缺失若干交易日：按连续缺失区间合并为 (ts_code, start_date, end_date) 请求
+- 同一交易日缺失的股票过多时，改为该日的一次截面请求
+
+停牌日、没有北向成交或 ST 数据的交易日在表中本就没有数据，请求会返回空结果（或只返回区间内的部分交易日）。
+执行计划时把每个请求的窗口记录到补全进度表的 ``{数据表}@checked`` 下，作为"已向接口确认过"的窗口；
+生成计划时扣除这些窗口内仍然缺失的单元格，重复执行计划会收敛到空计划。
+最近几天的窗口不记录，数据可能尚未发布；需要重新确认时使用 ``recheck``。
+"""
+import logging
+from typing import Any, Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare.constants import (
+    BACKFILL_PROGRESS_TABLE,
+    STOCK_BASIC_TABLE,
+    STOCK_ST_TABLE,
+    DAILY_TABLE,
+    DAILY_BASIC_TABLE,
+    ADJ_FACTOR_TABLE,
+    HSGT_TOP10_TABLE,
+)
+from fin_data_hub.data.tushare.tushare_backfill_progress import (
+    CROSS_SECTION_UNIT,
+    Checkpoint,
+    ensure_progress_tables,
+)
+from fin_data_hub.data.tushare.tushare_data import get_tushare_client
+from fin_data_hub.data.tushare.tushare_data_cache import get_trading_calendar
+from fin_data_hub.data.tushare.tushare_schema import compact_frame, normalize_date_columns
+from fin_data_hub.data.tushare.tushare_storage import save_data
+from fin_data_hub.data.tushare.tushare_trading_calendar import TradingCalendar
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine, table_exists
+from fin_data_hub.foundation.pipeline import run_pipeline
+from fin_data_hub.foundation.utils.date_utils import add_days, add_year, current_date_ymd, next_day
+
+logger = logging.getLogger(__name__)
+
+# 按股票请求的最大跨度（年），与日线接口单次返回上限匹配
+_RANGE_REQUEST_YEARS = 20
+
+# 结束日期在最近该自然日数内的请求不记录为已确认，数据可能尚未发布
+_CHECKED_SETTLE_DAYS = 7
+
+
+class BackfillRequest(NamedTuple):
+    """一次补全请求：trade_date 截面请求，或 ts_code 区间请求"""
+    dataset: str
+    trade_date: str | None = None
+    ts_code: str | None = None
+    start_date: str | None = None
+    end_date: str | None = None
+
+
+class DatasetSpec(NamedTuple):
+    """可规划补全的数据集"""
+    table: str
+    start_date: str
+    endpoint: str
+    calls_per_request: int
+    fetch_date: Callable[[Any, str], pd.DataFrame | None]
+    fetch_range: Callable[[Any, str, str, str], pd.DataFrame | None] | None = None
+
+
+def _fetch_hsgt_top10(client: Any, trade_date: str) -> pd.DataFrame:
+    df_1 = client.hsgt_top10(trade_date=trade_date, market_type='1')
+    df_3 = client.hsgt_top10(trade_date=trade_date, market_type='3')
+    return pd.concat([df_1, df_3], ignore_index=True)
+
+
+DATASETS: dict[str, DatasetSpec] = {
+    'daily': DatasetSpec(
+        DAILY_TABLE, '19901219', 'daily', 1,
+        lambda client, d: client.daily(trade_date=d),
+        lambda client, code, s, e: client.daily(ts_code=code, start_date=s, end_date=e),
+    ),
+    'daily_basic': DatasetSpec(
+        DAILY_BASIC_TABLE, '19901219', 'daily_basic', 1,
+        lambda client, d: client.daily_basic(ts_code='', trade_date=d),
+        lambda client, code, s, e: client.daily_basic(ts_code=code, start_date=s, end_date=e),
+    ),
+    'adj_factor': DatasetSpec(
+        ADJ_FACTOR_TABLE, '19901219', 'adj_factor', 1,
+        lambda client, d: client.adj_factor(ts_code='', trade_date=d),
+        lambda client, code, s, e: client.adj_factor(ts_code=code, start_date=s, end_date=e),
+    ),
+    'stock_st': DatasetSpec(
+        STOCK_ST_TABLE, '20160101', 'stock_st', 1,
+        lambda client, d: client.stock_st(trade_date=d),
+    ),
+    'hsgt_top10': DatasetSpec(
+        HSGT_TOP10_TABLE, '20030717', 'hsgt_top10', 2,
+        _fetch_hsgt_top10,
+    ),
+}
+
+
+def plan_backfill(
+    dataset: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    recheck: bool = False,
+) -> list[BackfillRequest]:
+    """
+    生成补全计划
+
+    Args:
+        dataset: 数据集名称，见 DATASETS
+        start_date: 开始日期，默认为数据集的起始日期
+        end_date: 结束日期，默认为昨天
+        recheck: 不扣除已向接口确认过没有数据的窗口，重新请求
+
+    Returns:
+        补全请求列表，截面请求在前
+    """
+    spec = DATASETS[dataset]
+    calendar = get_trading_calendar()
+    assert calendar is not None, "交易日历为空，请先补全交易日历"
+
+    start_date = start_date or spec.start_date
+    end_date = end_date or add_days(current_date_ymd(), -1)
+    trade_days = calendar.trading_days_array(start_date, end_date)
+    if trade_days.size == 0:
+        return []
+
+    stored = _stored_dates(spec.table, start_date, end_date)
+    missing_days = np.setdiff1d(trade_days, stored.index.to_numpy(dtype=np.int64))
+
+    checked = _empty_checked() if recheck else _checked_windows(spec.table, start_date, end_date)
+    # 已按截面确认过的交易日：不再截面请求，当日缺失的股票也不再按股票请求
+    checked_days = np.unique(checked.loc[checked['unit'] == CROSS_SECTION_UNIT, 'start'].to_numpy(dtype=np.int64))
+    covered_days = np.union1d(missing_days, checked_days)
+    missing_days = np.setdiff1d(missing_days, checked_days, assume_unique=True)
+
+    range_requests: list[BackfillRequest] = []
+    if spec.fetch_range is not None:
+        stock_gaps = _stock_gaps(spec.table, calendar, trade_days, covered_days, start_date, end_date)
+        stock_gaps = _drop_checked(stock_gaps, checked[checked['unit'] != CROSS_SECTION_UNIT])
+        # 同一交易日缺失股票数超过阈值时改为截面请求
+        if not stock_gaps.empty:
+            per_day = stock_gaps.groupby('trade_date')['ts_code'].count()
+            dense_days = per_day[per_day >= config.backfill_plan_cross_section_threshold].index.to_numpy(dtype=np.int64)
+            missing_days = np.union1d(missing_days, dense_days)
+            stock_gaps = stock_gaps[~stock_gaps['trade_date'].isin(dense_days)]
+            range_requests = _merge_ranges(dataset, stock_gaps, trade_days)
+
+    date_requests = [BackfillRequest(dataset, trade_date=str(day)) for day in missing_days]
+    return date_requests + range_requests
+
+
+def estimate_plan(plan: list[BackfillRequest]) -> tuple[int, float]:
+    """
+    估算计划的接口调用次数和耗时
+
+    Returns:
+        (调用次数, 预计耗时秒数)，耗时按接口每分钟调用上限估算
+    """
+    if not plan:
+        return 0, 0.0
+    spec = DATASETS[plan[0].dataset]
+    calls = len(plan) * spec.calls_per_request
+    calls_per_minute = min(
+        config.tushare_endpoint_calls_per_minute.get(spec.endpoint, config.tushare_default_endpoint_calls_per_minute),
+        config.tushare_calls_per_minute / config.tushare_endpoint_weights.get(spec.endpoint, 1),
+    )
+    return calls, calls / calls_per_minute * 60
+
+
+def execute_plan(plan: list[BackfillRequest]) -> int:
+    """
+    执行补全计划
+
+    Returns:
+        完成的请求数
+    """
+    if not plan:
+        return 0
+    spec = DATASETS[plan[0].dataset]
+    client = get_tushare_client()
+
+    settled = add_days(current_date_ymd(), -_CHECKED_SETTLE_DAYS)
+
+    def fetch(request: BackfillRequest):
+        if request.trade_date:
+            df = spec.fetch_date(client, request.trade_date)
+        else:
+            assert spec.fetch_range is not None
+            df = spec.fetch_range(client, request.ts_code, request.start_date, request.end_date)
+        logger.info(f"[补全计划] {request} 获取到 {0 if df is None else len(df)} 条数据")
+        # 没有数据的请求也需要写入，记录为已确认的窗口
+        return compact_frame(df, spec.table) if df is not None and not df.empty else pd.DataFrame()
+
+    def write(request: BackfillRequest, df: pd.DataFrame):
+        save_data(df, spec.table, checkpoint=_checked_checkpoint(spec.table, request, settled))
+
+    return run_pipeline(plan, fetch, write, name=f"补全计划-{plan[0].dataset}")
+
+
+def _checked_run_id(table: str) -> str:
+    """记录已确认窗口的进度键"""
+    return f"{table}@checked"
+
+
+def _checked_checkpoint(table: str, request: BackfillRequest, settled: str) -> Checkpoint | None:
+    """请求窗口对应的已确认进度点，窗口结束日期晚于 ``settled`` 时不记录"""
+    if request.trade_date:
+        unit, window_start, window_end = CROSS_SECTION_UNIT, request.trade_date, request.trade_date
+    else:
+        unit, window_start, window_end = request.ts_code, request.start_date, request.end_date
+    if window_end > settled:
+        return None
+    return Checkpoint(_checked_run_id(table), unit, window_start, window_end)
+
+
+def _empty_checked() -> pd.DataFrame:
+    return pd.DataFrame({'unit': pd.Series(dtype=object), 'start': pd.Series(dtype=np.int64),
+                         'end': pd.Series(dtype=np.int64)})
+
+
+def _checked_windows(table: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """与 [start_date, end_date] 相交的已确认窗口：unit start end"""
+    ensure_progress_tables()
+    query = f"""
+    SELECT unit, window_start, window_end FROM {BACKFILL_PROGRESS_TABLE}
+    WHERE run_id = %(run_id)s AND window_start <= %(end_date)s AND window_end >= %(start_date)s
+    """
+    df = pd.read_sql(query, mysql_engine(), params={
+        'run_id': _checked_run_id(table), 'start_date': start_date, 'end_date': end_date,
+    })
+    if df.empty:
+        return _empty_checked()
+    return pd.DataFrame({
+        'unit': df['unit'].astype(str),
+        'start': df['window_start'].astype(np.int64),
+        'end': df['window_end'].astype(np.int64),
+    })
+
+
+def _drop_checked(gaps: pd.DataFrame, windows: pd.DataFrame) -> pd.DataFrame:
+    """去掉落在同一股票已确认窗口内的缺口单元格"""
+    if gaps.empty or windows.empty:
+        return gaps
+    gaps = gaps.reset_index(drop=True)
+    merged = gaps.reset_index().merge(windows, left_on='ts_code', right_on='unit')
+    dates = merged['trade_date'].to_numpy(dtype=np.int64)
+    inside = (merged['start'].to_numpy() <= dates) & (dates <= merged['end'].to_numpy())
+    return gaps.drop(index=np.unique(merged.loc[inside, 'index'].to_numpy())).reset_index(drop=True)
+
+
+def _stored_dates(table: str, start_date: str, end_date: str) -> pd.Series:
+    """已存储的交易日及每日行数（走 trade_date 索引）"""
+    if not table_exists(table):
+        return pd.Series(dtype=np.int64)
+    query = f"""
+    SELECT trade_date, COUNT(*) AS n FROM {table}
+    WHERE trade_date BETWEEN :start_date AND :end_date
+    GROUP BY trade_date
+    """
+    with mysql_engine().connect() as conn:
+        rows = conn.execute(text(query), {'start_date': int(start_date), 'end_date': int(end_date)}).fetchall()
+    return pd.Series({int(row[0]): int(row[1]) for row in rows}, dtype=np.int64)
+
+
+def _listed_intervals(start_date: str, end_date: str) -> pd.DataFrame:
+    """每只股票在 [start_date, end_date] 内的上市区间"""
+    query = f"SELECT ts_code, list_date, delist_date FROM {STOCK_BASIC_TABLE}"
+    stocks = normalize_date_columns(pd.read_sql(query, mysql_engine())).dropna(subset=['list_date'])
+    stocks['first'] = np.maximum(stocks['list_date'].astype(np.int64), int(start_date))
+    stocks['last'] = np.minimum(stocks['delist_date'].fillna(end_date).astype(np.int64), int(end_date))
+    return stocks[stocks['first'] <= stocks['last']][['ts_code', 'first', 'last']]
+
+
+def _stock_gaps(
+    table: str,
+    calendar: TradingCalendar,
+    trade_days: np.ndarray,
+    missing_days: np.ndarray,
+    start_date: str,
+    end_date: str,
+) -> pd.DataFrame:
+    """
+    找出每只股票在上市区间内缺失的 (ts_code, trade_date) 单元格，已被截面请求覆盖的交易日除外
+
+    先用一次分组计数比较实际行数和应有行数，只对行数不足的股票读取已存储日期
+    """
+    intervals = _listed_intervals(start_date, end_date)
+    if intervals.empty:
+        return pd.DataFrame(columns=['ts_code', 'trade_date'])
+
+    expected = calendar.count_trading_days(intervals['first'].to_numpy(), intervals['last'].to_numpy())
+    # 扣除整日缺失（将由截面请求补全）的交易日
+    expected -= np.searchsorted(missing_days, intervals['last'].to_numpy(), side='right')
+    expected += np.searchsorted(missing_days, intervals['first'].to_numpy(), side='left')
+    intervals['expected'] = expected
+
+    counts = pd.DataFrame(columns=['ts_code', 'n'])
+    if table_exists(table):
+        query = f"""
+        SELECT ts_code, COUNT(*) AS n FROM {table}
+        WHERE trade_date BETWEEN %(start_date)s AND %(end_date)s
+        GROUP BY ts_code
+        """
+        counts = pd.read_sql(query, mysql_engine(), params={'start_date': int(start_date), 'end_date': int(end_date)})
+    intervals = intervals.merge(counts, on='ts_code', how='left')
+    intervals['n'] = intervals['n'].fillna(0).astype(np.int64)
+    deficient = intervals[intervals['n'] < intervals['expected']]
+    if deficient.empty:
+        return pd.DataFrame(columns=['ts_code', 'trade_date'])
+
+    logger.info(f"[补全计划] {table} 有 {len(deficient)} 只股票的数据行数不足，读取其已存储日期")
+    gaps = []
+    for batch_start in range(0, len(deficient), 500):
+        batch = deficient.iloc[batch_start:batch_start + 500]
+        stored = _stored_stock_dates(table, batch['ts_code'].tolist(), start_date, end_date)
+        for ts_code, first, last in zip(batch['ts_code'], batch['first'], batch['last']):
+            days = trade_days[(trade_days >= first) & (trade_days <= last)]
+            days = np.setdiff1d(days, missing_days, assume_unique=True)
+            absent = np.setdiff1d(days, stored.get(ts_code, np.empty(0, dtype=np.int64)), assume_unique=True)
+            if absent.size:
+                gaps.append(pd.DataFrame({'ts_code': ts_code, 'trade_date': absent}))
+    if not gaps:
+        return pd.DataFrame(columns=['ts_code', 'trade_date'])
+    return pd.concat(gaps, ignore_index=True)
+
+
+def _stored_stock_dates(table: str, ts_codes: list[str], start_date: str, end_date: str) -> dict[str, np.ndarray]:
+    """读取一批股票已存储的交易日"""
+    if not table_exists(table):
+        return {}
+    query = f"""
+    SELECT ts_code, trade_date FROM {table}
+    WHERE ts_code IN :ts_codes AND trade_date BETWEEN :start_date AND :end_date
+    """
+    statement = text(query).bindparams(bindparam('ts_codes', expanding=True))
+    with mysql_engine().connect() as conn:
+        df = pd.read_sql(statement, conn, params={
+            'ts_codes': ts_codes, 'start_date': int(start_date), 'end_date': int(end_date),
+        })
+    return {code: group['trade_date'].to_numpy(dtype=np.int64) for code, group in df.groupby('ts_code')}
+
+
+def _merge_ranges(dataset: str, gaps: pd.DataFrame, trade_days: np.ndarray) -> list[BackfillRequest]:
+    """把每只股票连续缺失的交易日合并为区间请求"""
+    if gaps.empty:
+        return []
+    gaps = gaps.sort_values(['ts_code', 'trade_date'])
+    position = np.searchsorted(trade_days, gaps['trade_date'].to_numpy(dtype=np.int64))
+    codes = gaps['ts_code'].to_numpy()
+    # 股票变化或交易日不连续时开始新区间
+    new_run = np.ones(len(gaps), dtype=bool)
+    new_run[1:] = (codes[1:] != codes[:-1]) | (position[1:] != position[:-1] + 1)
+    run_id = np.cumsum(new_run)
+    runs = pd.DataFrame({'ts_code': codes, 'trade_date': gaps['trade_date'].to_numpy(), 'run': run_id})
+    runs = runs.groupby('run').agg(ts_code=('ts_code', 'first'), start=('trade_date', 'min'), end=('trade_date', 'max'))
+
+    requests = []
+    for ts_code, start, end in zip(runs['ts_code'], runs['start'], runs['end']):
+        current_start = str(start)
+        while current_start <= str(end):
+            current_end = min(add_year(current_start, _RANGE_REQUEST_YEARS), str(end))
+            requests.append(BackfillRequest(dataset, ts_code=ts_code, start_date=current_start, end_date=current_end))
+            current_start = next_day(current_end)
+    return requests
@@ -0,0 +1,256 @@
+"""
+补全任务进度
+
+每个补全任务（run）记录在 ``tushare_backfill_run`` 中，任务内每个完成的 (单元, 日期窗口)
+记录在 ``tushare_backfill_progress`` 中。单元是股票代码，按交易日截面拉取的数据集使用 ``*``。
+
+进度与数据写入在同一事务内提交（见 ``save_data`` 的 ``checkpoint`` 参数），
+没有数据的窗口也会记录，恢复任务时已完成的窗口不会重新拉取。
+仍在运行的任务不能被恢复：只有失败的任务，或状态为 running 但超过 ``backfill_run_stale_seconds``
+没有进度（进程已退出）的任务才会被恢复，避免两个进程向同一个任务写入进度。
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, NamedTuple
+
+import pandas as pd
+from sqlalchemy import Connection, text
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare.constants import BACKFILL_PROGRESS_TABLE, BACKFILL_RUN_TABLE
+from fin_data_hub.foundation.monitoring.ingest_metrics import job_context
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
+from fin_data_hub.foundation.utils.date_utils import add_year, next_day
+
+logger = logging.getLogger(__name__)
+
+# 截面数据集的单元占位符
+CROSS_SECTION_UNIT = '*'
+
+_tables_ready = False
+_tables_lock = threading.Lock()
+
+
+class BackfillRunActiveError(RuntimeError):
+    """要恢复的补全任务仍在其他进程中运行"""
+
+    def __init__(self, run_id: str):
+        super().__init__(f"补全任务 {run_id} 仍在运行，不能恢复；等待其结束或超时后再使用 --resume")
+        self.run_id = run_id
+
+
+class Checkpoint(NamedTuple):
+    """一个待提交的进度点"""
+    run_id: str
+    unit: str
+    window_start: str
+    window_end: str
+
+
+class BackfillRun:
+    """一次补全任务"""
+
+    def __init__(self, run_id: str, dataset: str, end_date: str):
+        """
+        Args:
+            run_id: 任务 ID
+            dataset: 数据集名称（即数据表名）
+            end_date: 任务的结束日期，恢复任务时沿用，保证窗口划分不变
+        """
+        self.run_id = run_id
+        self.dataset = dataset
+        self.end_date = end_date
+
+    def checkpoint(self, unit: str, window_start: str, window_end: str | None = None) -> Checkpoint:
+        return Checkpoint(self.run_id, unit, window_start, window_end or window_start)
+
+    def completed(self) -> set[tuple[str, str]]:
+        """已完成的 (单元, 窗口开始日期)"""
+        query = f"SELECT unit, window_start FROM {BACKFILL_PROGRESS_TABLE} WHERE run_id = %(run_id)s"
+        df = pd.read_sql(query, mysql_engine(), params={'run_id': self.run_id})
+        return set(zip(df['unit'], df['window_start']))
+
+    def finish(self, status: str = 'done'):
+        """标记任务结束"""
+        with mysql_engine().begin() as conn:
+            conn.execute(
+                text(f"UPDATE {BACKFILL_RUN_TABLE} SET status = :status WHERE run_id = :run_id"),
+                {'run_id': self.run_id, 'status': status},
+            )
+
+
+def ensure_progress_tables():
+    """创建任务表和进度表（如不存在）"""
+    global _tables_ready
+    if _tables_ready:
+        return
+    with _tables_lock:
+        if _tables_ready:
+            return
+        run_ddl = f"""
+        CREATE TABLE IF NOT EXISTS {BACKFILL_RUN_TABLE} (
+            run_id VARCHAR(64) NOT NULL,
+            dataset VARCHAR(64) NOT NULL,
+            end_date CHAR(8) NOT NULL,
+            status VARCHAR(16) NOT NULL DEFAULT 'running',
+            started_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_id),
+            KEY idx_dataset (dataset, started_at)
+        )
+        """
+        progress_ddl = f"""
+        CREATE TABLE IF NOT EXISTS {BACKFILL_PROGRESS_TABLE} (
+            run_id VARCHAR(64) NOT NULL,
+            unit VARCHAR(16) NOT NULL,
+            window_start CHAR(8) NOT NULL,
+            window_end CHAR(8) NOT NULL,
+            `rows` INT NOT NULL DEFAULT 0,
+            finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_id, unit, window_start)
+        )
+        """
+        with mysql_engine().begin() as conn:
+            conn.execute(text(run_ddl))
+            conn.execute(text(progress_ddl))
+        _tables_ready = True
+
+
+def start_run(dataset: str, end_date: str, resume: bool = False) -> BackfillRun:
+    """
+    开始或恢复补全任务
+
+    Args:
+        dataset: 数据集名称（即数据表名）
+        end_date: 新任务的结束日期
+        resume: 恢复该数据集最近一次未完成的任务；没有未完成的任务时开始新任务
+
+    Returns:
+        补全任务
+
+    Raises:
+        BackfillRunActiveError: 最近一次未完成的任务仍在运行
+    """
+    ensure_progress_tables()
+    if resume:
+        # 最后活动时间取任务状态更新和最近一个进度点中较晚者
+        query = f"""
+        SELECT r.run_id, r.end_date, r.status, r.updated_at,
+               TIMESTAMPDIFF(SECOND, GREATEST(r.updated_at, COALESCE(MAX(p.finished_at), r.updated_at)), NOW()) AS idle_seconds
+        FROM {BACKFILL_RUN_TABLE} r
+        LEFT JOIN {BACKFILL_PROGRESS_TABLE} p ON p.run_id = r.run_id
+        WHERE r.dataset = %(dataset)s AND r.status <> 'done'
+        GROUP BY r.run_id, r.end_date, r.status, r.updated_at, r.started_at
+        ORDER BY r.started_at DESC LIMIT 1
+        """
+        df = pd.read_sql(query, mysql_engine(), params={'dataset': dataset})
+        if not df.empty:
+            row = df.iloc[0]
+            if row['status'] == 'running' and row['idle_seconds'] < config.backfill_run_stale_seconds:
+                raise BackfillRunActiveError(row['run_id'])
+            run = BackfillRun(row['run_id'], dataset, row['end_date'])
+            # 只在状态与读取时一致时接管，另一个进程同时恢复时只有一个能成功
+            with mysql_engine().begin() as conn:
+                claimed = conn.execute(
+                    text(f"""
+                    UPDATE {BACKFILL_RUN_TABLE} SET status = 'running', updated_at = CURRENT_TIMESTAMP
+                    WHERE run_id = :run_id AND status = :status AND updated_at = :updated_at
+                    """),
+                    {'run_id': run.run_id, 'status': row['status'], 'updated_at': pd.Timestamp(row['updated_at']).to_pydatetime()},
+                ).rowcount
+            if not claimed:
+                raise BackfillRunActiveError(run.run_id)
+            logger.info(f"[补全进度] 恢复任务 {run.run_id}（结束日期 {run.end_date}，原状态 {row['status']}）")
+            return run
+        logger.info(f"[补全进度] {dataset} 没有未完成的任务，开始新任务")
+
+    run = BackfillRun(f"{dataset}-{datetime.now().strftime('%Y%m%d%H%M%S')}", dataset, end_date)
+    with mysql_engine().begin() as conn:
+        conn.execute(
+            text(f"INSERT INTO {BACKFILL_RUN_TABLE} (run_id, dataset, end_date) VALUES (:run_id, :dataset, :end_date)"),
+            {'run_id': run.run_id, 'dataset': dataset, 'end_date': end_date},
+        )
+    logger.info(f"[补全进度] 开始任务 {run.run_id}（结束日期 {end_date}）")
+    return run
+
+
+@contextmanager
+def backfill_run(dataset: str, end_date: str, resume: bool = False) -> Iterator[BackfillRun]:
+    """
+    在补全任务中执行：正常结束时标记为完成，异常时标记为失败，之后可以用 ``resume`` 恢复；
+    期间的接口调用和写入指标以 ``backfill.{dataset}`` 作为 job_name
+
+    Args:
+        dataset: 数据集名称（即数据表名）
+        end_date: 新任务的结束日期
+        resume: 恢复该数据集最近一次未完成的任务
+    """
+    run = start_run(dataset, end_date, resume)
+    try:
+        with job_context(f"backfill.{dataset}"):
+            yield run
+    except BaseException:
+        run.finish('failed')
+        logger.error(f"[补全进度] 任务 {run.run_id} 中断，可使用 --resume 恢复")
+        raise
+    run.finish()
+    logger.info(f"[补全进度] 任务 {run.run_id} 已完成")
+
+
+def record_checkpoint(conn: Connection, checkpoint: Checkpoint, rows: int):
+    """
+    记录完成的窗口，需在数据写入的同一事务（连接）中调用
+
+    Args:
+        conn: 数据写入所用的事务连接
+        checkpoint: 进度点
+        rows: 该窗口写入的行数
+    """
+    ensure_progress_tables()
+    sql = f"""
+    INSERT INTO {BACKFILL_PROGRESS_TABLE} (run_id, unit, window_start, window_end, `rows`)
+    VALUES (:run_id, :unit, :window_start, :window_end, :rows)
+    ON DUPLICATE KEY UPDATE window_end = VALUES(window_end), `rows` = VALUES(`rows`)
+    """
+    conn.execute(text(sql), {**checkpoint._asdict(), 'rows': rows})
+
+
+def year_windows(start_date: str, end_date: str, years: int = 20) -> list[tuple[str, str]]:
+    """
+    把 [start_date, end_date] 按 ``years`` 年切分为窗口，起止日期相同时为单日窗口
+
+    窗口边界只取决于起止日期，任务中断后恢复时得到相同的窗口，已完成的窗口可以按开始日期跳过
+
+    Returns:
+        [(窗口开始日期, 窗口结束日期), ...]
+    """
+    windows = []
+    current_start = start_date
+    while current_start <= end_date:
+        current_end = min(add_year(current_start, years), end_date)
+        windows.append((current_start, current_end))
+        current_start = next_day(current_end)
+    return windows
+
+
+def get_run_status(limit: int = 20) -> pd.DataFrame:
+    """
+    最近的补全任务及其进度
+
+    Returns:
+        每个任务一行：run_id dataset end_date status started_at updated_at windows rows last_progress_at
+    """
+    ensure_progress_tables()
+    query = f"""
+    SELECT r.run_id, r.dataset, r.end_date, r.status, r.started_at, r.updated_at,
+           COUNT(p.unit) AS windows, COALESCE(SUM(p.`rows`), 0) AS `rows`,
+           MAX(p.finished_at) AS last_progress_at
+    FROM {BACKFILL_RUN_TABLE} r
+    LEFT JOIN {BACKFILL_PROGRESS_TABLE} p ON p.run_id = r.run_id
+    GROUP BY r.run_id, r.dataset, r.end_date, r.status, r.started_at, r.updated_at
+    ORDER BY r.started_at DESC
+    LIMIT {int(limit)}
+    """
+    return pd.read_sql(query, mysql_engine())
@@ -0,0 +1,152 @@
+"""
+缓存快照
+
+把股票列表、交易日历等内存缓存以 Feather（Arrow IPC 文件，不压缩）写到磁盘，
+启动时以内存映射方式加载，不再对 MySQL 执行全表查询。
+
+快照按代（generation）发布，多个 uvicorn 工作进程共享同一份文件：
+
+    {cache_snapshot_dir}/{name}.{generation}.feather   快照数据
+    {cache_snapshot_dir}/{name}.current                当前代号
+
+写入方先写新一代文件，再用 ``os.replace`` 原子替换 ``.current``；
+读取方只需读取很小的 ``.current`` 文件即可发现新一代，映射同一份文件，
+各进程共享操作系统页缓存中的同一份数据，无需各自查询 MySQL。
+
+快照元数据中记录格式版本和数据库版本戳，版本戳取自水位目录中该表的数据集水位及其更新时间，
+查询代价只有一次主键查找。
+"""
+import logging
+import os
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from sqlalchemy import text
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare.constants import WATERMARK_TABLE
+from fin_data_hub.data.tushare.tushare_watermark import DATASET_WATERMARK_KEY, ensure_watermark_table
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine, table_exists
+
+logger = logging.getLogger(__name__)
+
+# 快照文件格式版本，格式变化时递增，旧快照会被忽略
+SNAPSHOT_FORMAT_VERSION = '2'
+
+_FORMAT_KEY = b'fin_data_hub.format'
+_VERSION_KEY = b'fin_data_hub.version'
+
+# 保留的历史代数，其他进程可能仍在读取上一代
+_KEEP_GENERATIONS = 2
+
+
+class Snapshot(NamedTuple):
+    """一代缓存快照"""
+    data: pd.DataFrame
+    version: str
+    generation: int
+
+
+def snapshot_path(name: str, generation: int) -> Path:
+    return Path(config.cache_snapshot_dir) / f'{name}.{generation}.feather'
+
+
+def _pointer_path(name: str) -> Path:
+    return Path(config.cache_snapshot_dir) / f'{name}.current'
+
+
+def current_generation(name: str) -> int | None:
+    """读取当前代号，没有快照时返回 None"""
+    try:
+        return int(_pointer_path(name).read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def read_snapshot(name: str, generation: int | None = None) -> Snapshot | None:
+    """
+    以内存映射方式读取快照
+
+    Args:
+        name: 快照名称
+        generation: 代号，为 None 时读取当前代
+
+    Returns:
+        快照，不存在、格式不兼容或损坏时返回 None
+    """
+    generation = current_generation(name) if generation is None else generation
+    if generation is None:
+        return None
+    path = snapshot_path(name, generation)
+    try:
+        table = feather.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning(f"读取缓存快照 {path} 失败: {e}")
+        return None
+    metadata = table.schema.metadata or {}
+    if metadata.get(_FORMAT_KEY, b'').decode() != SNAPSHOT_FORMAT_VERSION:
+        logger.info(f"缓存快照 {path} 格式版本不兼容，忽略")
+        return None
+    # split_blocks 使数值列和字符串列直接引用映射的缓冲区，不复制数据
+    return Snapshot(table.to_pandas(split_blocks=True), metadata.get(_VERSION_KEY, b'').decode(), generation)
+
+
+def write_snapshot(name: str, df: pd.DataFrame, version: str) -> int:
+    """
+    发布新一代快照：先写数据文件，再原子替换当前代号
+
+    Returns:
+        新一代的代号
+    """
+    generation = time.time_ns()
+    path = snapshot_path(name, generation)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata.update({_FORMAT_KEY: SNAPSHOT_FORMAT_VERSION.encode(), _VERSION_KEY: version.encode()})
+    tmp_path = path.with_suffix('.tmp')
+    # 不压缩，加载时可以直接内存映射
+    feather.write_feather(table.replace_schema_metadata(metadata), tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+    pointer = _pointer_path(name)
+    tmp_pointer = pointer.with_suffix(f'.{generation}.tmp')
+    tmp_pointer.write_text(str(generation))
+    os.replace(tmp_pointer, pointer)
+    _remove_old_generations(name)
+    return generation
+
+
+def _remove_old_generations(name: str):
+    """删除较早的快照；已映射这些文件的进程仍可继续读取，直到切换到新一代"""
+    files = sorted(
+        Path(config.cache_snapshot_dir).glob(f'{name}.*.feather'),
+        key=lambda path: int(path.name.split('.')[-2]),
+    )
+    for path in files[:-_KEEP_GENERATIONS]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def get_db_version(table: str) -> str:
+    """
+    获取数据表的版本戳
+
+    优先使用水位目录中的数据集水位和更新时间；水位目录中没有该表时退化为行数
+    """
+    ensure_watermark_table()
+    query = f"SELECT last_date, updated_at FROM {WATERMARK_TABLE} WHERE dataset = :dataset AND ts_code = :ts_code"
+    with mysql_engine().connect() as conn:
+        row = conn.execute(text(query), {'dataset': table, 'ts_code': DATASET_WATERMARK_KEY}).fetchone()
+        if row is not None:
+            return f"{row[0]}@{row[1]}"
+        if not table_exists(table):
+            return ''
+        count = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+        return f"rows={count}"
@@ -0,0 +1,69 @@
+"""
+数据变更日志
+
+``save_data`` 在写入数据的同一事务内记录本次写入覆盖的 (数据集, 日期范围)。
+失效事件（``publish_invalidation``）只能通知写入数据的进程，API 工作进程通过定期读取变更日志
+发现补全脚本、复权重算等其他进程写入的数据，只移除日期范围与变更重叠的查询缓存条目。
+"""
+import logging
+import threading
+
+import pandas as pd
+from sqlalchemy import Connection, text
+
+from fin_data_hub.data.tushare.constants import CHANGE_LOG_TABLE
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
+
+logger = logging.getLogger(__name__)
+
+# 变更日志保留天数，读取方只关心最近的变更
+_RETENTION_DAYS = 7
+
+_table_ready = False
+_table_lock = threading.Lock()
+
+
+def ensure_change_log_table():
+    """创建变更日志表（如不存在），并清理超过保留天数的记录"""
+    global _table_ready
+    if _table_ready:
+        return
+    with _table_lock:
+        if _table_ready:
+            return
+        ddl = f"""
+        CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+            id BIGINT NOT NULL AUTO_INCREMENT,
+            dataset VARCHAR(64) NOT NULL,
+            start_date CHAR(8) NULL,
+            end_date CHAR(8) NULL,
+            changed_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            PRIMARY KEY (id),
+            KEY idx_changed_at (changed_at)
+        )
+        """
+        with mysql_engine().begin() as conn:
+            conn.execute(text(ddl))
+            conn.execute(
+                text(f"DELETE FROM {CHANGE_LOG_TABLE} WHERE changed_at < NOW(6) - INTERVAL :days DAY"),
+                {'days': _RETENTION_DAYS},
+            )
+        _table_ready = True
+
+
+def record_change(conn: Connection, dataset: str, dates: pd.Series | None):
+    """
+    记录一次写入覆盖的日期范围，需在数据写入的同一事务（连接）中调用
+
+    Args:
+        conn: 数据写入所用的事务连接
+        dataset: 数据集名称（即数据表名）
+        dates: 写入涉及的日期，为 None 或没有有效日期时记录为整个数据集
+    """
+    ensure_change_log_table()
+    dates = None if dates is None else dates.dropna()
+    start_date, end_date = (None, None) if dates is None or dates.empty else (str(dates.min()), str(dates.max()))
+    conn.execute(
+        text(f"INSERT INTO {CHANGE_LOG_TABLE} (dataset, start_date, end_date) VALUES (:dataset, :start_date, :end_date)"),
+        {'dataset': dataset, 'start_date': start_date, 'end_date': end_date},
+    )
@@ -0,0 +1,140 @@
+"""
+Tushare 客户端限流
+
+所有 Tushare 接口调用经过进程内共享的令牌桶：
+1. 每个接口一个令牌桶，按接口的每分钟调用上限放行
+2. 账号级总令牌桶，每次调用按接口权重扣减
+3. 接口返回限流错误时，暂停该接口的令牌桶并指数退避后重试
+
+调度器线程池中并发运行的任务共享同一组令牌桶，整体调用速率贴合配额上限。
+每次调用的耗时、限流等待时间、返回行数和数据量记录到入库指标中。
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+import pandas as pd
+
+from fin_data_hub.config import config
+from fin_data_hub.foundation.monitoring.ingest_metrics import record_api_call
+from fin_data_hub.foundation.pipeline.fetch_write_pipeline import result_nbytes
+from fin_data_hub.foundation.ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Tushare 限流错误信息中的关键字
+_RATE_LIMIT_MESSAGES = ('每分钟最多访问', '每小时最多访问', '访问频率', '请求过于频繁')
+
+_global_bucket: TokenBucket | None = None
+_endpoint_buckets: dict[str, TokenBucket] = {}
+_endpoint_backoff: dict[str, float] = {}
+_bucket_lock = threading.Lock()
+
+
+def get_global_bucket() -> TokenBucket:
+    """获取账号级总令牌桶"""
+    global _global_bucket
+    if _global_bucket is None:
+        with _bucket_lock:
+            if _global_bucket is None:
+                _global_bucket = TokenBucket(config.tushare_calls_per_minute)
+    return _global_bucket
+
+
+def get_endpoint_bucket(endpoint: str) -> TokenBucket:
+    """获取接口令牌桶"""
+    bucket = _endpoint_buckets.get(endpoint)
+    if bucket is None:
+        with _bucket_lock:
+            bucket = _endpoint_buckets.get(endpoint)
+            if bucket is None:
+                calls_per_minute = config.tushare_endpoint_calls_per_minute.get(
+                    endpoint, config.tushare_default_endpoint_calls_per_minute
+                )
+                bucket = TokenBucket(calls_per_minute)
+                _endpoint_buckets[endpoint] = bucket
+    return bucket
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """判断异常是否为 Tushare 限流错误"""
+    message = str(error)
+    return any(keyword in message for keyword in _RATE_LIMIT_MESSAGES)
+
+
+def call_with_rate_limit(endpoint: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    在限流保护下调用 Tushare 接口
+
+    Args:
+        endpoint: 接口名称，如 'daily'
+        func: 实际调用的函数
+    """
+    endpoint_bucket = get_endpoint_bucket(endpoint)
+    weight = config.tushare_endpoint_weights.get(endpoint, 1)
+
+    attempt = 0
+    while True:
+        wait_start = time.perf_counter()
+        endpoint_bucket.acquire()
+        get_global_bucket().acquire(weight)
+        call_start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            record_api_call(
+                endpoint, time.perf_counter() - call_start, call_start - wait_start,
+                error='rate_limit' if rate_limited else 'error',
+            )
+            if not rate_limited or attempt >= config.tushare_rate_limit_max_retries:
+                raise
+            attempt += 1
+            backoff = _next_backoff(endpoint)
+            logger.warning(f"Tushare接口 {endpoint} 触发限流，{backoff:.1f} 秒后第 {attempt} 次重试: {e}")
+            endpoint_bucket.pause(backoff)
+            continue
+        record_api_call(
+            endpoint, time.perf_counter() - call_start, call_start - wait_start,
+            rows=len(result) if isinstance(result, pd.DataFrame) else None,
+            payload_bytes=result_nbytes(result),
+        )
+        _endpoint_backoff.pop(endpoint, None)
+        return result
+
+
+def _next_backoff(endpoint: str) -> float:
+    """计算接口的下一次退避时间（指数增长，封顶）"""
+    with _bucket_lock:
+        previous = _endpoint_backoff.get(endpoint)
+        if previous is None:
+            backoff = config.tushare_rate_limit_backoff_seconds
+        else:
+            backoff = min(previous * 2, config.tushare_rate_limit_max_backoff_seconds)
+        _endpoint_backoff[endpoint] = backoff
+    return backoff
+
+
+class RateLimitedClient:
+    """
+    Tushare pro_api 客户端代理
+
+    ``client.daily(...)`` 等接口调用统一经过 ``call_with_rate_limit``。
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def query(self, api_name: str, fields: str = '', **kwargs) -> Any:
+        return call_with_rate_limit(api_name, self._client.query, api_name, fields=fields, **kwargs)
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        func = getattr(self._client, name)
+
+        def wrapper(*args, **kwargs):
+            return call_with_rate_limit(name, func, *args, **kwargs)
+
+        return wrapper
@@ -7,10 +7,10 @@ import pandas as pd
 import tushare as ts
 from apscheduler.triggers.cron import CronTrigger
 
-from fin_data_hub.foundation.scheduler import get_scheduler
+from fin_data_hub.foundation.scheduler import LeaseLostError, check_lease, get_scheduler, leased_job
 from fin_data_hub.config import config
+from fin_data_hub.foundation.monitoring.ingest_metrics import job_context
 from fin_data_hub.foundation.monitoring.telemetry import get_service_meter
-from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
 from fin_data_hub.foundation.utils.date_utils import (
     future_year_end, 
     get_stock_start_date, 
@@ -19,10 +19,23 @@ from fin_data_hub.foundation.utils.date_utils import (
 )
 from fin_data_hub.data.tushare.constants import (
     STOCK_BASIC_TABLE, 
+    STOCK_BASIC_FIELDS,
     TRADE_CALENDAR_TABLE, 
     DAILY_TABLE,
+    WEEKLY_TABLE,
+    MONTHLY_TABLE,
+    ADJ_FACTOR_TABLE,
+    DAILY_HFQ_TABLE,
     STOCK_ST_TABLE
 )
+from fin_data_hub.data.tushare.tushare_adjust import update_adjusted_prices
+from fin_data_hub.data.tushare.tushare_client import RateLimitedClient
+from fin_data_hub.data.tushare.tushare_resample import resample_table
+from fin_data_hub.data.tushare.tushare_response_cache import CachedClient
+from fin_data_hub.data.tushare.tushare_statements import STATEMENTS, open_periods, sync_open_periods
+from fin_data_hub.data.tushare.tushare_storage import save_data
+from fin_data_hub.data.tushare.tushare_parquet import export_tables
+from fin_data_hub.data.tushare.tushare_watermark import get_dataset_watermark, get_watermarks
 logger = logging.getLogger(__name__)
 
 # 初始化metrics
@@ -42,8 +55,9 @@ _running_lock = threading.Lock()
 def wrap_tushare(func: Callable) -> Callable:
     """
     包装 tushare 函数, 标记为 tushare 函数
-    1. 使用 OpenTelemetry metrics 统计调用耗时
+    1. 使用 OpenTelemetry metrics 统计调用耗时，执行期间的接口调用和写入指标以函数名作为 job_name
     2. 防重复调用
+    3. 异常只记录日志，租约丢失（``LeaseLostError``）除外
     """
     def wrapper(*args, **kwargs):
         # 线程安全地检查是否正在运行
@@ -57,9 +71,14 @@ def wrap_tushare(func: Callable) -> Callable:
         
         start_time = time.time()
         try:
-            result = func(*args, **kwargs)
+            with job_context(func.__name__):
+                result = func(*args, **kwargs)
             success = True
             return result
+        except LeaseLostError:
+            # 租约丢失需要中止整个定时任务，不能在这里吞掉
+            success = False
+            raise
         except Exception as e:
             success = False
             logger.error(f"Tushare函数 {func.__name__} 执行失败: {e}")
@@ -81,19 +100,55 @@ def wrap_tushare(func: Callable) -> Callable:
     return wrapper
 
 def get_tushare_client() -> Any:
-    """获取 Tushare 客户端"""
+    """获取 Tushare 客户端
+
+    返回的客户端经过共享令牌桶限流，调用方无需自行 sleep；
+    开启 ``tushare_response_cache_enabled`` 时，历史区间的响应从本地磁盘缓存读取
+    """
     global _tushare_client
     if _tushare_client is None:
         assert config.tushare_token, "Tushare token is not set"
         ts.set_token(config.tushare_token)  
-        _tushare_client = ts.pro_api()
+        client = RateLimitedClient(ts.pro_api())
+        if config.tushare_response_cache_enabled:
+            client = CachedClient(client)
+        _tushare_client = client
     return _tushare_client
 
 def is_trade_day(date_str: str) -> bool:
     """判断是否为交易日"""
-    from fin_data_hub.data.tushare.tushare_data_cache import get_trade_calendar_cache
-    trade_calendar = get_trade_calendar_cache()
-    return trade_calendar[trade_calendar['cal_date'] == date_str]['is_open'].iloc[0]
+    from fin_data_hub.data.tushare.tushare_data_cache import get_trading_calendar
+    calendar = get_trading_calendar()
+    return calendar is not None and calendar.is_open(date_str)
+
+def get_trade_days(start_date: str, end_date: str) -> list[str]:
+    """获取区间内的交易日列表（含首尾），按日期升序
+
+    Args:
+        start_date: 开始日期，格式为 'YYYYMMDD'
+        end_date: 结束日期，格式为 'YYYYMMDD'
+    """
+    from fin_data_hub.data.tushare.tushare_data_cache import get_trading_calendar
+    calendar = get_trading_calendar()
+    if calendar is None:
+        logger.warning("交易日历为空，无法计算交易日")
+        return []
+    return calendar.trading_days(start_date, end_date)
+
+def get_period_end_trade_days(start_date: str, end_date: str, freq: str) -> list[str]:
+    """获取区间内每周（freq='W'）或每月（freq='M'）的最后一个交易日
+
+    Args:
+        start_date: 开始日期，格式为 'YYYYMMDD'
+        end_date: 结束日期，格式为 'YYYYMMDD'
+        freq: 'W' 或 'M'
+    """
+    from fin_data_hub.data.tushare.tushare_data_cache import get_trading_calendar
+    calendar = get_trading_calendar()
+    if calendar is None:
+        logger.warning("交易日历为空，无法计算周期末交易日")
+        return []
+    return calendar.period_ends(start_date, end_date, freq)
 
 
 # =============================================================================
@@ -104,20 +159,20 @@ def is_trade_day(date_str: str) -> bool:
 def sync_stock_basic_data() -> pd.DataFrame | None:
     """股票列表
     
-    字段：ts_code symbol name area industry cnspell market list_date act_name act_ent_type
+    字段：ts_code symbol name area industry cnspell market list_date delist_date act_name act_ent_type
     """
     client = get_tushare_client()
 
-    l_data = client.stock_basic(exchange='', list_status='L')
+    l_data = client.stock_basic(exchange='', list_status='L', fields=STOCK_BASIC_FIELDS)
     l_data['status'] = 'L'
 
-    d_data = client.stock_basic(exchange='', list_status='D')
+    d_data = client.stock_basic(exchange='', list_status='D', fields=STOCK_BASIC_FIELDS)
     d_data['status'] = 'D'
 
     data = pd.concat([l_data, d_data], ignore_index=True)
 
     if data is not None and not data.empty:
-        data.to_sql(STOCK_BASIC_TABLE, con=mysql_engine(), if_exists='replace', index=False)
+        save_data(data, STOCK_BASIC_TABLE, date_column=None)
         from fin_data_hub.data.tushare.tushare_data_cache import update_stock_basic_cache
         update_stock_basic_cache(data)
     logger.info(f"【股票列表】获取到 {len(data)} 条股票数据")
@@ -134,7 +189,7 @@ def sync_trade_calendar_data() -> pd.DataFrame | None:
     end_date = future_year_end(0)
     df = client.trade_cal(exchange='', start_date=start_date, end_date=end_date)
     if df is not None and not df.empty:
-        df.to_sql(TRADE_CALENDAR_TABLE, con=mysql_engine(), if_exists='replace', index=False)
+        save_data(df, TRADE_CALENDAR_TABLE, date_column=None)
         from fin_data_hub.data.tushare.tushare_data_cache import update_trade_calendar_cache
         update_trade_calendar_cache(df)
     logger.info(f"【交易日历】获取到 {len(df)} 条交易日历数据")
@@ -149,29 +204,23 @@ def sync_stock_st_data() -> pd.DataFrame | None:
     字段：ts_code name trade_date type type_name
     """
 
-    query = f"SELECT MAX(trade_date) as last_date FROM {STOCK_ST_TABLE}"
-    result = pd.read_sql(query, mysql_engine())
-    start_date = result['last_date'].iloc[0]
-    if not start_date:
-        start_date = '20160101'
+    last_date = get_dataset_watermark(STOCK_ST_TABLE)
+    start_date = next_day(last_date) if last_date else '20160101'
 
     current_date = current_date_ymd()
-    if start_date >= current_date:
-        logger.info(f"【ST股票列表】数据已是最新（{start_date}），无需更新")
+    if start_date > current_date:
+        logger.info(f"【ST股票列表】数据已是最新（{last_date}），无需更新")
         return None
 
     client = get_tushare_client()
 
-    while start_date <= current_date:
-        time.sleep(0.5)
-        df = client.stock_st(trade_date=start_date)
+    for trade_date in get_trade_days(start_date, current_date):
+        df = client.stock_st(trade_date=trade_date)
         if df is None or df.empty:
-            logger.info(f"【ST股票列表】从 {start_date} 获取到 0 条ST股票列表数据")
-            start_date = next_day(start_date)
+            logger.info(f"【ST股票列表】从 {trade_date} 获取到 0 条ST股票列表数据")
             continue
-        df.to_sql(STOCK_ST_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        logger.info(f"【ST股票列表】从 {start_date} 获取到 {len(df)} 条ST股票列表数据")
-        start_date = next_day(start_date)
+        save_data(df, STOCK_ST_TABLE)
+        logger.info(f"【ST股票列表】从 {trade_date} 获取到 {len(df)} 条ST股票列表数据")
     return
 
 # =============================================================================
@@ -179,53 +228,222 @@ def sync_stock_st_data() -> pd.DataFrame | None:
 # =============================================================================
 
 @wrap_tushare
-def sync_daily_data() -> None:
+def sync_daily_data(mode: str = 'trade_date') -> None:
     """日线行情
 
     交易日每天15点～16点之间入库
-    
+
+    同步模式：
+    - trade_date（默认）：按交易日切片，从交易日历中找出库中缺失的交易日，
+      每个交易日调用一次 ``daily(trade_date=...)`` 拉取全市场截面；
+      仅对库中尚无数据的新上市/待补全股票回退为按股票拉取
+    - ts_code：逐只股票拉取（旧模式）
+
     字段：ts_code trade_date open high low close pre_close change pct_chg vol amount
     """
+    if mode == 'ts_code':
+        _sync_daily_data_by_ts_code()
+        return
+    _sync_daily_data_by_trade_date()
+
+
+def _sync_daily_data_by_trade_date() -> None:
+    """日线行情 - 按交易日切片同步"""
+    from fin_data_hub.data.tushare.tushare_data_cache import get_stock_universe
+    universe = get_stock_universe()
+
+    client = get_tushare_client()
+    end_date = current_date_ymd()
+
+    last_dates = get_watermarks(DAILY_TABLE)
+    if not last_dates:
+        logger.info("[日线行情] 日线数据表为空，回退为按股票全量拉取")
+        _sync_daily_data_by_ts_code()
+        return
+    dataset_last_date = max(last_dates.values())
+
+    # 新上市或待补全的股票：库中没有任何数据，且上市日期早于全表最新交易日，
+    # 截面拉取覆盖不到它们的历史，需要按股票回退拉取
+    if universe is not None:
+        listed = universe.filter(status='L')
+        pending = listed[
+            (~listed['ts_code'].isin(list(last_dates)))
+            & (listed['list_date'] <= dataset_last_date)
+        ]
+        for ts_code, list_date in zip(pending['ts_code'], pending['list_date']):
+            _sync_daily_data_of_ts_code(client, ts_code, list_date, dataset_last_date)
+
+    trade_days = get_trade_days(next_day(dataset_last_date), end_date)
+    if not trade_days:
+        logger.info(f"[日线行情] 数据已是最新（{dataset_last_date}），无需更新")
+        return
+
+    for trade_date in trade_days:
+        df = client.daily(trade_date=trade_date)
+        if df is None or df.empty:
+            # 当日数据尚未发布，后续交易日也不会有数据，等待下次调度
+            logger.info(f"[日线行情] {trade_date} 暂无日线行情数据，停止本次同步")
+            break
+        save_data(df, DAILY_TABLE)
+        logger.info(f"[日线行情] 获取到 {len(df)} 条 {trade_date} 的日线行情数据")
+
+
+def _sync_daily_data_by_ts_code() -> None:
+    """日线行情 - 逐只股票同步"""
     from fin_data_hub.data.tushare.tushare_data_cache import get_stock_basic_cache
-    stock_list = get_stock_basic_cache()   
+    stock_list = get_stock_basic_cache()
 
     client = get_tushare_client()
+    end_date = current_date_ymd()
+
+    last_dates = get_watermarks(DAILY_TABLE)
 
-    for index, row in stock_list.iterrows():
-        ts_code = row['ts_code']
-        query = f"SELECT MAX(trade_date) as last_date FROM {DAILY_TABLE} WHERE ts_code = '{ts_code}'"
-        df = pd.read_sql(query, mysql_engine())
-        start_date = row['list_date']
-        if not df.empty:
-            last_date = df['last_date'].iloc[0]
+    for ts_code, list_date in zip(stock_list['ts_code'], stock_list['list_date']):
+        start_date = list_date
+        last_date = last_dates.get(ts_code)
+        if last_date:
             start_date = next_day(last_date)
+        _sync_daily_data_of_ts_code(client, ts_code, start_date, end_date)
 
-        end_date = current_date_ymd()
-        if end_date < start_date:
-            logger.info(f"[日线行情] {ts_code} 当前日期 {end_date} 小于开始日期 {start_date}，跳过")
-            continue
 
-        time.sleep(0.5)
-        df = client.daily(ts_code=ts_code, start_date=start_date, end_date=end_date)
-        if df is not None and not df.empty:
-            df.to_sql(DAILY_TABLE, con=mysql_engine(), if_exists='append', index=False)
-        logger.info(f"[日线行情] 从 {start_date} 到 {end_date} 获取到 {len(df)} 条 {ts_code} 的日线行情数据")
+def _sync_daily_data_of_ts_code(client: Any, ts_code: str, start_date: str, end_date: str) -> None:
+    """按股票拉取指定区间的日线行情并入库"""
+    if end_date < start_date:
+        logger.info(f"[日线行情] {ts_code} 结束日期 {end_date} 小于开始日期 {start_date}，跳过")
+        return
+
+    df = client.daily(ts_code=ts_code, start_date=start_date, end_date=end_date)
+    save_data(df, DAILY_TABLE)
+    logger.info(f"[日线行情] 从 {start_date} 到 {end_date} 获取到 {0 if df is None else len(df)} 条 {ts_code} 的日线行情数据")
+
+
+@wrap_tushare
+def sync_weekly_data() -> None:
+    """周线行情
+
+    日线同步完成后从日线重采样生成已结束的周，不调用接口
+
+    字段：ts_code trade_date open high low close pre_close change pct_chg vol amount
+    """
+    rows = resample_table('W')
+    logger.info(f"[周线行情] 从日线生成 {rows} 条周线行情数据")
+
+
+@wrap_tushare
+def sync_monthly_data() -> None:
+    """月线行情
+
+    日线同步完成后从日线重采样生成已结束的月，不调用接口
+
+    字段：ts_code trade_date open high low close pre_close change pct_chg vol amount
+    """
+    rows = resample_table('M')
+    logger.info(f"[月线行情] 从日线生成 {rows} 条月线行情数据")
+
+
+@wrap_tushare
+def sync_adj_factor_data() -> None:
+    """复权因子
+
+    按交易日截面拉取；数据表为空时需先用补全脚本（--plan adj_factor）补全历史
+
+    字段：ts_code trade_date adj_factor
+    """
+    last_date = get_dataset_watermark(ADJ_FACTOR_TABLE)
+    if last_date is None:
+        logger.warning("[复权因子] 复权因子数据表为空，请先运行补全脚本 --plan adj_factor")
+        return
+
+    client = get_tushare_client()
+    for trade_date in get_trade_days(next_day(last_date), current_date_ymd()):
+        df = client.adj_factor(ts_code='', trade_date=trade_date)
+        if df is None or df.empty:
+            logger.info(f"[复权因子] {trade_date} 暂无复权因子数据，停止本次同步")
+            break
+        save_data(df, ADJ_FACTOR_TABLE)
+        logger.info(f"[复权因子] 获取到 {len(df)} 条 {trade_date} 的复权因子数据")
+
+
+@wrap_tushare
+def sync_adjusted_daily_data() -> None:
+    """前复权、后复权日线
+
+    日线和复权因子入库后增量更新，只有发生除权除息的股票整段重新计算前复权
+
+    字段：ts_code trade_date open high low close pre_close change pct_chg vol amount adj_factor
+    """
+    written = update_adjusted_prices()
+    logger.info(f"[复权行情] 写入 {written}")
+
+
+@wrap_tushare
+def sync_financial_statements() -> None:
+    """利润表、资产负债表、现金流量表
+
+    按报告期拉取全市场报表，只重新拉取报告期结束后 ``statement_restatement_days`` 天内的报告期，
+    更正后的报告按主键覆盖；更早的报告期需用补全脚本（script_tushare_backfill_fin）补全
+    """
+    periods = open_periods()
+    for name, spec in STATEMENTS.items():
+        check_lease()
+        rows = sync_open_periods(name)
+        logger.info(f"[{spec.label}] 重新拉取报告期 {', '.join(periods)}，写入 {rows} 条")
+
 
 scheduler = get_scheduler()
 
-# 添加调度任务
+def export_parquet(table: str, start_date: str | None = None):
+    """同步完成后增量导出 Parquet 镜像，导出失败不影响同步任务"""
+    if config.parquet_export_enabled:
+        export_tables([table], start_date=start_date)
+
+# 添加调度任务，多个工作进程/节点中只有获取到租约的进程执行
 @scheduler.scheduled_job(CronTrigger(day=1, hour=1, minute=0))  # 每月1号凌晨1点
+@leased_job()
 def scheduled_sync_trade_calendar():
-    return sync_trade_calendar_data()
+    sync_trade_calendar_data()
+    export_parquet(TRADE_CALENDAR_TABLE)
 
 @scheduler.scheduled_job(CronTrigger(hour=8, minute=15))  # 每天早上8点15分
+@leased_job()
 def scheduled_sync_stock_basic():
-    return sync_stock_basic_data()
+    sync_stock_basic_data()
+    export_parquet(STOCK_BASIC_TABLE)
 
 @scheduler.scheduled_job(CronTrigger(hour=17, minute=3))  # 每天下午5点3分
+@leased_job()
 def scheduled_sync_daily():
-    return sync_daily_data()
+    # 每个步骤完成后、导出镜像之前检查租约，租约丢失（已由其他进程接管）时中止
+    sync_daily_data()
+    check_lease()
+    export_parquet(DAILY_TABLE)
+    # 周线、月线由日线生成，在日线入库后更新
+    sync_weekly_data()
+    check_lease()
+    export_parquet(WEEKLY_TABLE)
+    sync_monthly_data()
+    check_lease()
+    export_parquet(MONTHLY_TABLE)
+    # 复权因子在开盘前发布，收盘后与日线一起生成复权行情
+    sync_adj_factor_data()
+    check_lease()
+    export_parquet(ADJ_FACTOR_TABLE)
+    sync_adjusted_daily_data()
+    check_lease()
+    export_parquet(DAILY_HFQ_TABLE)
 
 @scheduler.scheduled_job(CronTrigger(hour=9, minute=21))  # 每天上午9点21分
+@leased_job()
 def scheduled_sync_stock_st():
-    return sync_stock_st_data()
+    sync_stock_st_data()
+    export_parquet(STOCK_ST_TABLE)
+
+@scheduler.scheduled_job(CronTrigger(hour=21, minute=7))  # 每天晚上9点7分，财报多在盘后公告
+@leased_job()
+def scheduled_sync_financial_statements():
+    sync_financial_statements()
+    check_lease()
+    # 较早报告期的更正也需要重写对应月份的镜像
+    periods = open_periods()
+    for spec in STATEMENTS.values():
+        export_parquet(spec.table, start_date=periods[0] if periods else None)
@@ -1,63 +1,237 @@
 import logging
+import threading
 from typing import Optional
 
 import pandas as pd
+from apscheduler.triggers.interval import IntervalTrigger
 
+from fin_data_hub.config import config
 from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine, table_exists
+from fin_data_hub.foundation.scheduler import get_scheduler
 from fin_data_hub.data.tushare.constants import STOCK_BASIC_TABLE, TRADE_CALENDAR_TABLE
+from fin_data_hub.data.tushare.tushare_cache_snapshot import (
+    Snapshot,
+    current_generation,
+    get_db_version,
+    read_snapshot,
+    write_snapshot,
+)
+from fin_data_hub.data.tushare.tushare_schema import normalize_date_columns
+from fin_data_hub.data.tushare.tushare_stock_universe import UNIVERSE_COLUMNS, StockUniverse
+from fin_data_hub.data.tushare.tushare_trading_calendar import TradingCalendar
 
 logger = logging.getLogger(__name__)
 
 
-_stock_basic_cache: pd.DataFrame = pd.DataFrame()
+_stock_universe: Optional[StockUniverse] = None
 _trade_calendar_cache: pd.DataFrame = pd.DataFrame()
+_trading_calendar: Optional[TradingCalendar] = None
+# 各缓存当前数据对应的数据库版本戳和快照代号
+_cache_versions: dict[str, str] = {}
+_cache_generations: dict[str, int] = {}
+_refresh_lock = threading.Lock()
 def init_cache():
     """
-    初始化股票数据缓存
+    初始化股票列表和交易日历缓存
+
+    优先以内存映射方式加载当前一代的磁盘快照（多个工作进程共享同一份文件），并用数据库版本戳校验：
+    - 版本一致：直接使用快照，不查询数据表
+    - 版本不一致：先使用快照提供服务，后台线程从数据库刷新
+    - 没有快照：同步从数据库加载并发布快照
     """
-    global _stock_basic_cache
-    _stock_basic_cache = get_stock_basic_from_db()
-    global _trade_calendar_cache
-    _trade_calendar_cache = get_trade_calendar_from_db()
+    stale: list[str] = []
+    for table in _CACHES:
+        snapshot = read_snapshot(table)
+        if snapshot is None:
+            refresh_cache([table], force=True)
+            continue
+        _attach_snapshot(table, snapshot)
+        try:
+            current_version = get_db_version(table)
+        except Exception as e:
+            logger.warning(f"获取 {table} 的数据库版本戳失败，稍后后台刷新: {e}")
+            current_version = None
+        if current_version != snapshot.version:
+            stale.append(table)
+    if stale:
+        logger.info(f"缓存快照 {stale} 已过期，后台刷新")
+        threading.Thread(target=refresh_cache, args=(stale,), name="cache-refresh", daemon=True).start()
+
+
+def refresh_cache(tables: list[str] | None = None, force: bool = False):
+    """
+    数据库版本戳变化时刷新缓存
+
+    如果其他进程已经按最新版本戳发布了快照，直接映射该快照；否则从数据库加载并发布新一代快照
+
+    Args:
+        tables: 需要刷新的数据表，为 None 时刷新全部缓存
+        force: 忽略版本戳，强制重新加载
+    """
+    with _refresh_lock:
+        for table in tables or list(_CACHES):
+            loader, setter, _ = _CACHES[table]
+            try:
+                version = get_db_version(table)
+                if not force and _cache_versions.get(table) == version:
+                    continue
+                snapshot = _read_newer_snapshot(table)
+                if not force and snapshot is not None and snapshot.version == version:
+                    _attach_snapshot(table, snapshot)
+                    continue
+                df = loader()
+                if df.empty:
+                    continue
+                _save_snapshot(table, setter(df), version)
+                logger.info(f"从数据库刷新缓存 {table}，共 {len(df)} 条数据")
+            except Exception as e:
+                logger.error(f"刷新缓存 {table} 失败: {e}")
+
+
+def attach_latest_snapshots():
+    """
+    检查快照代号，其他进程发布了新一代快照时直接映射，不查询 MySQL
+
+    只读取很小的代号文件，可以高频调用
+    """
+    for table in _CACHES:
+        snapshot = _read_newer_snapshot(table)
+        if snapshot is not None:
+            _attach_snapshot(table, snapshot)
+
+
+def start_cache_refresh():
+    """
+    启动后台任务：
+    - 按 ``cache_generation_check_seconds`` 切换到其他工作进程发布的新一代快照
+    - 按 ``cache_refresh_interval_minutes`` 检查数据库版本戳（其他进程写入数据后本进程也能感知）
+    """
+    scheduler = get_scheduler()
+    scheduler.add_job(
+        attach_latest_snapshots,
+        IntervalTrigger(seconds=config.cache_generation_check_seconds),
+        id="attach_tushare_cache_snapshots",
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        refresh_cache,
+        IntervalTrigger(minutes=config.cache_refresh_interval_minutes),
+        id="refresh_tushare_cache",
+        replace_existing=True,
+    )
 
 def get_stock_basic_cache() -> pd.DataFrame:
     """
-    获取股票数据缓存
+    获取股票数据缓存（股票池索引底层的 DataFrame），缓存为空时先从数据库加载
     """
-    global _stock_basic_cache
-    return _stock_basic_cache
+    universe = get_stock_universe()
+    return pd.DataFrame() if universe is None else universe.frame
+def get_stock_universe() -> Optional[StockUniverse]:
+    """
+    获取股票池索引，缓存为空时先从数据库加载
+
+    Returns:
+        股票池索引，数据库中也没有股票列表时返回 None
+    """
+    global _stock_universe
+    if _stock_universe is None:
+        stock_basic = get_stock_basic_from_db()
+        if stock_basic.empty:
+            return None
+        _set_stock_basic(stock_basic)
+    return _stock_universe
 def get_trade_calendar_cache() -> pd.DataFrame:
     """
     获取交易日历数据缓存
     """
     global _trade_calendar_cache
     return _trade_calendar_cache
+def get_trading_calendar() -> Optional[TradingCalendar]:
+    """
+    获取交易日历索引，缓存为空时先从数据库加载
+
+    Returns:
+        交易日历索引，数据库中也没有交易日历时返回 None
+    """
+    global _trading_calendar, _trade_calendar_cache
+    if _trading_calendar is None:
+        calendar_df = _trade_calendar_cache
+        if calendar_df.empty:
+            calendar_df = get_trade_calendar_from_db()
+            _trade_calendar_cache = calendar_df
+        if calendar_df.empty:
+            return None
+        _trading_calendar = TradingCalendar(calendar_df['cal_date'], calendar_df['is_open'])
+    return _trading_calendar
 def update_stock_basic_cache(df: pd.DataFrame):
     """
-    更新股票数据缓存
+    更新股票数据缓存，并写入快照
     """
     if df is None or df.empty:
         return
 
-    df = df[['ts_code', 'symbol', 'name', 'area', 'industry', 'market', 'list_date', 'status']].copy()
-
-    global _stock_basic_cache
-    _stock_basic_cache = df
+    _save_snapshot(STOCK_BASIC_TABLE, _set_stock_basic(df))
     logger.info(f"更新股票数据缓存，共 {len(df)} 条数据")
 
 
 def update_trade_calendar_cache(df: pd.DataFrame):
     """
-    更新交易日历数据缓存
+    更新交易日历数据缓存，并写入快照
     """
     if df is None or df.empty:
         return
 
-    df = df[['cal_date', 'is_open']].copy()
+    _save_snapshot(TRADE_CALENDAR_TABLE, _set_trade_calendar(df))
+    logger.info(f"更新交易日历数据缓存，共 {len(df)} 条数据")
 
-    global _trade_calendar_cache
+
+def _set_stock_basic(df: pd.DataFrame) -> pd.DataFrame:
+    """替换股票池索引，返回用于写快照的数据"""
+    global _stock_universe
+    _stock_universe = StockUniverse(df)
+    return _stock_universe.frame
+
+
+def _attach_stock_basic(df: pd.DataFrame):
+    """使用快照中已整理好的股票列表构建索引"""
+    global _stock_universe
+    _stock_universe = StockUniverse.from_frame(df)
+
+
+def _set_trade_calendar(df: pd.DataFrame) -> pd.DataFrame:
+    """替换交易日历缓存和索引，返回用于写快照的数据"""
+    global _trade_calendar_cache, _trading_calendar
+    df = df[['cal_date', 'is_open']].copy()
     _trade_calendar_cache = df
-    logger.info(f"更新交易日历数据缓存，共 {len(df)} 条数据")
+    _trading_calendar = TradingCalendar(df['cal_date'], df['is_open'])
+    return df
+
+
+def _read_newer_snapshot(table: str) -> Optional[Snapshot]:
+    """读取比本进程当前使用的更新的一代快照，没有时返回 None"""
+    generation = current_generation(table)
+    if generation is None or generation == _cache_generations.get(table):
+        return None
+    return read_snapshot(table, generation)
+
+
+def _attach_snapshot(table: str, snapshot: Snapshot):
+    """使用快照替换缓存，快照数据直接引用映射的文件"""
+    _, _, attach = _CACHES[table]
+    attach(snapshot.data)
+    _cache_versions[table] = snapshot.version
+    _cache_generations[table] = snapshot.generation
+    logger.info(f"从快照加载缓存 {table}（第 {snapshot.generation} 代），共 {len(snapshot.data)} 条数据")
+
+
+def _save_snapshot(table: str, df: pd.DataFrame, version: str | None = None):
+    """发布新一代缓存快照，失败只记录日志"""
+    try:
+        version = get_db_version(table) if version is None else version
+        _cache_generations[table] = write_snapshot(table, df, version)
+        _cache_versions[table] = version
+    except Exception as e:
+        logger.error(f"写入缓存快照 {table} 失败: {e}")
 
 
 def get_stock_basic_from_db() -> pd.DataFrame:
@@ -68,8 +242,8 @@ def get_stock_basic_from_db() -> pd.DataFrame:
         logger.warning(f"股票基础数据表 {STOCK_BASIC_TABLE} 不存在")
         return pd.DataFrame()
     
-    query = f"SELECT ts_code, symbol, name, area, industry, market, list_date, status FROM {STOCK_BASIC_TABLE}"
-    df = pd.read_sql(query, mysql_engine())
+    query = f"SELECT {', '.join(UNIVERSE_COLUMNS)} FROM {STOCK_BASIC_TABLE}"
+    df = normalize_date_columns(pd.read_sql(query, mysql_engine()))
     
     if df.empty:
         logger.warning("股票基础数据表为空")
@@ -89,7 +263,7 @@ def get_trade_calendar_from_db() -> pd.DataFrame:
         return pd.DataFrame()
     
     query = f"SELECT cal_date, is_open FROM {TRADE_CALENDAR_TABLE}"
-    df = pd.read_sql(query, mysql_engine())
+    df = normalize_date_columns(pd.read_sql(query, mysql_engine()))
     
     if df.empty:
         logger.warning("交易日历数据表为空")
@@ -97,3 +271,10 @@ def get_trade_calendar_from_db() -> pd.DataFrame:
     
     logger.info(f"从缓存获取到 {len(df)} 条交易日历数据")
     return df
+
+
+# 数据表 -> (从数据库加载, 替换缓存, 使用快照替换缓存)
+_CACHES = {
+    STOCK_BASIC_TABLE: (get_stock_basic_from_db, _set_stock_basic, _attach_stock_basic),
+    TRADE_CALENDAR_TABLE: (get_trade_calendar_from_db, _set_trade_calendar, _set_trade_calendar),
+}
@@ -0,0 +1,233 @@
+"""
+Tushare 数据表的 Parquet 列式镜像
+
+研究侧读取多年的行情数据时不再经过 MySQL，而是读取按日期列的 年/月 分区的 Parquet 文件：
+
+    {parquet_root}/{table}/year=YYYY/month=MM/data.parquet
+
+- 导出：同步任务完成后增量导出。导出进度记录在水位目录的 ``{table}@parquet`` 数据集中，
+  每次从已导出水位所在月份开始整月重写，重复导出是幂等的
+- 读取：按日期范围裁剪分区，只读取需要的列，文件以内存映射方式打开
+
+日期列与数据库一致，保存为 INT（YYYYMMDD）。没有日期列的维表（交易日历、股票列表）整表导出为单个文件。
+"""
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare.constants import (
+    TRADE_CALENDAR_TABLE,
+    STOCK_BASIC_TABLE,
+    STOCK_ST_TABLE,
+    DAILY_TABLE,
+    DAILY_BASIC_TABLE,
+    WEEKLY_TABLE,
+    MONTHLY_TABLE,
+    ADJ_FACTOR_TABLE,
+    DAILY_HFQ_TABLE,
+    HSGT_TOP10_TABLE,
+    INCOME_TABLE,
+    BALANCESHEET_TABLE,
+    CASHFLOW_TABLE,
+)
+from fin_data_hub.data.tushare.tushare_watermark import get_dataset_watermark, update_watermarks
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine, table_exists_and_not_empty
+from fin_data_hub.foundation.utils.date_utils import add_days, get_all_month_end
+
+logger = logging.getLogger(__name__)
+
+# 各数据表用于分区的日期列，为 None 的表整表导出；
+# 前复权日线（DAILY_QFQ_TABLE）在除权除息后整段重写历史，不适合按月增量导出，不做镜像
+PARQUET_DATE_COLUMNS: dict[str, str | None] = {
+    TRADE_CALENDAR_TABLE: None,
+    STOCK_BASIC_TABLE: None,
+    STOCK_ST_TABLE: 'trade_date',
+    DAILY_TABLE: 'trade_date',
+    DAILY_BASIC_TABLE: 'trade_date',
+    WEEKLY_TABLE: 'trade_date',
+    MONTHLY_TABLE: 'trade_date',
+    ADJ_FACTOR_TABLE: 'trade_date',
+    DAILY_HFQ_TABLE: 'trade_date',
+    HSGT_TOP10_TABLE: 'trade_date',
+    INCOME_TABLE: 'end_date',
+    BALANCESHEET_TABLE: 'end_date',
+    CASHFLOW_TABLE: 'end_date',
+}
+
+_DATA_FILE = 'data.parquet'
+
+
+def table_dir(table: str) -> Path:
+    """数据表的 Parquet 镜像目录"""
+    return Path(config.parquet_root) / table
+
+
+def export_table(table: str, start_date: str | None = None, rebuild: bool = False) -> int:
+    """
+    增量导出数据表到 Parquet 镜像
+
+    Args:
+        table: 数据表名
+        start_date: 从该日期所在月份开始重写，为 None 时从已导出水位所在月份开始；
+            补全了历史数据后可传入补全的开始日期
+        rebuild: 从数据表中最早的日期开始重建，并删除更早月份的分区文件
+
+    Returns:
+        导出的行数
+    """
+    if table not in PARQUET_DATE_COLUMNS:
+        raise ValueError(f"数据表 {table} 不支持导出 Parquet")
+    if not table_exists_and_not_empty(table):
+        return 0
+
+    date_column = PARQUET_DATE_COLUMNS[table]
+    if date_column is None:
+        df = pd.read_sql(f"SELECT * FROM {table}", mysql_engine())
+        _write_parquet(df, table_dir(table) / _DATA_FILE)
+        logger.info(f"[Parquet] 全量导出 {table}，共 {len(df)} 条")
+        return len(df)
+
+    last_date = get_dataset_watermark(table, date_column)
+    if last_date is None:
+        return 0
+    export_dataset = f"{table}@parquet"
+    if rebuild:
+        start_date = _min_date(table, date_column)
+        if start_date is not None:
+            for path in _partition_files(table, end_date=add_days(start_date[:6] + '01', -1)):
+                path.unlink(missing_ok=True)
+    if start_date is None:
+        start_date = get_dataset_watermark(export_dataset, date_column)
+    if start_date is None:
+        start_date = _min_date(table, date_column)
+    if start_date is None or start_date > last_date:
+        return 0
+
+    rows = 0
+    for month_end_date in get_all_month_end(start_date, last_date):
+        month_start = month_end_date[:6] + '01'
+        df = pd.read_sql(
+            text(f"SELECT * FROM {table} WHERE {date_column} BETWEEN :start AND :end"),
+            mysql_engine(),
+            params={'start': int(month_start), 'end': int(month_end_date)},
+        )
+        path = _partition_path(table, month_start)
+        if df.empty:
+            # 该月已没有数据，删除之前导出的分区
+            path.unlink(missing_ok=True)
+            continue
+        _write_parquet(df, path)
+        rows += len(df)
+
+    with mysql_engine().begin() as conn:
+        update_watermarks(conn, export_dataset, pd.DataFrame({date_column: [last_date]}), date_column)
+    logger.info(f"[Parquet] 导出 {table} 从 {start_date} 到 {last_date}，共 {rows} 条")
+    return rows
+
+
+def export_tables(tables: list[str] | None = None, rebuild: bool = False, start_date: str | None = None) -> int:
+    """
+    依次导出多张数据表，单表失败只记录日志，不影响其他表
+
+    Args:
+        tables: 数据表名列表，为 None 时导出全部支持的表
+        rebuild: 是否从最早的数据开始重建镜像
+        start_date: 从该日期所在月份开始重写（如重新拉取了较早的报告期），rebuild 时忽略
+
+    Returns:
+        导出的总行数
+    """
+    rows = 0
+    for table in tables or list(PARQUET_DATE_COLUMNS):
+        try:
+            rows += export_table(table, start_date, rebuild=rebuild)
+        except Exception as e:
+            logger.error(f"[Parquet] 导出 {table} 失败: {e}")
+    return rows
+
+
+def read_table(
+    table: str,
+    columns: list[str] | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    ts_codes: list[str] | None = None,
+    as_arrow: bool = False,
+) -> pd.DataFrame | pa.Table:
+    """
+    从 Parquet 镜像读取数据表
+
+    Args:
+        table: 数据表名
+        columns: 需要读取的列，为 None 时读取全部列
+        start_date: 开始日期（含），用于裁剪分区和过滤行
+        end_date: 结束日期（含），用于裁剪分区和过滤行
+        ts_codes: 只读取这些股票
+        as_arrow: 返回 ``pyarrow.Table`` 而不是 DataFrame
+
+    Returns:
+        读取的数据，日期列为 INT（YYYYMMDD）
+    """
+    date_column = PARQUET_DATE_COLUMNS.get(table)
+    filters: list[tuple] = []
+    if date_column is not None:
+        if start_date:
+            filters.append((date_column, '>=', int(start_date)))
+        if end_date:
+            filters.append((date_column, '<=', int(end_date)))
+    if ts_codes:
+        filters.append(('ts_code', 'in', list(ts_codes)))
+
+    tables = [
+        pq.read_table(path, columns=columns, filters=filters or None, memory_map=True)
+        for path in _partition_files(table, start_date, end_date)
+    ]
+    if tables:
+        result = pa.concat_tables(tables, promote_options='permissive')
+    else:
+        result = pa.table({column: [] for column in columns or []})
+    return result if as_arrow else result.to_pandas()
+
+
+def _partition_files(table: str, start_date: str | None = None, end_date: str | None = None) -> list[Path]:
+    """按日期范围裁剪分区，返回需要读取的文件"""
+    root = table_dir(table)
+    if PARQUET_DATE_COLUMNS.get(table) is None:
+        path = root / _DATA_FILE
+        return [path] if path.exists() else []
+
+    start_month = start_date[:6] if start_date else None
+    end_month = end_date[:6] if end_date else None
+    files = []
+    for path in sorted(root.glob(f'year=*/month=*/{_DATA_FILE}')):
+        month = path.parent.parent.name.split('=')[1] + path.parent.name.split('=')[1]
+        if (start_month and month < start_month) or (end_month and month > end_month):
+            continue
+        files.append(path)
+    return files
+
+
+def _partition_path(table: str, date_str: str) -> Path:
+    """日期所在月份的分区文件"""
+    return table_dir(table) / f'year={date_str[:4]}' / f'month={date_str[4:6]}' / _DATA_FILE
+
+
+def _write_parquet(df: pd.DataFrame, path: Path):
+    """先写临时文件再替换，读取方不会看到写了一半的文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+def _min_date(table: str, date_column: str) -> str | None:
+    """数据表中最早的日期"""
+    with mysql_engine().connect() as conn:
+        value = conn.execute(text(f"SELECT MIN({date_column}) FROM {table} WHERE {date_column} > 0")).scalar()
+    return None if value is None else str(value)
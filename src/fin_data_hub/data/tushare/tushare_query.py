@@ -0,0 +1,315 @@
+"""
+行情数据查询
+
+按 (ts_code, trade_date) 主键做键集分页：每页以上一页最后一行的键作为起点，
+``WHERE (ts_code, trade_date) > (上一页最后的键) ORDER BY ts_code, trade_date LIMIT n``，
+直接沿主键索引定位，翻到多深的页代价都与第一页相同。只查询请求的列，不物化整行。
+
+长时间序列使用 ``iter_bars`` 流式读取：服务端游标按固定批次取行，内存占用与结果大小无关。
+查询均通过异步引擎执行，供 ``async def`` 路由直接 await。
+分页查询结果缓存在 ``get_bar_cache`` 中，数据写入发布的失效事件会移除覆盖了变化日期的条目。
+失效事件只能通知本进程，其他进程（补全脚本、复权重算等）写入的数据由 ``refresh_bar_cache``
+定期读取变更日志发现，同样只移除日期范围与变更重叠的条目，历史区间不受最新交易日写入的影响。
+"""
+import base64
+import binascii
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, NamedTuple
+
+import pyarrow as pa
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare.constants import (
+    CHANGE_LOG_TABLE,
+    DAILY_HFQ_TABLE,
+    DAILY_QFQ_TABLE,
+    DAILY_TABLE,
+    MONTHLY_TABLE,
+    WEEKLY_TABLE,
+)
+from fin_data_hub.data.tushare.tushare_schema import DATE_COLUMNS, SCHEMAS
+from fin_data_hub.foundation.cache import ResultCache, subscribe_invalidation
+from fin_data_hub.foundation.mysql.mysql_async_engine import async_session_factory
+
+logger = logging.getLogger(__name__)
+
+# 行情频率 -> 数据表
+BAR_TABLES = {
+    'D': DAILY_TABLE,
+    'W': WEEKLY_TABLE,
+    'M': MONTHLY_TABLE,
+}
+
+# 复权方式 -> 复权日线数据表（只支持日线）
+ADJUSTED_BAR_TABLES = {
+    'qfq': DAILY_QFQ_TABLE,
+    'hfq': DAILY_HFQ_TABLE,
+}
+
+# 分页键，始终包含在返回结果中
+BAR_KEY_COLUMNS = ('ts_code', 'trade_date')
+
+MAX_PAGE_SIZE = 5000
+
+# 变更记录时间早于其事务提交：读取变更日志时回看该秒数，
+# 读取时间早于 (变更记录时间 + 该秒数) 的缓存条目都可能在变更提交前查询，视为过期
+_CHANGE_LOOKBACK_SECONDS = 60
+
+_bar_cache: ResultCache | None = None
+# 上次读取变更日志时的数据库时间，以及读取时的本地单调时钟
+_changes_read_at: datetime | None = None
+_changes_checked_at = 0.0
+
+
+class BarPage(NamedTuple):
+    """一页行情数据"""
+    fields: list[str]
+    rows: list[dict[str, Any]]
+    next_cursor: str | None
+
+
+def get_bar_cache() -> ResultCache:
+    """获取行情查询结果缓存，创建时订阅数据写入的失效事件"""
+    global _bar_cache
+    if _bar_cache is None:
+        _bar_cache = ResultCache(config.query_cache_max_bytes, config.query_cache_ttl_seconds)
+        subscribe_invalidation(_bar_cache.invalidate)
+    return _bar_cache
+
+
+async def refresh_bar_cache(session: AsyncSession) -> datetime | None:
+    """
+    读取上次之后的变更日志，移除日期范围与变更重叠、且可能在变更提交前查询的缓存条目
+
+    至多每 ``query_cache_change_poll_seconds`` 秒读取一次，期间复用上次的结果。
+
+    Returns:
+        上次读取变更日志时的数据库时间，作为之后写入的缓存条目的版本；
+        读取失败时为 None，此时无法发现其他进程的写入，调用方不应使用缓存
+    """
+    global _changes_read_at, _changes_checked_at
+    if _changes_read_at is not None and time.monotonic() - _changes_checked_at < config.query_cache_change_poll_seconds:
+        return _changes_read_at
+    cache = get_bar_cache()
+    lookback = timedelta(seconds=_CHANGE_LOOKBACK_SECONDS)
+    try:
+        now = (await session.execute(text("SELECT NOW(6)"))).scalar_one()
+        if _changes_read_at is not None:
+            sql = text(f"""
+            SELECT dataset, start_date, end_date, changed_at FROM {CHANGE_LOG_TABLE}
+            WHERE changed_at >= :since ORDER BY changed_at
+            """)
+            changes = (await session.execute(sql, {'since': _changes_read_at - lookback})).mappings().all()
+            for change in changes:
+                cache.invalidate_range(
+                    change['dataset'], change['start_date'], change['end_date'], before=change['changed_at'] + lookback
+                )
+    except Exception as e:
+        logger.error(f"读取数据变更日志失败，本次查询不使用缓存: {e}")
+        return None
+    # 第一次读取时还没有缓存条目，只记录读取时间
+    _changes_read_at, _changes_checked_at = now, time.monotonic()
+    return now
+
+
+def bar_table(freq: str, adj: str | None = None) -> str:
+    """
+    行情频率和复权方式对应的数据表
+
+    Args:
+        freq: 行情频率 D/W/M
+        adj: 复权方式 qfq/hfq，为空时不复权
+
+    Raises:
+        ValueError: 频率或复权方式不合法
+    """
+    if freq not in BAR_TABLES:
+        raise ValueError(f"不支持的行情频率: {freq}")
+    if not adj:
+        return BAR_TABLES[freq]
+    if adj not in ADJUSTED_BAR_TABLES:
+        raise ValueError(f"不支持的复权方式: {adj}")
+    if freq != 'D':
+        raise ValueError("复权行情只支持日线")
+    return ADJUSTED_BAR_TABLES[adj]
+
+
+def resolve_bar_fields(freq: str, fields: str | None, adj: str | None = None) -> list[str]:
+    """
+    解析请求的字段列表，只允许数据表中存在的列
+
+    Args:
+        freq: 行情频率 D/W/M
+        fields: 逗号分隔的字段，为空时返回全部列
+        adj: 复权方式 qfq/hfq，为空时不复权
+
+    Returns:
+        查询的列，分页键排在最前
+
+    Raises:
+        ValueError: 频率、复权方式或字段不合法
+    """
+    allowed = SCHEMAS[bar_table(freq, adj)].column_names
+    if not fields:
+        return allowed
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(f"不支持的字段: {','.join(unknown)}")
+    return list(BAR_KEY_COLUMNS) + [field for field in dict.fromkeys(requested) if field not in BAR_KEY_COLUMNS]
+
+
+def bar_arrow_schema(freq: str, fields: list[str], adj: str | None = None) -> pa.Schema:
+    """
+    行情列对应的 Arrow 类型：代码为字符串，日期为 INT（YYYYMMDD），数值为 float64
+    """
+    column_types = dict(SCHEMAS[bar_table(freq, adj)].columns)
+    arrow_fields = []
+    for field in fields:
+        if field in DATE_COLUMNS:
+            arrow_type = pa.int32()
+        elif column_types[field].startswith(('CHAR', 'VARCHAR')):
+            arrow_type = pa.string()
+        else:
+            arrow_type = pa.float64()
+        arrow_fields.append(pa.field(field, arrow_type))
+    return pa.schema(arrow_fields)
+
+
+def encode_cursor(ts_code: str, trade_date: str) -> str:
+    """把分页键编码为不透明的游标"""
+    return base64.urlsafe_b64encode(f"{ts_code}|{trade_date}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """
+    解析游标
+
+    Raises:
+        ValueError: 游标不合法
+    """
+    try:
+        ts_code, trade_date = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return ts_code, int(trade_date)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"不合法的游标: {cursor}")
+
+
+async def query_bars(
+    session: AsyncSession,
+    ts_codes: list[str],
+    start_date: str | None = None,
+    end_date: str | None = None,
+    fields: list[str] | None = None,
+    freq: str = 'D',
+    limit: int = 1000,
+    cursor: str | None = None,
+    adj: str | None = None,
+) -> BarPage:
+    """
+    按键集分页查询行情
+
+    Args:
+        session: 异步会话
+        ts_codes: 股票代码列表
+        start_date: 开始日期（含），格式 YYYYMMDD
+        end_date: 结束日期（含），格式 YYYYMMDD
+        fields: 查询的列，需经过 ``resolve_bar_fields`` 校验
+        freq: 行情频率 D/W/M
+        limit: 每页行数
+        cursor: 上一页返回的游标，为空时从第一行开始
+        adj: 复权方式 qfq/hfq，为空时不复权
+
+    Returns:
+        一页行情数据，``next_cursor`` 为 None 表示没有下一页
+    """
+    fields = fields or resolve_bar_fields(freq, None, adj)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    sql, params = _build_bars_sql(bar_table(freq, adj), ts_codes, start_date, end_date, fields, limit, cursor)
+
+    result = await session.execute(sql, params)
+    rows = [dict(row) for row in result.mappings()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last['ts_code'], str(last['trade_date']))
+    for row in rows:
+        for column in DATE_COLUMNS:
+            if column in row:
+                row[column] = None if not row[column] else str(row[column])
+    return BarPage(fields, rows, next_cursor)
+
+
+async def iter_bars(
+    ts_codes: list[str],
+    start_date: str | None = None,
+    end_date: str | None = None,
+    fields: list[str] | None = None,
+    freq: str = 'D',
+    cursor: str | None = None,
+    batch_size: int | None = None,
+    adj: str | None = None,
+) -> AsyncIterator[list[tuple]]:
+    """
+    使用服务端游标按批次流式读取行情
+
+    流式响应在路由返回后才开始输出，因此这里自行打开会话，而不使用请求级的会话
+
+    Args:
+        ts_codes: 股票代码列表
+        start_date: 开始日期（含），格式 YYYYMMDD
+        end_date: 结束日期（含），格式 YYYYMMDD
+        fields: 查询的列，需经过 ``resolve_bar_fields`` 校验
+        freq: 行情频率 D/W/M
+        cursor: 从该游标之后开始读取
+        batch_size: 每批行数，默认使用配置 ``query_stream_batch_size``
+        adj: 复权方式 qfq/hfq，为空时不复权
+
+    Yields:
+        每批行数据，元组中各列顺序与 ``fields`` 一致，日期列为 INT（YYYYMMDD）
+    """
+    fields = fields or resolve_bar_fields(freq, None, adj)
+    batch_size = batch_size or config.query_stream_batch_size
+    sql, params = _build_bars_sql(bar_table(freq, adj), ts_codes, start_date, end_date, fields, None, cursor)
+
+    async with async_session_factory()() as session:
+        result = await session.stream(sql, params, execution_options={'yield_per': batch_size})
+        async for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
+
+def _build_bars_sql(
+    table: str,
+    ts_codes: list[str],
+    start_date: str | None,
+    end_date: str | None,
+    fields: list[str],
+    limit: int | None,
+    cursor: str | None = None,
+):
+    """构造键集分页查询，多取一行用于判断是否还有下一页；limit 为 None 时不限制行数"""
+    conditions = ["ts_code IN :ts_codes"]
+    params: dict[str, Any] = {'ts_codes': list(ts_codes)}
+    if start_date:
+        conditions.append("trade_date >= :start_date")
+        params['start_date'] = int(start_date)
+    if end_date:
+        conditions.append("trade_date <= :end_date")
+        params['end_date'] = int(end_date)
+    if cursor:
+        params['last_code'], params['last_date'] = decode_cursor(cursor)
+        conditions.append("(ts_code > :last_code OR (ts_code = :last_code AND trade_date > :last_date))")
+
+    columns = ', '.join(f'`{field}`' for field in fields)
+    query = f"SELECT {columns} FROM {table} WHERE {' AND '.join(conditions)} ORDER BY ts_code, trade_date"
+    if limit is not None:
+        query += " LIMIT :limit"
+        params['limit'] = limit + 1
+    sql = text(query).bindparams(bindparam('ts_codes', expanding=True))
+    return sql, params
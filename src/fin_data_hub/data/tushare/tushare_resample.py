@@ -0,0 +1,208 @@
+"""
+周线、月线重采样
+
+从 ``tushare_daily`` 向量化生成周线、月线，不再逐个周期调用 ``weekly`` / ``monthly`` 接口：
+- 周期末取交易日历中每周 / 每月的最后一个交易日，与接口返回的 trade_date 一致
+- 每个日线行按 ``searchsorted`` 归入所属周期，按 (ts_code, 周期末) 一次 groupby 聚合：
+  open 取首日开盘价，high / low 取极值，close 取末日收盘价，pre_close 取首日的昨收价，vol / amount 求和，
+  change、pct_chg 由 close 和 pre_close 计算
+- 周期内停牌的股票没有该周期的数据，与接口一致
+- 只生成已结束的周期；增量更新时从目标表的数据集水位之后的周期开始，按批读取日线
+
+``verify_resampled`` 把某个周期的重采样结果与接口返回的数据逐列比较，用于校验。
+"""
+import logging
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from fin_data_hub.data.tushare.constants import DAILY_TABLE, MONTHLY_TABLE, WEEKLY_TABLE
+from fin_data_hub.data.tushare.tushare_schema import compact_frame
+from fin_data_hub.data.tushare.tushare_storage import save_data
+from fin_data_hub.data.tushare.tushare_watermark import get_dataset_watermark
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
+
+logger = logging.getLogger(__name__)
+
+# 周期 -> 目标数据表
+RESAMPLE_TABLES = {
+    'W': WEEKLY_TABLE,
+    'M': MONTHLY_TABLE,
+}
+
+# 每批生成的周期数，约一年的日线
+_CHUNK_PERIODS = {
+    'W': 52,
+    'M': 12,
+}
+
+_DAILY_COLUMNS = ('ts_code', 'trade_date', 'open', 'high', 'low', 'close', 'pre_close', 'vol', 'amount')
+
+# 校验时逐列比较的数值列
+VERIFY_COLUMNS = ('open', 'high', 'low', 'close', 'pre_close', 'change', 'pct_chg', 'vol', 'amount')
+
+
+def resample_bars(daily: pd.DataFrame, period_ends: Any) -> pd.DataFrame:
+    """
+    把日线聚合为周期 K 线
+
+    Args:
+        daily: 日线，至少包含 ts_code trade_date open high low close pre_close vol amount，trade_date 为 YYYYMMDD
+        period_ends: 升序的周期末交易日（YYYYMMDD），晚于最后一个周期末的日线不参与聚合
+
+    Returns:
+        ts_code trade_date open high low close pre_close change pct_chg vol amount，trade_date 为周期末（整数）
+    """
+    columns = ['ts_code', 'trade_date', 'open', 'high', 'low', 'close', 'pre_close', 'change', 'pct_chg', 'vol', 'amount']
+    ends = np.asarray(period_ends).astype(np.int64)
+    if daily is None or daily.empty or ends.size == 0:
+        return pd.DataFrame(columns=columns)
+
+    trade_dates = daily['trade_date'].to_numpy().astype(np.int64)
+    position = np.searchsorted(ends, trade_dates, side='left')
+    inside = position < ends.size
+    df = daily.loc[inside, list(_DAILY_COLUMNS)].copy()
+    df['period'] = ends[position[inside]]
+    df['_date'] = trade_dates[inside]
+    df = df.sort_values(['ts_code', '_date'], kind='stable')
+
+    bars = df.groupby(['ts_code', 'period'], sort=False, observed=True).agg(
+        open=('open', 'first'),
+        high=('high', 'max'),
+        low=('low', 'min'),
+        close=('close', 'last'),
+        pre_close=('pre_close', 'first'),
+        vol=('vol', 'sum'),
+        amount=('amount', 'sum'),
+    ).reset_index().rename(columns={'period': 'trade_date'})
+    bars['ts_code'] = bars['ts_code'].astype(str)
+
+    bars['change'] = (bars['close'] - bars['pre_close']).round(4)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_chg = bars['change'] / bars['pre_close'] * 100
+    bars['pct_chg'] = pct_chg.where(bars['pre_close'] != 0).round(4)
+    return bars[columns].sort_values(['trade_date', 'ts_code'], ignore_index=True)
+
+
+def completed_period_ends(freq: str, end_date: str) -> list[str]:
+    """
+    交易日历中截至 ``end_date`` 已结束的全部周期末
+
+    Args:
+        freq: 'W' 或 'M'
+        end_date: 日线的最新日期
+    """
+    from fin_data_hub.data.tushare.tushare_data_cache import get_trading_calendar
+    calendar = get_trading_calendar()
+    if calendar is None:
+        logger.warning("交易日历为空，无法计算周期末交易日")
+        return []
+    return calendar.period_ends(calendar.first_date, end_date, freq)
+
+
+def resample_table(freq: str, start_date: str | None = None) -> int:
+    """
+    从日线增量生成周线 / 月线并写入对应数据表
+
+    Args:
+        freq: 'W'（周线）或 'M'（月线）
+        start_date: 从包含该日期的周期开始重新生成；默认从目标表数据集水位之后的周期开始
+
+    Returns:
+        写入的行数
+    """
+    table = RESAMPLE_TABLES[freq]
+    daily_last = get_dataset_watermark(DAILY_TABLE)
+    if daily_last is None:
+        logger.info(f"[K线重采样] 日线数据表为空，跳过 {table}")
+        return 0
+
+    ends = completed_period_ends(freq, daily_last)
+    if start_date is not None:
+        first = int(np.searchsorted(np.asarray(ends, dtype=np.int64), int(start_date), side='left'))
+    else:
+        last = get_dataset_watermark(table)
+        first = 0 if last is None else int(np.searchsorted(np.asarray(ends, dtype=np.int64), int(last), side='right'))
+    if first >= len(ends):
+        logger.info(f"[K线重采样] {table} 已是最新（日线截至 {daily_last}）")
+        return 0
+
+    rows = 0
+    chunk = _CHUNK_PERIODS[freq]
+    for i in range(first, len(ends), chunk):
+        chunk_ends = ends[i:i + chunk]
+        lower = ends[i - 1] if i > 0 else None
+        daily = load_daily(lower, chunk_ends[-1])
+        bars = resample_bars(daily, chunk_ends)
+        rows += save_data(compact_frame(bars, table), table)
+        logger.info(f"[K线重采样] {table} 生成 {chunk_ends[0]} ~ {chunk_ends[-1]} 共 {len(bars)} 条")
+    return rows
+
+
+def load_daily(after: str | None, end_date: str) -> pd.DataFrame:
+    """
+    读取 (after, end_date] 内的日线
+
+    Args:
+        after: 不含的开始日期，为 None 时从最早的数据开始
+        end_date: 含的结束日期
+    """
+    query = f"""
+    SELECT {', '.join(_DAILY_COLUMNS)} FROM {DAILY_TABLE}
+    WHERE trade_date > %(after)s AND trade_date <= %(end_date)s
+    """
+    return pd.read_sql(query, mysql_engine(), params={'after': int(after or 0), 'end_date': int(end_date)})
+
+
+def verify_resampled(freq: str, trade_date: str, client: Any = None, rtol: float = 1e-4, atol: float = 0.01) -> pd.DataFrame:
+    """
+    把一个周期的重采样结果与 ``weekly`` / ``monthly`` 接口返回的数据比较
+
+    Args:
+        freq: 'W' 或 'M'
+        trade_date: 周期末交易日
+        client: Tushare 客户端，默认 ``get_tushare_client()``
+        rtol: 相对误差
+        atol: 绝对误差，接口的价格保留两位小数
+
+    Returns:
+        不一致的股票：ts_code mismatch（不一致的列，逗号分隔；只在一侧存在时为 missing_local / missing_api）
+        以及两侧各列的值（后缀 _local / _api）；为空表示完全一致
+    """
+    if client is None:
+        from fin_data_hub.data.tushare.tushare_data import get_tushare_client
+        client = get_tushare_client()
+
+    ends = completed_period_ends(freq, trade_date)
+    if not ends or ends[-1] != trade_date:
+        raise ValueError(f"{trade_date} 不是已结束周期的最后一个交易日")
+    lower = ends[-2] if len(ends) > 1 else None
+    local = resample_bars(load_daily(lower, trade_date), [trade_date])
+
+    endpoint = 'weekly' if freq == 'W' else 'monthly'
+    api = getattr(client, endpoint)(trade_date=trade_date)
+    api = api if api is not None else pd.DataFrame(columns=['ts_code', *VERIFY_COLUMNS])
+
+    merged = local.merge(api, on='ts_code', how='outer', suffixes=('_local', '_api'), indicator=True)
+    both = (merged['_merge'] == 'both').to_numpy()
+    differs = {
+        column: both & ~np.isclose(
+            pd.to_numeric(merged[f'{column}_local'], errors='coerce').to_numpy(dtype=float),
+            pd.to_numeric(merged[f'{column}_api'], errors='coerce').to_numpy(dtype=float),
+            rtol=rtol, atol=atol, equal_nan=True,
+        )
+        for column in VERIFY_COLUMNS
+    }
+    side = merged['_merge'].map({'right_only': 'missing_local', 'left_only': 'missing_api', 'both': ''}).astype(str)
+    mismatch = [
+        side_value or ','.join(column for column in VERIFY_COLUMNS if differs[column][i])
+        for i, side_value in enumerate(side)
+    ]
+
+    merged['mismatch'] = mismatch
+    result = merged[merged['mismatch'] != ''].drop(columns=['_merge'])
+    logger.info(
+        f"[K线重采样] {endpoint} {trade_date} 校验：本地 {len(local)} 条，接口 {len(api)} 条，不一致 {len(result)} 条"
+    )
+    return result.reset_index(drop=True)
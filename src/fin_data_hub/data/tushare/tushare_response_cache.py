@@ -0,0 +1,284 @@
+"""
+Tushare 接口响应缓存
+
+历史区间的接口响应（已结束区间的 ``daily``、过去月份的 ``monthly``、较早报告期的 ``income_vip`` 等）不会再变化，
+重新补全时直接从本地磁盘读取，不消耗配额。开启 ``tushare_response_cache_enabled`` 后，
+``get_tushare_client()`` 返回的客户端在限流之前先查缓存，命中时不占用令牌。
+
+- 缓存键为接口名 + 规范化参数（去掉空值、按参数名排序、去掉 fields 中的空白）的 SHA-256
+- 响应以 zstd 压缩的 Parquet 文件保存：``{tushare_response_cache_dir}/{接口名}/{键前两位}/{键}.parquet``
+- 只缓存结束日期早于最近 N 个交易日的请求；没有日期参数或区间没有结束日期的请求（股票列表、交易日历、
+  只传开始日期的区间等）始终调用接口；财务报表在报告期结束后一段时间内不缓存
+- 占用超过上限时，按文件修改时间（命中时更新）淘汰最久未使用的响应
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fin_data_hub.config import config
+from fin_data_hub.foundation.monitoring.ingest_metrics import record_api_cache
+from fin_data_hub.foundation.utils.date_utils import add_days, current_date_ymd
+
+logger = logging.getLogger(__name__)
+
+# 缓存格式版本，格式变化时递增，旧缓存不再命中
+CACHE_FORMAT_VERSION = 1
+
+# 表示区间结束（或单个日期）的参数
+_END_DATE_PARAMS = ('trade_date', 'end_date', 'period', 'cal_date', 'ann_date', 'f_ann_date')
+
+# 财务报表接口：日期参数是报告期，报告期结束后仍可能有更正公告
+_STATEMENT_ENDPOINTS = frozenset({
+    'income', 'income_vip', 'balancesheet', 'balancesheet_vip', 'cashflow', 'cashflow_vip',
+})
+
+# 淘汰时降到上限的该比例以下，避免每次写入都触发淘汰
+_EVICT_TARGET_RATIO = 0.9
+
+_cache: "ResponseCache | None" = None
+_cache_lock = threading.Lock()
+
+
+def normalize_params(params: dict[str, Any]) -> dict[str, str]:
+    """规范化请求参数：去掉空值，值转为字符串，fields 去掉空白"""
+    normalized = {}
+    for key, value in params.items():
+        if value is None or value == '':
+            continue
+        value = str(value)
+        if key == 'fields':
+            value = ','.join(field.strip() for field in value.split(',') if field.strip())
+        normalized[key] = value
+    return dict(sorted(normalized.items()))
+
+
+def cache_key(endpoint: str, params: dict[str, str]) -> str:
+    """缓存键：接口名 + 规范化参数的 SHA-256"""
+    payload = json.dumps([CACHE_FORMAT_VERSION, endpoint, params], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def window_end(endpoint: str, params: dict[str, str]) -> str | None:
+    """
+    请求区间涉及的最晚日期
+
+    Returns:
+        'YYYYMMDD'；没有日期参数、只有开始日期或日期格式无法识别时返回 None（不可缓存）
+    """
+    dates = [params[key] for key in _END_DATE_PARAMS if key in params]
+    if not dates or any(len(date) != 8 or not date.isdigit() for date in dates):
+        return None
+    latest = max(dates)
+    if endpoint in _STATEMENT_ENDPOINTS:
+        latest = add_days(latest, config.tushare_response_cache_statement_lag_days)
+    return latest
+
+
+def recent_cutoff() -> str:
+    """
+    可缓存日期的上限：最近 N 个交易日中最早的一天，请求的最晚日期需早于该日期
+
+    没有交易日历时按 2N+10 个自然日保守估计
+    """
+    from fin_data_hub.data.tushare.tushare_data_cache import get_trading_calendar
+
+    today = current_date_ymd()
+    recent_days = config.tushare_response_cache_recent_trade_days
+    calendar = get_trading_calendar()
+    if calendar is not None and recent_days > 0:
+        open_days = calendar.trading_days_array(calendar.first_date, today)
+        if len(open_days) >= recent_days:
+            return str(open_days[-recent_days])
+    return add_days(today, -(2 * recent_days + 10))
+
+
+def is_cacheable(endpoint: str, params: dict[str, str], cutoff: str) -> bool:
+    """请求的最晚日期早于 ``cutoff`` 时可以缓存"""
+    latest = window_end(endpoint, params)
+    return latest is not None and latest < cutoff
+
+
+class ResponseCache:
+    """磁盘响应缓存"""
+
+    def __init__(self, root: str | Path, max_bytes: int):
+        """
+        Args:
+            root: 缓存目录
+            max_bytes: 占用磁盘上限（字节）
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._total_bytes: int | None = None
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str, key: str) -> pd.DataFrame | None:
+        """读取缓存的响应，未命中或文件损坏时返回 None"""
+        path = self._path(endpoint, key)
+        try:
+            df = pq.read_table(path).to_pandas()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"[响应缓存] 读取 {path} 失败，删除后重新请求: {e}")
+            self._remove(path)
+            return None
+        try:
+            # 更新修改时间，淘汰时按最近使用排序
+            os.utime(path)
+        except OSError:
+            pass
+        return df
+
+    def put(self, endpoint: str, key: str, df: pd.DataFrame):
+        """保存响应，先写临时文件再替换，其他进程不会读到写了一半的文件"""
+        path = self._path(endpoint, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression='zstd')
+        size = tmp_path.stat().st_size
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def size(self) -> int:
+        """当前占用字节数"""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            return self._total_bytes
+
+    def _path(self, endpoint: str, key: str) -> Path:
+        return self.root / endpoint / key[:2] / f'{key}.parquet'
+
+    def _files(self) -> list[os.DirEntry]:
+        files = []
+        stack = [self.root]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.parquet'):
+                    files.append(entry)
+        return files
+
+    def _scan_size(self) -> int:
+        total = 0
+        for entry in self._files():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _evict(self):
+        """按修改时间从旧到新删除，直到占用降到上限的 90% 以下；需持有 _lock"""
+        files = []
+        for entry in self._files():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        # 重新统计，包含其他进程写入的文件
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * _EVICT_TARGET_RATIO
+        removed = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            if self._remove(Path(path)):
+                total -= size
+                removed += 1
+        self._total_bytes = total
+        logger.info(f"[响应缓存] 淘汰 {removed} 个响应，当前占用 {total / 1024 / 1024:.1f} MB")
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+
+def get_response_cache() -> ResponseCache:
+    """获取进程内共享的响应缓存"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    config.tushare_response_cache_dir, config.tushare_response_cache_max_mb * 1024 * 1024
+                )
+    return _cache
+
+
+class CachedClient:
+    """
+    带响应缓存的 Tushare 客户端代理
+
+    包在 ``RateLimitedClient`` 外层：命中缓存时直接返回，不经过限流；
+    未命中时调用接口，可缓存的 DataFrame 响应写入缓存。
+    """
+
+    def __init__(self, client: Any, cache: ResponseCache | None = None):
+        self._client = client
+        self._cache = cache or get_response_cache()
+
+    def query(self, api_name: str, fields: str = '', **kwargs) -> Any:
+        return self._call(api_name, self._client.query, {'fields': fields, **kwargs}, api_name)
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        func = getattr(self._client, name)
+
+        def wrapper(*args, **kwargs):
+            if args:
+                record_api_cache(name, 'bypass')
+                return func(*args, **kwargs)
+            return self._call(name, func, kwargs)
+
+        return wrapper
+
+    def _call(self, endpoint: str, func: Callable[..., Any], kwargs: dict[str, Any], *args) -> Any:
+        params = normalize_params(kwargs)
+        if not is_cacheable(endpoint, params, recent_cutoff()):
+            record_api_cache(endpoint, 'bypass')
+            return func(*args, **kwargs)
+
+        key = cache_key(endpoint, params)
+        cached = self._cache.get(endpoint, key)
+        if cached is not None:
+            record_api_cache(endpoint, 'hit')
+            return cached
+
+        record_api_cache(endpoint, 'miss')
+        result = func(*args, **kwargs)
+        if isinstance(result, pd.DataFrame):
+            try:
+                self._cache.put(endpoint, key, result)
+            except Exception as e:
+                logger.warning(f"[响应缓存] 保存 {endpoint} {params} 失败: {e}")
+        return result
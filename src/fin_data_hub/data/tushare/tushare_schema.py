@@ -0,0 +1,468 @@
+"""
+Tushare 数据表结构管理
+
+显式声明每张数据表的列类型、主键（取自 ``constants.TABLE_KEYS``）、二级索引和分区，
+启动时创建缺失的表、为已有表补充新增列、为分区表补充年度分区；
+早期由 ``DataFrame.to_sql`` 隐式建出的无主键表只由补全脚本迁移为托管结构（复制全表耗时较长），
+API 启动时只记录警告。多个进程同时执行时通过 MySQL ``GET_LOCK`` 串行化。
+
+日期列统一存为 INT（YYYYMMDD），读出后通过 ``normalize_date_columns`` 转回字符串。
+拉取的数据在入队等待写入前通过 ``compact_frame`` 转为紧凑类型，降低补全时的内存峰值。
+"""
+import datetime
+import logging
+import re
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from fin_data_hub.data.tushare.constants import (
+    TABLE_KEYS,
+    TRADE_CALENDAR_TABLE,
+    STOCK_BASIC_TABLE,
+    STOCK_ST_TABLE,
+    DAILY_TABLE,
+    DAILY_BASIC_TABLE,
+    WEEKLY_TABLE,
+    MONTHLY_TABLE,
+    ADJ_FACTOR_TABLE,
+    DAILY_QFQ_TABLE,
+    DAILY_HFQ_TABLE,
+    HSGT_TOP10_TABLE,
+    INCOME_TABLE,
+    BALANCESHEET_TABLE,
+    CASHFLOW_TABLE,
+)
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine, table_exists
+from fin_data_hub.foundation.utils.date_utils import get_stock_start_date
+
+logger = logging.getLogger(__name__)
+
+# 创建、迁移数据表时持有的 MySQL 命名锁
+_SCHEMA_LOCK_NAME = 'fin_data_hub.ensure_schemas'
+
+# 以 INT（YYYYMMDD）存储的日期列
+DATE_COLUMNS = (
+    'cal_date', 'pretrade_date', 'list_date', 'delist_date',
+    'trade_date', 'ann_date', 'f_ann_date', 'end_date',
+)
+
+CODE = 'CHAR(9)'
+DATE = 'INT UNSIGNED'
+PRICE = 'DECIMAL(12,4)'
+RATIO = 'DECIMAL(16,4)'
+VOLUME = 'DECIMAL(20,4)'
+AMOUNT = 'DOUBLE'
+FACTOR = 'DECIMAL(16,6)'
+
+
+class TableSchema:
+    """数据表结构声明"""
+
+    def __init__(
+        self,
+        name: str,
+        columns: list[tuple[str, str]],
+        indexes: tuple[tuple[str, ...], ...] = (),
+        partition_column: str | None = None,
+    ):
+        """
+        Args:
+            name: 表名
+            columns: (列名, 列类型) 列表，主键列自动加 NOT NULL
+            indexes: 二级索引列
+            partition_column: 按年 RANGE 分区的日期列，为 None 时不分区
+        """
+        self.name = name
+        self.columns = columns
+        self.primary_key = TABLE_KEYS[name]
+        self.indexes = indexes
+        self.partition_column = partition_column
+
+    @property
+    def column_names(self) -> list[str]:
+        return [name for name, _ in self.columns]
+
+    def column_sql(self, name: str, column_type: str) -> str:
+        if name in self.primary_key:
+            default = " DEFAULT 0" if column_type == DATE else " DEFAULT ''"
+            return f"`{name}` {column_type} NOT NULL{default}"
+        return f"`{name}` {column_type} NULL"
+
+    def create_sql(self, table_name: str | None = None) -> str:
+        lines = [self.column_sql(name, column_type) for name, column_type in self.columns]
+        lines.append(f"PRIMARY KEY ({', '.join(f'`{c}`' for c in self.primary_key)})")
+        for index in self.indexes:
+            lines.append(f"KEY idx_{'_'.join(index)} ({', '.join(f'`{c}`' for c in index)})")
+        sql = (
+            f"CREATE TABLE {table_name or self.name} (\n    "
+            + ",\n    ".join(lines)
+            + "\n) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+        )
+        if self.partition_column:
+            partitions = [
+                f"PARTITION p{year} VALUES LESS THAN ({year + 1}0101)"
+                for year in _partition_years()
+            ]
+            partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+            sql += f"\nPARTITION BY RANGE ({self.partition_column}) (\n    " + ",\n    ".join(partitions) + "\n)"
+        return sql
+
+
+def _columns(spec: str, column_type: str) -> list[tuple[str, str]]:
+    return [(name, column_type) for name in spec.split()]
+
+
+_BAR_COLUMNS = (
+    [('ts_code', CODE), ('trade_date', DATE)]
+    + _columns('open high low close pre_close change', PRICE)
+    + [('pct_chg', RATIO), ('vol', VOLUME), ('amount', VOLUME)]
+)
+
+_STATEMENT_HEAD_COLUMNS = [
+    ('ts_code', CODE),
+    ('ann_date', DATE),
+    ('f_ann_date', DATE),
+    ('end_date', DATE),
+    ('report_type', 'VARCHAR(4)'),
+    ('comp_type', 'VARCHAR(4)'),
+    ('end_type', 'VARCHAR(4)'),
+]
+
+_INCOME_VALUE_COLUMNS = """
+basic_eps diluted_eps total_revenue revenue int_income prem_earned comm_income n_commis_income
+n_oth_income n_oth_b_income prem_income out_prem une_prem_reser reins_income n_sec_tb_income
+n_sec_uw_income n_asset_mg_income oth_b_income fv_value_chg_gain invest_income ass_invest_income
+forex_gain total_cogs oper_cost int_exp comm_exp biz_tax_surchg sell_exp admin_exp fin_exp
+assets_impair_loss prem_refund compens_payout reser_insur_liab div_payt reins_exp oper_exp
+compens_payout_refu insur_reser_refu reins_cost_refund other_bus_cost operate_profit non_oper_income
+non_oper_exp nca_disploss total_profit income_tax n_income n_income_attr_p minority_gain
+oth_compr_income t_compr_income compr_inc_attr_p compr_inc_attr_m_s ebit ebitda insurance_exp
+undist_profit distable_profit rd_exp fin_exp_int_exp fin_exp_int_inc transfer_surplus_rese
+transfer_housing_imprest transfer_oth adj_lossgain withdra_legal_surplus withdra_legal_pubfund
+withdra_biz_devfund withdra_rese_fund withdra_oth_ersu workers_welfare distr_profit_shrhder
+prfshare_payable_dvd comshare_payable_dvd capit_comstock_div net_after_nr_lp_correct
+credit_impa_loss net_expo_hedging_benefits oth_impair_loss_assets total_opcost amodcost_fin_assets
+oth_income asset_disp_income continued_net_profit end_net_profit
+"""
+
+_BALANCESHEET_VALUE_COLUMNS = """
+total_share cap_rese undistr_porfit surplus_rese special_rese money_cap trad_asset notes_receiv
+accounts_receiv oth_receiv prepayment div_receiv int_receiv inventories amor_exp nca_within_1y
+sett_rsrv loanto_oth_bank_fi premium_receiv reinsur_receiv reinsur_res_receiv pur_resale_fa
+oth_cur_assets total_cur_assets fa_avail_for_sale htm_invest lt_eqt_invest invest_real_estate
+time_deposits oth_assets lt_rec fix_assets cip const_materials fixed_assets_disp produc_bio_assets
+oil_and_gas_assets intan_assets r_and_d goodwill lt_amor_exp defer_tax_assets decr_in_disbur
+oth_nca total_nca cash_reser_cb depos_in_oth_bfi prec_metals deriv_assets rr_reins_une_prem
+rr_reins_outstd_cla rr_reins_lins_liab rr_reins_lthins_liab refund_depos ph_pledge_loans
+refund_cap_depos indep_acct_assets client_depos client_prov transac_seat_fee invest_as_receiv
+total_assets lt_borr st_borr cb_borr depos_ib_deposits loan_oth_bank trading_fl notes_payable
+acct_payable adv_receipts sold_for_repur_fa comm_payable payroll_payable taxes_payable int_payable
+div_payable oth_payable acc_exp deferred_inc st_bonds_payable payable_to_reinsurer rsrv_insur_cont
+acting_trading_sec acting_uw_sec non_cur_liab_due_1y oth_cur_liab total_cur_liab bond_payable
+lt_payable specific_payables estimated_liab defer_tax_liab defer_inc_non_cur_liab oth_ncl total_ncl
+depos_oth_bfi deriv_liab depos agency_bus_liab oth_liab prem_receiv_adva depos_received ph_invest
+reser_une_prem reser_outstd_claims reser_lins_liab reser_lthins_liab indept_acc_liab pledge_borr
+indem_payable policy_div_payable total_liab treasury_share ordin_risk_reser forex_differ
+invest_loss_unconf minority_int total_hldr_eqy_exc_min_int total_hldr_eqy_inc_min_int
+total_liab_hldr_eqy lt_payroll_payable oth_comp_income oth_eqt_tools oth_eqt_tools_p_shr
+lending_funds acc_receivable st_fin_payable payables hfs_assets hfs_sales cost_fin_assets
+fair_value_fin_assets cip_total oth_pay_total long_pay_total debt_invest oth_debt_invest
+oth_eq_invest oth_illiq_fin_assets oth_eq_ppbond receiv_financing use_right_assets lease_liab
+contract_assets contract_liab accounts_receiv_bill accounts_pay oth_rcv_total fix_assets_total
+"""
+
+_CASHFLOW_VALUE_COLUMNS = """
+net_profit finan_exp c_fr_sale_sg recp_tax_rends n_depos_incr_fi n_incr_loans_cb n_inc_borr_oth_fi
+prem_fr_orig_contr n_incr_insured_dep n_reinsur_prem n_incr_disp_tfa ifc_cash_incr n_incr_disp_faas
+n_incr_loans_oth_bank n_cap_incr_repur c_fr_oth_operate_a c_inf_fr_operate_a c_paid_goods_s
+c_paid_to_for_empl c_paid_for_taxes n_incr_clt_loan_adv n_incr_dep_cbob c_pay_claims_orig_inco
+pay_handling_chrg pay_comm_insur_plcy oth_cash_pay_oper_act st_cash_out_act n_cashflow_act
+oth_recp_ral_inv_act c_disp_withdrwl_invest c_recp_return_invest n_recp_disp_fiolta n_recp_disp_sobu
+stot_inflows_inv_act c_pay_acq_const_fiolta c_paid_invest n_disp_subs_oth_biz oth_pay_ral_inv_act
+n_incr_pledge_loan stot_out_inv_act n_cashflow_inv_act c_recp_borrow proc_issue_bonds
+oth_cash_recp_ral_fnc_act stot_cash_in_fnc_act free_cashflow c_prepay_amt_borr c_pay_dist_dpcp_int_exp
+incl_dvd_profit_paid_sc_ms oth_cashpay_ral_fnc_act stot_cashout_fnc_act n_cash_flows_fnc_act
+eff_fx_flu_cash n_incr_cash_cash_equ c_cash_equ_beg_period c_cash_equ_end_period c_recp_cap_contrib
+incl_cash_rec_saims uncon_invest_loss prov_depr_assets depr_fa_coga_dpba amort_intang_assets
+lt_amort_deferred_exp decr_deferred_exp incr_acc_exp loss_disp_fiolta loss_scr_fa loss_fv_chg
+invest_loss decr_def_inc_tax_assets incr_def_inc_tax_liab decr_inventories decr_oper_payable
+incr_oper_payable others im_net_cashflow_oper_act conv_debt_into_cap conv_copbonds_due_within_1y
+fa_fnc_leases end_bal_cash beg_bal_cash end_bal_cash_equ beg_bal_cash_equ im_n_incr_cash_equ
+net_dism_capital_add net_cash_rece_sec credit_impa_loss use_right_asset_dep oth_loss_asset
+"""
+
+SCHEMAS: dict[str, TableSchema] = {
+    schema.name: schema
+    for schema in [
+        TableSchema(TRADE_CALENDAR_TABLE, [
+            ('exchange', 'VARCHAR(8)'),
+            ('cal_date', DATE),
+            ('is_open', 'TINYINT'),
+            ('pretrade_date', DATE),
+        ]),
+        TableSchema(STOCK_BASIC_TABLE, [
+            ('ts_code', CODE),
+            ('symbol', 'CHAR(6)'),
+            ('name', 'VARCHAR(32)'),
+            ('area', 'VARCHAR(16)'),
+            ('industry', 'VARCHAR(32)'),
+            ('cnspell', 'VARCHAR(32)'),
+            ('market', 'VARCHAR(16)'),
+            ('list_date', DATE),
+            ('delist_date', DATE),
+            ('act_name', 'VARCHAR(128)'),
+            ('act_ent_type', 'VARCHAR(32)'),
+            ('status', 'CHAR(1)'),
+        ]),
+        TableSchema(STOCK_ST_TABLE, [
+            ('ts_code', CODE),
+            ('name', 'VARCHAR(32)'),
+            ('trade_date', DATE),
+            ('type', 'VARCHAR(8)'),
+            ('type_name', 'VARCHAR(32)'),
+        ], indexes=(('trade_date',),)),
+        TableSchema(DAILY_TABLE, _BAR_COLUMNS, indexes=(('trade_date',),), partition_column='trade_date'),
+        TableSchema(DAILY_BASIC_TABLE, [
+            ('ts_code', CODE),
+            ('trade_date', DATE),
+            ('close', PRICE),
+        ] + _columns('turnover_rate turnover_rate_f volume_ratio pe pe_ttm pb ps ps_ttm dv_ratio dv_ttm', RATIO)
+          + _columns('total_share float_share free_share total_mv circ_mv', VOLUME),
+            indexes=(('trade_date',),), partition_column='trade_date'),
+        TableSchema(WEEKLY_TABLE, _BAR_COLUMNS, indexes=(('trade_date',),)),
+        TableSchema(MONTHLY_TABLE, _BAR_COLUMNS, indexes=(('trade_date',),)),
+        TableSchema(ADJ_FACTOR_TABLE, [
+            ('ts_code', CODE),
+            ('trade_date', DATE),
+            ('adj_factor', FACTOR),
+        ], indexes=(('trade_date',),), partition_column='trade_date'),
+        TableSchema(DAILY_QFQ_TABLE, _BAR_COLUMNS + [('adj_factor', FACTOR)],
+            indexes=(('trade_date',),), partition_column='trade_date'),
+        TableSchema(DAILY_HFQ_TABLE, _BAR_COLUMNS + [('adj_factor', FACTOR)],
+            indexes=(('trade_date',),), partition_column='trade_date'),
+        TableSchema(HSGT_TOP10_TABLE, [
+            ('trade_date', DATE),
+            ('ts_code', CODE),
+            ('name', 'VARCHAR(32)'),
+            ('close', PRICE),
+            ('change', RATIO),
+            ('rank', 'TINYINT UNSIGNED'),
+            ('market_type', 'VARCHAR(2)'),
+            ('amount', AMOUNT),
+            ('net_amount', AMOUNT),
+            ('buy', AMOUNT),
+            ('sell', AMOUNT),
+        ]),
+        TableSchema(INCOME_TABLE,
+            _STATEMENT_HEAD_COLUMNS + _columns(_INCOME_VALUE_COLUMNS, AMOUNT) + [('update_flag', 'CHAR(1)')],
+            indexes=(('end_date',),)),
+        TableSchema(BALANCESHEET_TABLE,
+            _STATEMENT_HEAD_COLUMNS + _columns(_BALANCESHEET_VALUE_COLUMNS, AMOUNT) + [('update_flag', 'CHAR(1)')],
+            indexes=(('end_date',),)),
+        TableSchema(CASHFLOW_TABLE,
+            _STATEMENT_HEAD_COLUMNS + _columns(_CASHFLOW_VALUE_COLUMNS, AMOUNT) + [('update_flag', 'CHAR(1)')],
+            indexes=(('end_date',),)),
+    ]
+}
+
+
+def ensure_schemas(migrate: bool = True, lock_timeout: int = -1):
+    """
+    创建或迁移所有托管数据表，应用启动和补全脚本开始时调用
+
+    持有 MySQL 命名锁期间执行，其他进程等待锁释放后重新检查各表的状态
+
+    Args:
+        migrate: 是否迁移无主键的旧表；API 启动时传 False，只由补全脚本迁移
+        lock_timeout: 等待命名锁的秒数，负数表示一直等待；超时后跳过本次检查
+    """
+    with mysql_engine().connect() as lock_conn:
+        acquired = lock_conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"), {'name': _SCHEMA_LOCK_NAME, 'timeout': lock_timeout}
+        ).scalar()
+        if not acquired:
+            logger.warning(f"[表结构] {lock_timeout} 秒内未获取到表结构锁（其他进程正在创建或迁移），跳过")
+            return
+        try:
+            for schema in SCHEMAS.values():
+                try:
+                    ensure_schema(schema, migrate)
+                except Exception as e:
+                    logger.error(f"[表结构] {schema.name} 创建或迁移失败: {e}")
+        finally:
+            lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {'name': _SCHEMA_LOCK_NAME})
+
+
+def ensure_schema(schema: TableSchema, migrate: bool = True):
+    """
+    创建或迁移单张数据表，需持有表结构锁
+
+    Args:
+        schema: 表结构
+        migrate: 是否迁移无主键的旧表，为 False 时只记录警告
+    """
+    if not table_exists(schema.name):
+        with mysql_engine().begin() as conn:
+            conn.execute(text(schema.create_sql()))
+        logger.info(f"[表结构] 创建数据表 {schema.name}")
+        return
+
+    if not _has_primary_key(schema.name):
+        if not migrate:
+            logger.warning(f"[表结构] {schema.name} 是无主键的旧表，请运行补全脚本完成迁移")
+            return
+        _migrate_legacy_table(schema)
+        return
+
+    _add_missing_columns(schema)
+    if schema.partition_column:
+        _ensure_partitions(schema)
+
+
+def normalize_date_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """把从数据库读出的 INT 日期列转回 'YYYYMMDD' 字符串，0 和空值视为缺失"""
+    for column in DATE_COLUMNS:
+        if column in df.columns and pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = df[column].map(lambda v: None if pd.isna(v) or v == 0 else str(int(v)))
+    return df
+
+
+def compact_frame(df: pd.DataFrame | None, table: str) -> pd.DataFrame | None:
+    """
+    把拉取的数据转为紧凑类型，写入结果不变
+
+    - ts_code 等代码列转为 category
+    - 日期列转为 int32（YYYYMMDD），有空值时为可空的 Int32
+    - DECIMAL/DOUBLE 列在 float32 能精确还原（按列的小数位数）时转为 float32，否则保留 float64
+
+    Args:
+        df: 拉取的数据
+        table: 目标数据表，按其表结构判断各列的精度
+    """
+    if df is None or df.empty:
+        return df
+    schema = SCHEMAS.get(table)
+    column_types = dict(schema.columns) if schema is not None else {}
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        column_type = column_types.get(column)
+        if column in DATE_COLUMNS:
+            series = _compact_dates(series)
+        elif column == 'ts_code' or column_type == CODE:
+            series = series.astype('category')
+        elif column_type is not None and pd.api.types.is_float_dtype(series):
+            series = _downcast_float(series, _decimal_scale(column_type))
+        columns[column] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _compact_dates(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    values = pd.to_numeric(series, errors='coerce')
+    if values.isna().sum() > series.isna().sum():
+        # 存在无法解析的日期，保持原样
+        return series
+    if values.isna().any():
+        return values.astype('Int32')
+    return values.astype(np.int32)
+
+
+def _decimal_scale(column_type: str) -> int | None:
+    """DECIMAL(p,s) 的小数位数；DOUBLE 等浮点类型返回 None，要求 float32 精确相等"""
+    match = re.fullmatch(r'DECIMAL\(\d+,(\d+)\)', column_type.upper())
+    return int(match.group(1)) if match else None
+
+
+def _downcast_float(series: pd.Series, scale: int | None) -> pd.Series:
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(over='ignore'):
+        narrowed = values.astype(np.float32)
+    restored = narrowed.astype(np.float64)
+    if scale is not None:
+        restored, values = np.round(restored, scale), np.round(values, scale)
+    if not np.array_equal(restored, values, equal_nan=True):
+        return series
+    return pd.Series(narrowed, index=series.index, name=series.name)
+
+
+def _partition_years() -> range:
+    """分区年份：从数据起始年份到明年"""
+    return range(int(get_stock_start_date()[:4]), datetime.date.today().year + 2)
+
+
+def _has_primary_key(table: str) -> bool:
+    query = """
+    SELECT COUNT(*) FROM information_schema.table_constraints
+    WHERE table_schema = DATABASE() AND table_name = :table_name AND constraint_type = 'PRIMARY KEY'
+    """
+    with mysql_engine().connect() as conn:
+        row = conn.execute(text(query), {'table_name': table}).fetchone()
+        return row[0] > 0 if row else False
+
+
+def _existing_columns(table: str) -> list[str]:
+    query = """
+    SELECT column_name FROM information_schema.columns
+    WHERE table_schema = DATABASE() AND table_name = :table_name
+    ORDER BY ordinal_position
+    """
+    with mysql_engine().connect() as conn:
+        return [row[0] for row in conn.execute(text(query), {'table_name': table})]
+
+
+def _add_missing_columns(schema: TableSchema):
+    """为已托管的表补充新声明的列"""
+    existing = set(_existing_columns(schema.name))
+    missing = [(name, column_type) for name, column_type in schema.columns if name not in existing]
+    if not missing:
+        return
+    additions = ', '.join(f"ADD COLUMN {schema.column_sql(name, column_type)}" for name, column_type in missing)
+    with mysql_engine().begin() as conn:
+        conn.execute(text(f"ALTER TABLE {schema.name} {additions}"))
+    logger.info(f"[表结构] {schema.name} 新增列 {[name for name, _ in missing]}")
+
+
+def _ensure_partitions(schema: TableSchema):
+    """把 pmax 拆分出缺失的年度分区"""
+    query = """
+    SELECT partition_name FROM information_schema.partitions
+    WHERE table_schema = DATABASE() AND table_name = :table_name AND partition_name IS NOT NULL
+    """
+    with mysql_engine().connect() as conn:
+        existing = {row[0] for row in conn.execute(text(query), {'table_name': schema.name})}
+    if 'pmax' not in existing:
+        return
+    missing = [year for year in _partition_years() if f"p{year}" not in existing]
+    last_year = max((int(name[1:]) for name in existing if name[1:].isdigit()), default=0)
+    missing = [year for year in missing if year > last_year]
+    if not missing:
+        return
+    partitions = [f"PARTITION p{year} VALUES LESS THAN ({year + 1}0101)" for year in missing]
+    partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    with mysql_engine().begin() as conn:
+        conn.execute(text(f"ALTER TABLE {schema.name} REORGANIZE PARTITION pmax INTO ({', '.join(partitions)})"))
+    logger.info(f"[表结构] {schema.name} 新增分区 {[f'p{year}' for year in missing]}")
+
+
+def _migrate_legacy_table(schema: TableSchema):
+    """
+    迁移无主键的旧表：按声明结构建新表，去重复制数据后替换原表
+    """
+    new_table = f"{schema.name}__migrate"
+    legacy_table = f"{schema.name}__legacy"
+    existing = set(_existing_columns(schema.name))
+    columns = ', '.join(f"`{c}`" for c in schema.column_names if c in existing)
+
+    logger.info(f"[表结构] 开始迁移旧表 {schema.name}")
+    with mysql_engine().begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {new_table}"))
+        conn.execute(text(schema.create_sql(new_table)))
+        conn.execute(text(f"INSERT IGNORE INTO {new_table} ({columns}) SELECT {columns} FROM {schema.name}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {legacy_table}"))
+        conn.execute(text(f"RENAME TABLE {schema.name} TO {legacy_table}, {new_table} TO {schema.name}"))
+        conn.execute(text(f"DROP TABLE {legacy_table}"))
+    logger.info(f"[表结构] 旧表 {schema.name} 迁移完成")
@@ -0,0 +1,174 @@
+"""
+财务报表按报告期同步
+
+利润表、资产负债表、现金流量表使用 VIP 接口（``income_vip`` / ``balancesheet_vip`` / ``cashflow_vip``）
+按报告期拉取全市场数据，一个报告期只需几次请求，不再逐只股票调用：
+- 报告期由 ``get_all_quarter_end`` 生成，每个报告期按 limit / offset 分页拉取
+- 按 (ts_code, end_date, report_type, f_ann_date) upsert；同一主键在响应中同时有原始报告和更正后的报告时
+  （update_flag 为 0 / 1），只保留更正后的报告
+- 补全时每个报告期作为一个截面窗口记录进度，中断后可以恢复；调用频率由共享令牌桶按接口配置限流
+- 报告期结束后 ``statement_restatement_days`` 天内仍可能有新公告或更正，日常调度只重新拉取这些报告期
+"""
+import logging
+from typing import Any, NamedTuple
+
+import pandas as pd
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare.constants import (
+    BALANCESHEET_TABLE,
+    CASHFLOW_TABLE,
+    INCOME_TABLE,
+    TABLE_KEYS,
+)
+from fin_data_hub.data.tushare.tushare_backfill_progress import CROSS_SECTION_UNIT, BackfillRun, backfill_run
+from fin_data_hub.data.tushare.tushare_schema import compact_frame
+from fin_data_hub.data.tushare.tushare_storage import save_data
+from fin_data_hub.foundation.pipeline import run_pipeline
+from fin_data_hub.foundation.utils.date_utils import (
+    add_days,
+    current_date_ymd,
+    get_all_quarter_end,
+    get_stock_start_date,
+)
+
+logger = logging.getLogger(__name__)
+
+# 每页请求的行数，不超过 VIP 接口单次返回的上限；返回不足一页时说明已取完
+PAGE_SIZE = 5000
+
+
+class StatementSpec(NamedTuple):
+    """一种财务报表"""
+    table: str
+    endpoint: str
+    label: str
+
+
+STATEMENTS = {
+    'income': StatementSpec(INCOME_TABLE, 'income_vip', '利润表'),
+    'balancesheet': StatementSpec(BALANCESHEET_TABLE, 'balancesheet_vip', '资产负债表'),
+    'cashflow': StatementSpec(CASHFLOW_TABLE, 'cashflow_vip', '现金流量表'),
+}
+
+
+def statement_periods(start_date: str, end_date: str) -> list[str]:
+    """[start_date, end_date] 内已结束的报告期"""
+    return get_all_quarter_end(start_date, end_date)
+
+
+def open_periods(today: str | None = None) -> list[str]:
+    """
+    仍可能有新公告或更正的报告期：报告期结束后不超过 ``statement_restatement_days`` 天
+
+    Args:
+        today: 当前日期，默认今天
+    """
+    today = today or current_date_ymd()
+    return statement_periods(add_days(today, -config.statement_restatement_days), today)
+
+
+def dedupe_restatements(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    同一主键只保留一行：有更正后的报告（update_flag 为 1）时保留更正后的报告，否则保留最后一行
+
+    Args:
+        df: 报表数据
+        table: 目标数据表，按其主键去重
+    """
+    if df is None or df.empty:
+        return df
+    keys = list(TABLE_KEYS[table])
+    if 'update_flag' in df.columns:
+        flags = df['update_flag'].fillna('0').astype(str)
+        df = df.iloc[flags.to_numpy().argsort(kind='stable')]
+    return df.drop_duplicates(subset=keys, keep='last').sort_index()
+
+
+def fetch_period(client: Any, name: str, period: str) -> pd.DataFrame:
+    """
+    分页拉取一个报告期的全市场报表
+
+    Returns:
+        去重后的紧凑数据，没有数据时为空 DataFrame
+    """
+    spec = STATEMENTS[name]
+    api = getattr(client, spec.endpoint)
+    pages = []
+    offset = 0
+    while True:
+        df = api(period=period, limit=PAGE_SIZE, offset=offset)
+        if df is None or df.empty:
+            break
+        pages.append(df)
+        if len(df) < PAGE_SIZE:
+            break
+        offset += len(df)
+    if not pages:
+        return pd.DataFrame()
+    df = dedupe_restatements(pd.concat(pages, ignore_index=True), spec.table)
+    return compact_frame(df, spec.table)
+
+
+def sync_periods(name: str, periods: list[str], run: BackfillRun | None = None, client: Any = None) -> int:
+    """
+    按报告期拉取并写入报表，拉取与写入流水线并行执行
+
+    Args:
+        name: 报表名称，见 ``STATEMENTS``
+        periods: 报告期列表
+        run: 补全任务，提供时跳过已完成的报告期并记录进度
+        client: Tushare 客户端，默认 ``get_tushare_client()``
+
+    Returns:
+        写入的行数
+    """
+    if client is None:
+        from fin_data_hub.data.tushare.tushare_data import get_tushare_client
+        client = get_tushare_client()
+    spec = STATEMENTS[name]
+    if run is not None:
+        completed = run.completed()
+        periods = [period for period in periods if (CROSS_SECTION_UNIT, period) not in completed]
+
+    written: list[int] = []
+
+    def fetch(period):
+        df = fetch_period(client, name, period)
+        logger.info(f"[{spec.label}] 获取到 {len(df)} 条 {period} 的{spec.label}数据")
+        return df
+
+    def write(period, df):
+        checkpoint = run.checkpoint(CROSS_SECTION_UNIT, period) if run is not None else None
+        written.append(save_data(df, spec.table, date_column='end_date', checkpoint=checkpoint))
+
+    run_pipeline(periods, fetch, write, ordered=True, name=spec.label)
+    return sum(written)
+
+
+def backfill_statement(name: str, start_date: str | None = None, resume: bool = False) -> int:
+    """
+    按报告期补全报表
+
+    Args:
+        name: 报表名称，见 ``STATEMENTS``
+        start_date: 开始日期，默认从最早的上市日期开始
+        resume: 恢复最近一次未完成的补全任务，跳过已完成的报告期
+
+    Returns:
+        写入的行数
+    """
+    spec = STATEMENTS[name]
+    with backfill_run(spec.table, current_date_ymd(), resume) as run:
+        periods = statement_periods(start_date or get_stock_start_date(), run.end_date)
+        return sync_periods(name, periods, run)
+
+
+def sync_open_periods(name: str, today: str | None = None) -> int:
+    """
+    重新拉取仍可能有新公告或更正的报告期，更早的报告期不再请求
+
+    Returns:
+        写入的行数
+    """
+    return sync_periods(name, open_periods(today))
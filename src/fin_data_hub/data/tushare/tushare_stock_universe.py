@@ -0,0 +1,201 @@
+"""
+股票池索引
+
+在股票列表上预先构建索引，查询时不再对 DataFrame 做布尔掩码扫描：
+- ts_code / symbol 哈希索引，O(1) 定位单只股票
+- industry / market / area / status 分组索引，筛选时对位置数组取交集
+- name / cnspell / symbol 前缀树，输入联想在前缀长度的时间内返回结果
+
+低基数的文本列使用 category 类型存储，降低内存占用。
+"""
+import logging
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 股票池保留的列
+UNIVERSE_COLUMNS = [
+    'ts_code', 'symbol', 'name', 'area', 'industry', 'cnspell', 'market', 'list_date', 'delist_date', 'status',
+]
+
+# 使用分组索引和 category 类型的列
+GROUP_COLUMNS = ('industry', 'market', 'area', 'status')
+
+
+class _TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.ids: list[int] = []
+
+
+class PrefixTrie:
+    """
+    前缀树，每个节点保存经过该节点的全部位置（按插入顺序），
+    查询时只需沿前缀走到对应节点
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def insert(self, key: str, position: int):
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            if not node.ids or node.ids[-1] != position:
+                node.ids.append(position)
+
+    def search(self, prefix: str) -> list[int]:
+        """返回以 prefix 开头的全部位置"""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.ids
+
+
+class StockUniverse:
+    """股票池索引"""
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: 股票列表，日期列为 'YYYYMMDD' 字符串
+        """
+        frame = df.reindex(columns=UNIVERSE_COLUMNS).copy()
+        # 上市股票排在前面，联想结果按此顺序返回
+        frame = frame.sort_values(['status', 'ts_code'], key=_listed_first).reset_index(drop=True)
+        for column in GROUP_COLUMNS:
+            frame[column] = frame[column].astype('category')
+        self.frame = frame
+        self._build_indexes()
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> 'StockUniverse':
+        """
+        直接使用已整理好的 ``frame``（如从快照映射的数据）构建索引，不复制数据；
+        列或类型不符合时按普通股票列表重新整理
+        """
+        prepared = list(frame.columns) == UNIVERSE_COLUMNS and all(
+            isinstance(frame[column].dtype, pd.CategoricalDtype) for column in GROUP_COLUMNS
+        )
+        if not prepared:
+            return cls(frame)
+        universe = cls.__new__(cls)
+        universe.frame = frame
+        universe._build_indexes()
+        return universe
+
+    def _build_indexes(self):
+        frame = self.frame
+        self._by_code = {code: i for i, code in enumerate(frame['ts_code'])}
+        self._by_symbol = {symbol: i for i, symbol in enumerate(frame['symbol']) if isinstance(symbol, str)}
+        self._groups: dict[str, dict[str, np.ndarray]] = {}
+        for column in GROUP_COLUMNS:
+            codes = frame[column].cat.codes.to_numpy()
+            self._groups[column] = {
+                value: np.flatnonzero(codes == code) for code, value in enumerate(frame[column].cat.categories)
+            }
+
+        # 单行读取使用列数组，避免 DataFrame.iloc 的开销
+        self._values = {
+            column: (frame[column].cat.codes.to_numpy(), frame[column].cat.categories.to_numpy())
+            if column in GROUP_COLUMNS else frame[column].to_numpy(dtype=object)
+            for column in UNIVERSE_COLUMNS
+        }
+
+        # 按位置顺序插入，每个节点的位置列表保持有序且不重复
+        self._trie = PrefixTrie()
+        for i, keys in enumerate(zip(frame['name'], frame['cnspell'], frame['symbol'])):
+            for key in keys:
+                if isinstance(key, str) and key:
+                    self._trie.insert(key.lower(), i)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def get(self, ts_code: str) -> dict[str, Any] | None:
+        """按 ts_code 获取股票信息"""
+        position = self._by_code.get(ts_code)
+        return None if position is None else self._row(position)
+
+    def resolve(self, code: str) -> str | None:
+        """把 ts_code 或 6 位 symbol 解析为 ts_code"""
+        if code in self._by_code:
+            return code
+        position = self._by_symbol.get(code)
+        return None if position is None else self._values['ts_code'][position]
+
+    def filter(self, **conditions: str | Iterable[str] | None) -> pd.DataFrame:
+        """
+        按分组列筛选股票，如 ``filter(industry='银行', status='L')``
+
+        条件值可以是单个值或多个值，为 None 的条件忽略
+
+        Raises:
+            KeyError: 条件列不在分组索引中
+        """
+        positions: np.ndarray | None = None
+        for column, values in conditions.items():
+            if values is None:
+                continue
+            group = self._groups[column]
+            if isinstance(values, str):
+                values = [values]
+            matched = [group[value] for value in values if value in group]
+            matched_positions = np.concatenate(matched) if matched else np.empty(0, dtype=np.int64)
+            positions = matched_positions if positions is None else np.intersect1d(positions, matched_positions)
+        if positions is None:
+            return self.frame
+        return self.frame.iloc[np.sort(positions)]
+
+    def search(self, query: str, limit: int = 10, status: str | None = None) -> list[dict[str, Any]]:
+        """
+        按名称、拼音首字母或代码前缀搜索股票
+
+        Args:
+            query: 搜索前缀，不区分大小写；也可以是完整的 ts_code
+            limit: 最多返回的条数
+            status: 只返回该上市状态的股票
+
+        Returns:
+            匹配的股票，上市股票在前
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        position = self._by_code.get(query.upper())
+        if position is not None:
+            return [self._row(position)]
+
+        results = []
+        status_codes, status_values = self._values['status']
+        for position in self._trie.search(query):
+            if status is not None and (status_codes[position] < 0 or status_values[status_codes[position]] != status):
+                continue
+            results.append(self._row(position))
+            if len(results) >= limit:
+                break
+        return results
+
+    def _row(self, position: int) -> dict[str, Any]:
+        row = {}
+        for column, values in self._values.items():
+            if isinstance(values, tuple):
+                codes, categories = values
+                value = categories[codes[position]] if codes[position] >= 0 else None
+            else:
+                value = values[position]
+            row[column] = None if pd.isna(value) else value
+        return row
+
+
+def _listed_first(column: pd.Series) -> pd.Series:
+    if column.name == 'status':
+        return column.ne('L')
+    return column
@@ -0,0 +1,60 @@
+"""
+Tushare 数据入库
+
+所有数据写入统一经过 ``save_data``，在同一事务内按自然键幂等写入数据、推进水位目录并记录变更日志，
+提交后按 (数据集, 日期) 发布失效事件，本进程的查询结果缓存据此移除受影响的条目；
+其他进程的缓存通过变更日志中的日期范围失效。
+"""
+import logging
+
+import pandas as pd
+
+from fin_data_hub.data.tushare.constants import TABLE_KEYS
+from fin_data_hub.data.tushare.tushare_backfill_progress import Checkpoint, record_checkpoint
+from fin_data_hub.data.tushare.tushare_change_log import record_change
+from fin_data_hub.data.tushare.tushare_watermark import update_watermarks
+from fin_data_hub.foundation.cache import publish_invalidation
+from fin_data_hub.foundation.mysql.bulk_writer import bulk_upsert
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
+
+logger = logging.getLogger(__name__)
+
+
+def save_data(
+    df: pd.DataFrame | None,
+    table: str,
+    date_column: str | None = 'trade_date',
+    checkpoint: Checkpoint | None = None,
+) -> int:
+    """
+    写入数据并在同一事务内更新水位
+
+    按 ``TABLE_KEYS`` 中的自然键执行 upsert，重复写入不会产生重复行
+
+    Args:
+        df: 待写入的数据
+        table: 目标数据表（同时作为水位目录中的数据集名称）
+        date_column: 用于推进水位的日期列，为 None 时以当天日期作为数据集水位
+        checkpoint: 补全任务的进度点，与数据在同一事务内提交；没有数据时也会记录
+
+    Returns:
+        写入的行数
+    """
+    if df is None or df.empty:
+        if checkpoint is not None:
+            with mysql_engine().begin() as conn:
+                record_checkpoint(conn, checkpoint, 0)
+        return 0
+    with mysql_engine().begin() as conn:
+        rows = bulk_upsert(df, table, TABLE_KEYS[table], conn=conn)
+        update_watermarks(conn, table, df, date_column)
+        if checkpoint is not None:
+            record_checkpoint(conn, checkpoint, rows)
+        # 最后记录变更，缩短变更记录时间与事务提交之间的间隔
+        dates = df[date_column] if date_column is not None and date_column in df.columns else None
+        record_change(conn, table, dates)
+    if date_column is None or date_column not in df.columns:
+        publish_invalidation(table)
+    else:
+        publish_invalidation(table, df[date_column].dropna().astype(str).unique())
+    return rows
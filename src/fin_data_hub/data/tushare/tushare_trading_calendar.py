@@ -0,0 +1,186 @@
+"""
+交易日历索引
+
+以自然日偏移为下标的开市位图 + 开市日前缀计数 + 有序交易日数组：
+- ``is_open`` / ``next_open`` / ``prev_open`` 为 O(1) 下标运算
+- ``trading_days(start, end)`` 为一次数组切片
+- 所有查询同时支持标量（'YYYYMMDD' 字符串或 YYYYMMDD 整数）和日期数组
+"""
+from typing import Any, Iterable
+
+import numpy as np
+
+
+def to_day_number(dates: Any) -> np.ndarray:
+    """YYYYMMDD（字符串或整数，标量或数组）转为 1970-01-01 起的天数"""
+    values = np.asarray(dates).astype(np.int64)
+    years = (values // 10000 - 1970).astype('datetime64[Y]')
+    months = years.astype('datetime64[M]') + (values // 100 % 100 - 1)
+    days = months.astype('datetime64[D]') + (values % 100 - 1)
+    return days.astype(np.int64)
+
+
+def from_day_number(days: Any) -> np.ndarray:
+    """1970-01-01 起的天数转为 YYYYMMDD 整数"""
+    dt = np.asarray(days, dtype=np.int64).astype('datetime64[D]')
+    years = dt.astype('datetime64[Y]').astype(np.int64) + 1970
+    months = dt.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    day_of_month = (dt - dt.astype('datetime64[M]')).astype(np.int64) + 1
+    return years * 10000 + months * 100 + day_of_month
+
+
+class TradingCalendar:
+    """交易日历"""
+
+    def __init__(self, cal_dates: Iterable[Any], is_open: Iterable[Any]):
+        """
+        Args:
+            cal_dates: 日历日期（'YYYYMMDD' 或 YYYYMMDD 整数）
+            is_open: 是否开市（1/0）
+        """
+        days = to_day_number(list(cal_dates))
+        opens = np.asarray(list(is_open)).astype(np.int64) == 1
+        if days.size == 0:
+            raise ValueError("交易日历为空")
+
+        self._first_day = int(days.min())
+        self._last_day = int(days.max())
+        size = self._last_day - self._first_day + 1
+
+        # 开市位图：下标为相对首日的自然日偏移
+        self._open = np.zeros(size, dtype=bool)
+        np.logical_or.at(self._open, days - self._first_day, opens)
+        # 前缀计数：_rank[i] 为 [0, i] 内的开市日数量
+        self._rank = np.cumsum(self._open, dtype=np.int64)
+        # 有序交易日（YYYYMMDD 整数）
+        self._open_days = from_day_number(np.flatnonzero(self._open) + self._first_day)
+
+    @property
+    def first_date(self) -> str:
+        return str(from_day_number(self._first_day))
+
+    @property
+    def last_date(self) -> str:
+        return str(from_day_number(self._last_day))
+
+    @property
+    def open_days(self) -> np.ndarray:
+        """全部交易日（YYYYMMDD 整数，升序）"""
+        return self._open_days
+
+    def is_open(self, dates: Any) -> Any:
+        """
+        是否为交易日，日历范围外视为非交易日
+
+        Args:
+            dates: 'YYYYMMDD' / YYYYMMDD 整数，或其数组
+
+        Returns:
+            标量输入返回 bool，数组输入返回 bool 数组
+        """
+        offsets = to_day_number(dates) - self._first_day
+        inside = (offsets >= 0) & (offsets < self._open.size)
+        result = np.zeros(offsets.shape, dtype=bool)
+        result[inside] = self._open[offsets[inside]]
+        return bool(result) if np.ndim(dates) == 0 else result
+
+    def next_open(self, dates: Any) -> Any:
+        """
+        严格晚于给定日期的下一个交易日
+
+        Returns:
+            标量输入返回 'YYYYMMDD'（超出日历范围返回 None），数组输入返回 YYYYMMDD 整数数组（超出范围为 0）
+        """
+        offsets = to_day_number(dates) - self._first_day
+        index = np.where(offsets < 0, 0, self._rank[np.clip(offsets, 0, self._open.size - 1)])
+        index = np.where(offsets >= self._open.size, self._open_days.size, index)
+        return self._lookup(index, np.ndim(dates) == 0)
+
+    def prev_open(self, dates: Any) -> Any:
+        """
+        严格早于给定日期的上一个交易日
+
+        Returns:
+            标量输入返回 'YYYYMMDD'（超出日历范围返回 None），数组输入返回 YYYYMMDD 整数数组（超出范围为 0）
+        """
+        offsets = to_day_number(dates) - self._first_day
+        clipped = np.clip(offsets, 0, self._open.size - 1)
+        index = self._rank[clipped] - self._open[clipped] - 1
+        index = np.where(offsets < 0, -1, index)
+        index = np.where(offsets >= self._open.size, self._open_days.size - 1, index)
+        return self._lookup(index, np.ndim(dates) == 0)
+
+    def trading_days(self, start_date: Any, end_date: Any) -> list[str]:
+        """
+        区间内的交易日（含首尾），按日期升序
+
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+        """
+        return [str(day) for day in self.trading_days_array(start_date, end_date)]
+
+    def trading_days_array(self, start_date: Any, end_date: Any) -> np.ndarray:
+        """区间内的交易日（含首尾），YYYYMMDD 整数数组"""
+        return self._open_days[self._start_index(start_date):self._end_index(end_date)]
+
+    def count_trading_days(self, start_dates: Any, end_dates: Any) -> Any:
+        """区间内（含首尾）的交易日数量，支持数组批量计算"""
+        count = self._end_index(end_dates) - self._start_index(start_dates)
+        return np.maximum(count, 0) if np.ndim(count) else max(int(count), 0)
+
+    def period_ends(self, start_date: Any, end_date: Any, freq: str) -> list[str]:
+        """
+        区间内每周 / 每月的最后一个交易日
+
+        Args:
+            freq: 'W' 按自然周（周一至周日），'M' 按自然月
+        """
+        days = self.trading_days_array(start_date, end_date)
+        if days.size == 0:
+            return []
+        periods = period_keys(days, freq)
+        last_of_period = np.append(periods[1:] != periods[:-1], True)
+        # 区间末尾所在的周期若在日历中还有后续交易日，则尚未结束
+        if self._end_index(end_date) < self._open_days.size:
+            following = period_keys(self._open_days[self._end_index(end_date)], freq)
+            if following == periods[-1]:
+                last_of_period[-1] = False
+        return [str(day) for day in days[last_of_period]]
+
+    def _start_index(self, dates: Any) -> Any:
+        offsets = to_day_number(dates) - self._first_day
+        clipped = np.clip(offsets, 0, self._open.size - 1)
+        index = self._rank[clipped] - self._open[clipped]
+        index = np.where(offsets < 0, 0, index)
+        index = np.where(offsets >= self._open.size, self._open_days.size, index)
+        return index if np.ndim(index) else int(index)
+
+    def _end_index(self, dates: Any) -> Any:
+        offsets = to_day_number(dates) - self._first_day
+        index = np.where(offsets < 0, 0, self._rank[np.clip(offsets, 0, self._open.size - 1)])
+        return index if np.ndim(index) else int(index)
+
+    def _lookup(self, index: np.ndarray, scalar: bool) -> Any:
+        valid = (index >= 0) & (index < self._open_days.size)
+        result = np.where(valid, self._open_days[np.clip(index, 0, self._open_days.size - 1)], 0)
+        if scalar:
+            return str(int(result)) if bool(valid) else None
+        return result
+
+
+def period_keys(dates: Any, freq: str) -> np.ndarray:
+    """
+    日期所属周期的编号，同一周期内相同
+
+    Args:
+        dates: YYYYMMDD 整数或其数组
+        freq: 'W' 自然周（周一开始），'M' 自然月
+    """
+    days = to_day_number(dates)
+    if freq == 'W':
+        # 1970-01-01 为周四，偏移 3 天使周一成为每周第一天
+        return (days + 3) // 7
+    if freq == 'M':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    raise ValueError(f"不支持的周期: {freq}")
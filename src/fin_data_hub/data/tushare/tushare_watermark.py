@@ -0,0 +1,182 @@
+"""
+数据水位目录
+
+按 (dataset, ts_code) 以及数据集整体记录最新入库日期，与数据写入在同一事务内更新。
+增量同步和补全任务通过一次批量查询获取所有股票的续传位置，
+不再对每只股票执行 ``SELECT MAX(trade_date)`` 扫表。
+"""
+import logging
+import threading
+
+import pandas as pd
+from sqlalchemy import Connection, text
+
+from fin_data_hub.data.tushare.constants import WATERMARK_TABLE
+from fin_data_hub.foundation.mysql.mysql_engine import (
+    mysql_engine,
+    table_exists_and_not_empty,
+)
+from fin_data_hub.foundation.utils.date_utils import current_date_ymd
+
+logger = logging.getLogger(__name__)
+
+# 数据集整体水位使用的 ts_code 占位符
+DATASET_WATERMARK_KEY = '*'
+
+_table_ready = False
+_table_lock = threading.Lock()
+
+
+def ensure_watermark_table():
+    """创建水位目录表（如不存在）"""
+    global _table_ready
+    if _table_ready:
+        return
+    with _table_lock:
+        if _table_ready:
+            return
+        ddl = f"""
+        CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+            dataset VARCHAR(64) NOT NULL,
+            ts_code VARCHAR(16) NOT NULL,
+            last_date CHAR(8) NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (dataset, ts_code)
+        )
+        """
+        with mysql_engine().begin() as conn:
+            conn.execute(text(ddl))
+        _table_ready = True
+
+
+def get_watermarks(dataset: str, date_column: str = 'trade_date') -> dict[str, str]:
+    """
+    获取数据集中每只股票的最新入库日期
+
+    Args:
+        dataset: 数据集名称（即数据表名）
+        date_column: 首次从数据表初始化水位时使用的日期列
+
+    Returns:
+        ts_code -> 最新入库日期（'YYYYMMDD'）
+    """
+    df = _read_watermarks(dataset)
+    if df.empty:
+        df = _bootstrap_watermarks(dataset, date_column)
+    df = df[df['ts_code'] != DATASET_WATERMARK_KEY]
+    return dict(zip(df['ts_code'], df['last_date']))
+
+
+def get_dataset_watermark(dataset: str, date_column: str = 'trade_date') -> str | None:
+    """
+    获取数据集整体的最新入库日期
+
+    Args:
+        dataset: 数据集名称（即数据表名）
+        date_column: 首次从数据表初始化水位时使用的日期列
+
+    Returns:
+        最新入库日期（'YYYYMMDD'），没有数据时返回 None
+    """
+    df = _read_watermarks(dataset, DATASET_WATERMARK_KEY)
+    if df.empty:
+        df = _bootstrap_watermarks(dataset, date_column)
+        df = df[df['ts_code'] == DATASET_WATERMARK_KEY]
+    if df.empty:
+        return None
+    return str(df['last_date'].iloc[0])
+
+
+def update_watermarks(conn: Connection, dataset: str, df: pd.DataFrame, date_column: str | None = 'trade_date'):
+    """
+    根据本次写入的数据推进水位，需在数据写入的同一事务（连接）中调用
+
+    Args:
+        conn: 数据写入所用的事务连接
+        dataset: 数据集名称（即数据表名）
+        df: 本次写入的数据
+        date_column: 日期列，为 None 时（如全量替换的维表）以当天日期作为数据集水位
+    """
+    ensure_watermark_table()
+
+    rows: list[dict] = []
+    if date_column is None:
+        rows.append({'ts_code': DATASET_WATERMARK_KEY, 'last_date': current_date_ymd()})
+    else:
+        dates = df[date_column].dropna().astype(str)
+        if dates.empty:
+            return
+        if 'ts_code' in df.columns:
+            # compact_frame 把 ts_code 转为 category，只按出现过的非空代码分组
+            per_code = dates.groupby(df.loc[dates.index, 'ts_code'], observed=True, dropna=True).max()
+            rows.extend({'ts_code': str(code), 'last_date': date} for code, date in per_code.items())
+        rows.append({'ts_code': DATASET_WATERMARK_KEY, 'last_date': dates.max()})
+
+    for row in rows:
+        row['dataset'] = dataset
+    _upsert_watermarks(conn, rows)
+
+
+def _upsert_watermarks(conn: Connection, rows: list[dict]):
+    """写入水位，只会向前推进；updated_at 记录最近一次写入时间，可作为数据版本戳"""
+    if not rows:
+        return
+    sql = f"""
+    INSERT INTO {WATERMARK_TABLE} (dataset, ts_code, last_date)
+    VALUES (:dataset, :ts_code, :last_date)
+    ON DUPLICATE KEY UPDATE last_date = GREATEST(last_date, VALUES(last_date)), updated_at = CURRENT_TIMESTAMP
+    """
+    conn.execute(text(sql), rows)
+
+
+def _read_watermarks(dataset: str, ts_code: str | None = None) -> pd.DataFrame:
+    """从水位目录读取数据集的水位"""
+    ensure_watermark_table()
+    query = f"SELECT ts_code, last_date FROM {WATERMARK_TABLE} WHERE dataset = %(dataset)s"
+    params = {'dataset': dataset}
+    if ts_code is not None:
+        query += " AND ts_code = %(ts_code)s"
+        params['ts_code'] = ts_code
+    return pd.read_sql(query, mysql_engine(), params=params)
+
+
+def _bootstrap_watermarks(dataset: str, date_column: str) -> pd.DataFrame:
+    """
+    水位目录中没有该数据集时，用一次分组查询从数据表初始化水位
+    """
+    empty = pd.DataFrame(columns=['ts_code', 'last_date'])
+    if not table_exists_and_not_empty(dataset):
+        return empty
+
+    logger.info(f"水位目录中没有数据集 {dataset}，从数据表初始化水位")
+    has_ts_code = _has_column(dataset, 'ts_code')
+    if has_ts_code:
+        query = f"SELECT ts_code, MAX({date_column}) as last_date FROM {dataset} GROUP BY ts_code"
+    else:
+        query = f"SELECT MAX({date_column}) as last_date FROM {dataset}"
+    df = pd.read_sql(query, mysql_engine()).dropna(subset=['last_date'])
+    if df.empty:
+        return empty
+    df['last_date'] = df['last_date'].astype(str)
+
+    rows: list[dict] = []
+    if has_ts_code:
+        rows.extend({'ts_code': code, 'last_date': date} for code, date in zip(df['ts_code'], df['last_date']))
+    rows.append({'ts_code': DATASET_WATERMARK_KEY, 'last_date': df['last_date'].max()})
+    for row in rows:
+        row['dataset'] = dataset
+    with mysql_engine().begin() as conn:
+        _upsert_watermarks(conn, rows)
+
+    return pd.DataFrame(rows, columns=['ts_code', 'last_date'])
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    """检查数据表是否包含指定列"""
+    query = """
+    SELECT COUNT(*) FROM information_schema.columns
+    WHERE table_schema = DATABASE() AND table_name = :table_name AND column_name = :column_name
+    """
+    with mysql_engine().connect() as conn:
+        row = conn.execute(text(query), {'table_name': table_name, 'column_name': column_name}).fetchone()
+        return row[0] > 0 if row else False
@@ -0,0 +1,8 @@
+from .invalidation import publish_invalidation, subscribe_invalidation
+from .result_cache import ResultCache
+
+__all__ = [
+    "ResultCache",
+    "publish_invalidation",
+    "subscribe_invalidation",
+]
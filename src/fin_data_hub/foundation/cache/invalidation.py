@@ -0,0 +1,45 @@
+import logging
+import threading
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# 回调参数：(数据集, 本次写入涉及的日期)，日期为 None 表示整个数据集都可能变化
+InvalidationListener = Callable[[str, list[str] | None], None]
+
+_listeners: list[InvalidationListener] = []
+_listeners_lock = threading.Lock()
+
+
+def subscribe_invalidation(listener: InvalidationListener):
+    """订阅数据写入后的失效事件"""
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def unsubscribe_invalidation(listener: InvalidationListener):
+    """取消订阅失效事件"""
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def publish_invalidation(dataset: str, dates: Iterable[str] | None = None):
+    """
+    发布失效事件，通知订阅方数据集在这些日期上的数据发生了变化
+
+    订阅方的异常只记录日志，不影响数据写入流程
+
+    Args:
+        dataset: 数据集名称（即数据表名）
+        dates: 写入涉及的日期（'YYYYMMDD'），为 None 表示整个数据集
+    """
+    date_list = None if dates is None else sorted({str(date) for date in dates})
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(dataset, date_list)
+        except Exception as e:
+            logger.error(f"处理数据集 {dataset} 的失效事件失败: {e}")
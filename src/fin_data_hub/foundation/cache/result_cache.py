@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    expires_at: float | None
+    dataset: str | None
+    start_date: str | None
+    end_date: str | None
+    version: Hashable | None
+
+
+class ResultCache:
+    """
+    线程安全的查询结果缓存
+
+    - 按内存预算（字节）做 LRU 淘汰
+    - 每个条目可以设置 TTL，持久条目只会因淘汰或失效事件移除
+    - 条目记录所属数据集和日期范围，``invalidate`` 只移除范围覆盖了变化日期的条目，
+      历史区间的缓存不受最新数据写入的影响
+    - 条目可以记录版本（查询数据前读取的时间），``invalidate_range`` 只移除版本不晚于给定时间的条目，
+      用于按其他进程记录的变更日期范围失效（失效事件只能通知本进程）
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: float | None = None):
+        """
+        Args:
+            max_bytes: 缓存值总大小上限（字节）
+            default_ttl: 默认过期秒数，为 None 时不过期
+        """
+        assert max_bytes > 0, "max_bytes 必须大于 0"
+        self._max_bytes = max_bytes
+        self._default_ttl = default_ttl
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """获取缓存值，未命中或已过期时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        size: int,
+        dataset: str | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        ttl: float | None = None,
+        persistent: bool = False,
+        version: Hashable | None = None,
+    ):
+        """
+        写入缓存
+
+        Args:
+            key: 规范化后的查询键
+            value: 缓存值
+            size: 缓存值大小（字节），用于内存预算
+            dataset: 结果所属数据集，用于失效事件匹配
+            start_date: 结果覆盖的开始日期，为 None 表示不限
+            end_date: 结果覆盖的结束日期，为 None 表示不限（包含之后写入的新数据）
+            ttl: 过期秒数，为 None 时使用默认 TTL
+            persistent: 不设置过期时间，只会因淘汰或失效移除
+            version: 条目的版本，应在查询数据之前读取，供 ``invalidate_range`` 比较
+        """
+        if size > self._max_bytes:
+            return
+        ttl = None if persistent else (ttl if ttl is not None else self._default_ttl)
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, expires_at, dataset, start_date, end_date, version)
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, dataset: str, dates: list[str] | None = None) -> int:
+        """
+        移除数据集中日期范围覆盖了任一变化日期的条目
+
+        Args:
+            dataset: 数据集名称
+            dates: 变化的日期，为 None 时移除该数据集的全部条目
+
+        Returns:
+            移除的条目数
+        """
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items()
+                if entry.dataset == dataset and (dates is None or any(_covers(entry, date) for date in dates))
+            ]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def invalidate_range(
+        self,
+        dataset: str,
+        start_date: str | None,
+        end_date: str | None,
+        before: Any | None = None,
+    ) -> int:
+        """
+        移除数据集中日期范围与 [start_date, end_date] 重叠的条目
+
+        Args:
+            dataset: 数据集名称
+            start_date: 变化的开始日期，为 None 表示不限
+            end_date: 变化的结束日期，为 None 表示不限
+            before: 只移除版本不晚于该值的条目（没有版本的条目总是移除），为 None 时不比较版本
+
+        Returns:
+            移除的条目数
+        """
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items()
+                if entry.dataset == dataset
+                and (start_date is None or entry.end_date is None or start_date <= entry.end_date)
+                and (end_date is None or entry.start_date is None or entry.start_date <= end_date)
+                and (before is None or entry.version is None or entry.version <= before)
+            ]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """缓存统计：条目数、占用字节、命中和未命中次数"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+def _covers(entry: _Entry, date: str) -> bool:
+    return (entry.start_date is None or entry.start_date <= date) and (entry.end_date is None or date <= entry.end_date)
@@ -0,0 +1,184 @@
+"""
+数据入库指标
+
+在任务级耗时（``tushare_function_duration``）之外，按单次调用记录：
+- 每次 Tushare 接口调用：耗时、返回行数、数据量、错误数、限流等待时间、响应缓存命中情况
+- 每次数据库写入：耗时、行数、每秒行数
+- 拉取/写入流水线：等待写入的结果数和字节数
+
+指标都带有 ``job_name`` 属性（避免与 Prometheus 的 job 标签冲突），取自当前任务上下文（``job_context``），
+Grafana 可以据此把一个任务的耗时拆分为拉取、限流等待和写入三部分。
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+from opentelemetry.metrics import CallbackOptions, Observation
+
+from fin_data_hub.foundation.monitoring.telemetry import get_service_meter
+
+logger = logging.getLogger(__name__)
+
+# 没有任务上下文时的 job_name 属性
+UNKNOWN_JOB = 'unknown'
+
+_current_job: ContextVar[str] = ContextVar('ingest_job', default=UNKNOWN_JOB)
+
+meter = get_service_meter()
+
+api_call_duration = meter.create_histogram(
+    name="tushare_api_call_duration",
+    description="Tushare接口单次调用耗时（不含限流等待）",
+    unit="ms",
+)
+api_throttle_wait = meter.create_histogram(
+    name="tushare_api_throttle_wait",
+    description="Tushare接口调用前等待令牌的时间",
+    unit="ms",
+)
+api_rows = meter.create_histogram(
+    name="tushare_api_rows",
+    description="Tushare接口单次调用返回的行数",
+)
+api_payload_bytes = meter.create_histogram(
+    name="tushare_api_payload_bytes",
+    description="Tushare接口单次调用返回数据的内存占用",
+    unit="By",
+)
+api_errors = meter.create_counter(
+    name="tushare_api_errors",
+    description="Tushare接口调用错误数",
+)
+api_cache_lookups = meter.create_counter(
+    name="tushare_api_cache_lookups",
+    description="Tushare接口响应缓存查找次数（hit/miss/bypass）",
+)
+db_write_duration = meter.create_histogram(
+    name="mysql_write_duration",
+    description="单次批量写入耗时",
+    unit="ms",
+)
+db_write_rows = meter.create_counter(
+    name="mysql_write_rows",
+    description="批量写入的行数",
+)
+db_write_throughput = meter.create_histogram(
+    name="mysql_write_throughput",
+    description="单次批量写入的每秒行数",
+    unit="1/s",
+)
+
+# 运行中的流水线：名称 -> 返回 (等待写入的结果数, 等待写入的字节数) 的函数
+_pipelines: dict[str, Callable[[], tuple[int, int]]] = {}
+_pipelines_lock = threading.Lock()
+
+
+def _observe_queue_depth(options: CallbackOptions) -> Iterator[Observation]:
+    for name, depth in _snapshot_pipelines():
+        yield Observation(depth()[0], {"pipeline": name})
+
+
+def _observe_buffered_bytes(options: CallbackOptions) -> Iterator[Observation]:
+    for name, depth in _snapshot_pipelines():
+        yield Observation(depth()[1], {"pipeline": name})
+
+
+meter.create_observable_gauge(
+    name="pipeline_queue_depth",
+    callbacks=[_observe_queue_depth],
+    description="流水线中等待写入的结果数",
+)
+meter.create_observable_gauge(
+    name="pipeline_buffered_bytes",
+    callbacks=[_observe_buffered_bytes],
+    description="流水线中等待写入的数据占用内存",
+    unit="By",
+)
+
+
+def _snapshot_pipelines() -> list[tuple[str, Callable[[], tuple[int, int]]]]:
+    with _pipelines_lock:
+        return list(_pipelines.items())
+
+
+def current_job() -> str:
+    """当前任务名"""
+    return _current_job.get()
+
+
+@contextmanager
+def job_context(job: str) -> Iterator[None]:
+    """
+    在任务上下文中执行，期间记录的接口调用和写入指标带有该任务名
+
+    流水线的工作线程会继承创建流水线时的上下文
+    """
+    token = _current_job.set(job)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def record_api_call(
+    endpoint: str,
+    duration_seconds: float,
+    throttle_seconds: float,
+    rows: int | None = None,
+    payload_bytes: int | None = None,
+    error: str | None = None,
+):
+    """
+    记录一次 Tushare 接口调用
+
+    Args:
+        endpoint: 接口名称
+        duration_seconds: 调用耗时
+        throttle_seconds: 调用前等待令牌的时间
+        rows: 返回的行数，调用失败时为 None
+        payload_bytes: 返回数据的内存占用
+        error: 错误类型（rate_limit / error），成功时为 None
+    """
+    attributes = {"endpoint": endpoint, "job_name": current_job()}
+    api_throttle_wait.record(throttle_seconds * 1000, attributes=attributes)
+    api_call_duration.record(duration_seconds * 1000, attributes={**attributes, "success": str(error is None)})
+    if error is not None:
+        api_errors.add(1, attributes={**attributes, "kind": error})
+        return
+    if rows is not None:
+        api_rows.record(rows, attributes=attributes)
+    if payload_bytes is not None:
+        api_payload_bytes.record(payload_bytes, attributes=attributes)
+
+
+def record_api_cache(endpoint: str, result: str):
+    """
+    记录一次响应缓存查找
+
+    Args:
+        endpoint: 接口名称
+        result: hit（命中）/ miss（未命中，已调用接口）/ bypass（不可缓存，直接调用接口）
+    """
+    api_cache_lookups.add(1, attributes={"endpoint": endpoint, "result": result, "job_name": current_job()})
+
+
+def record_db_write(table: str, method: str, rows: int, duration_seconds: float):
+    """记录一次批量写入"""
+    attributes = {"table": table, "method": method, "job_name": current_job()}
+    db_write_duration.record(duration_seconds * 1000, attributes=attributes)
+    db_write_rows.add(rows, attributes=attributes)
+    if duration_seconds > 0:
+        db_write_throughput.record(rows / duration_seconds, attributes=attributes)
+
+
+def register_pipeline(name: str, depth: Callable[[], tuple[int, int]]):
+    """注册运行中的流水线，``depth`` 返回 (等待写入的结果数, 等待写入的字节数)"""
+    with _pipelines_lock:
+        _pipelines[name] = depth
+
+
+def unregister_pipeline(name: str):
+    with _pipelines_lock:
+        _pipelines.pop(name, None)
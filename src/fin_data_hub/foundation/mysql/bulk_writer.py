@@ -0,0 +1,232 @@
+"""
+MySQL 批量写入
+
+在 ``mysql_engine()`` 之上提供高吞吐、幂等的批量写入：
+- insert：按批执行多行 ``INSERT ... ON DUPLICATE KEY UPDATE``
+- load_data：将每批数据写入临时文件，通过 ``LOAD DATA LOCAL INFILE ... REPLACE`` 导入
+
+两种方式都依赖目标表上的自然键唯一索引，重复写入同一批数据不会产生重复行。
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Iterable, Sequence
+
+import pandas as pd
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import IntegrityError
+
+from fin_data_hub.config import config
+from fin_data_hub.foundation.monitoring.ingest_metrics import record_db_write
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine, table_exists
+
+logger = logging.getLogger(__name__)
+
+# 自然键索引名称
+NATURAL_KEY_NAME = 'uk_natural_key'
+
+# 文本类型的键列建索引时使用的前缀长度
+_TEXT_KEY_PREFIX_LENGTH = 32
+
+# 数值类型，键列空值填充为 0 而不是空字符串
+_NUMERIC_TYPES = ('tinyint', 'smallint', 'mediumint', 'int', 'bigint', 'decimal', 'float', 'double')
+
+_table_columns: dict[str, dict[str, str]] = {}
+_keyed_tables: set[str] = set()
+_schema_lock = threading.Lock()
+
+
+def bulk_upsert(
+    df: pd.DataFrame,
+    table: str,
+    key_columns: Sequence[str],
+    conn: Connection | None = None,
+    chunk_size: int | None = None,
+    method: str | None = None,
+) -> int:
+    """
+    按自然键幂等地批量写入数据
+
+    Args:
+        df: 待写入的数据
+        table: 目标数据表，不存在时按 df 的结构创建
+        key_columns: 自然键列，键相同的行会被更新而不是重复插入
+        conn: 事务连接，为 None 时单独开启事务
+        chunk_size: 每批行数，默认取配置 mysql_bulk_chunk_size
+        method: 写入方式 insert / load_data，默认取配置 mysql_bulk_method
+
+    Returns:
+        写入的行数
+    """
+    if df is None or df.empty:
+        return 0
+    if conn is None:
+        with mysql_engine().begin() as conn:
+            return bulk_upsert(df, table, key_columns, conn, chunk_size, method)
+
+    chunk_size = chunk_size or config.mysql_bulk_chunk_size
+    method = method or config.mysql_bulk_method
+
+    ensure_table(df, table, key_columns)
+    df = _align_columns(df, table, key_columns)
+
+    start_time = time.time()
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        if method == 'load_data':
+            _load_data_chunk(conn, chunk, table)
+        else:
+            _insert_chunk(conn, chunk, table, key_columns)
+
+    elapsed = max(time.time() - start_time, 1e-6)
+    record_db_write(table, method, len(df), elapsed)
+    logger.info(f"[批量写入] {table} 写入 {len(df)} 行，耗时 {elapsed:.2f} 秒，{len(df) / elapsed:.0f} 行/秒（{method}）")
+    return len(df)
+
+
+def ensure_table(df: pd.DataFrame, table: str, key_columns: Sequence[str]):
+    """
+    确保目标表存在且带有自然键唯一索引
+
+    表不存在时按 df 的结构创建；已有表缺少唯一索引时补建，
+    存在历史重复行时先去重（复制到新表后替换原表）。
+    """
+    if table in _keyed_tables:
+        return
+    with _schema_lock:
+        if table in _keyed_tables:
+            return
+        if not table_exists(table):
+            df.head(0).to_sql(table, con=mysql_engine(), index=False)
+            logger.info(f"[批量写入] 创建数据表 {table}")
+        if not _has_natural_key(table):
+            _add_natural_key(table, key_columns)
+        _table_columns.pop(table, None)
+        _keyed_tables.add(table)
+
+
+def get_table_columns(table: str) -> dict[str, str]:
+    """获取数据表的列名及类型（进程内缓存）"""
+    columns = _table_columns.get(table)
+    if columns is None:
+        query = """
+        SELECT column_name, data_type FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = :table_name
+        ORDER BY ordinal_position
+        """
+        with mysql_engine().connect() as conn:
+            columns = {row[0]: row[1].lower() for row in conn.execute(text(query), {'table_name': table})}
+        _table_columns[table] = columns
+    return columns
+
+
+def _align_columns(df: pd.DataFrame, table: str, key_columns: Sequence[str]) -> pd.DataFrame:
+    """丢弃表中不存在的列，键列空值填充为空字符串或 0（唯一索引不约束 NULL）"""
+    table_columns = get_table_columns(table)
+    unknown = [c for c in df.columns if c not in table_columns]
+    if unknown:
+        logger.warning(f"[批量写入] {table} 不包含列 {unknown}，已忽略")
+        df = df[[c for c in df.columns if c in table_columns]]
+    missing_keys = [c for c in key_columns if c in df.columns and df[c].isna().any()]
+    if missing_keys:
+        df = df.copy()
+        for column in missing_keys:
+            df[column] = df[column].fillna(0 if table_columns[column] in _NUMERIC_TYPES else '')
+    return df
+
+
+def _rows(df: pd.DataFrame) -> list[tuple]:
+    """DataFrame 转为 DBAPI 参数，NaN 转为 None"""
+    values = df.astype(object).where(pd.notna(df), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+def _quote(column: str) -> str:
+    return f"`{column}`"
+
+
+def _insert_chunk(conn: Connection, df: pd.DataFrame, table: str, key_columns: Sequence[str]):
+    """多行 INSERT ... ON DUPLICATE KEY UPDATE
+
+    DBAPI 驱动（PyMySQL / mysqlclient）会把 executemany 的 INSERT ... VALUES
+    改写为多行 VALUES 语句批量发送
+    """
+    columns = list(df.columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    updates = [c for c in columns if c not in key_columns] or columns[:1]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(_quote(c) for c in columns)}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {', '.join(f'{_quote(c)} = VALUES({_quote(c)})' for c in updates)}"
+    )
+    cursor = conn.connection.cursor()
+    try:
+        cursor.executemany(sql, _rows(df))
+    finally:
+        cursor.close()
+
+
+def _load_data_chunk(conn: Connection, df: pd.DataFrame, table: str):
+    """LOAD DATA LOCAL INFILE ... REPLACE，需要连接开启 local_infile"""
+    fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix='.csv')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            df.to_csv(f, header=False, index=False, na_rep='NULL', lineterminator='\n')
+        # ESCAPED BY '' 时，未加引号的 NULL 被识别为空值
+        sql = (
+            f"LOAD DATA LOCAL INFILE '{path.replace(os.sep, '/')}' REPLACE INTO TABLE {table} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(_quote(c) for c in df.columns)})"
+        )
+        conn.exec_driver_sql(sql)
+    finally:
+        os.remove(path)
+
+
+def _has_natural_key(table: str) -> bool:
+    """检查表上是否已有主键或自然键唯一索引"""
+    query = """
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = :table_name
+      AND (index_name = 'PRIMARY' OR index_name = :index_name)
+    """
+    with mysql_engine().connect() as conn:
+        row = conn.execute(text(query), {'table_name': table, 'index_name': NATURAL_KEY_NAME}).fetchone()
+        return row[0] > 0 if row else False
+
+
+def _key_definition(table: str, key_columns: Iterable[str]) -> str:
+    """生成唯一索引列定义，文本列使用前缀索引"""
+    types = get_table_columns(table)
+    parts = []
+    for column in key_columns:
+        if types.get(column) in ('text', 'mediumtext', 'longtext', 'blob'):
+            parts.append(f"{_quote(column)}({_TEXT_KEY_PREFIX_LENGTH})")
+        else:
+            parts.append(_quote(column))
+    return ', '.join(parts)
+
+
+def _add_natural_key(table: str, key_columns: Sequence[str]):
+    """为已有表补建自然键唯一索引，存在重复行时去重"""
+    key_definition = _key_definition(table, key_columns)
+    add_key = f"ALTER TABLE {table} ADD UNIQUE KEY {NATURAL_KEY_NAME} ({key_definition})"
+    try:
+        with mysql_engine().begin() as conn:
+            conn.execute(text(add_key))
+        logger.info(f"[批量写入] 为 {table} 创建自然键唯一索引 ({', '.join(key_columns)})")
+        return
+    except IntegrityError:
+        logger.warning(f"[批量写入] {table} 存在重复行，去重后创建自然键唯一索引")
+
+    dedup_table = f"{table}__dedup"
+    legacy_table = f"{table}__legacy"
+    with mysql_engine().begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {dedup_table}"))
+        conn.execute(text(f"CREATE TABLE {dedup_table} LIKE {table}"))
+        conn.execute(text(f"ALTER TABLE {dedup_table} ADD UNIQUE KEY {NATURAL_KEY_NAME} ({key_definition})"))
+        conn.execute(text(f"INSERT IGNORE INTO {dedup_table} SELECT * FROM {table}"))
+        conn.execute(text(f"RENAME TABLE {table} TO {legacy_table}, {dedup_table} TO {table}"))
+        conn.execute(text(f"DROP TABLE {legacy_table}"))
+    logger.info(f"[批量写入] {table} 去重完成并创建自然键唯一索引")
@@ -0,0 +1,98 @@
+"""
+异步 MySQL 访问
+
+供 FastAPI 中 ``async def`` 路由使用的异步引擎（aiomysql）和会话工厂，
+与同步引擎使用各自独立的连接池，查询等待数据库时不占用事件循环和线程池。
+"""
+import logging
+from typing import AsyncIterator
+
+from opentelemetry.metrics import CallbackOptions, Observation
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from fin_data_hub.config import config
+from fin_data_hub.foundation.monitoring.telemetry import get_service_meter
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
+
+logger = logging.getLogger(__name__)
+
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+_pool_metrics_registered = False
+
+
+def async_mysql_engine() -> AsyncEngine:
+    """获取带连接池的异步 MySQL 引擎"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            config.mysql_async_url,
+            pool_size=config.mysql_async_pool_size,
+            max_overflow=config.mysql_async_max_overflow,
+            pool_timeout=30,
+            pool_recycle=3600,
+            pool_pre_ping=True,
+            echo=False,
+        )
+    return _async_engine
+
+
+def async_session_factory() -> async_sessionmaker[AsyncSession]:
+    """获取异步会话工厂"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(async_mysql_engine(), expire_on_commit=False)
+    return _async_session_factory
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI 依赖：每个请求一个异步会话，请求结束后归还连接"""
+    async with async_session_factory()() as session:
+        yield session
+
+
+async def dispose_async_engine():
+    """关闭异步引擎的连接池"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+
+def register_pool_metrics():
+    """注册同步/异步连接池指标：连接池大小、已借出、空闲和溢出连接数"""
+    global _pool_metrics_registered
+    if _pool_metrics_registered:
+        return
+    meter = get_service_meter()
+    meter.create_observable_gauge(
+        name="mysql_pool_connections",
+        callbacks=[_observe_pools],
+        description="MySQL 连接池连接数",
+    )
+    _pool_metrics_registered = True
+
+
+def _observe_pools(options: CallbackOptions):
+    pools = {'sync': mysql_engine().pool}
+    if _async_engine is not None:
+        pools['async'] = _async_engine.pool
+    for engine_name, pool in pools.items():
+        for state, value in pool_status(pool).items():
+            yield Observation(value, {"engine": engine_name, "state": state})
+
+
+def pool_status(pool) -> dict[str, int]:
+    """连接池状态"""
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
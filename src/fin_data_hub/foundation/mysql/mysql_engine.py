@@ -16,6 +16,8 @@ def _get_mysql_engine():
             pool_recycle=3600,      # 连接回收时间（1小时）
             pool_pre_ping=True,     # 连接前检查
             echo=False,             # 不显示 SQL 语句
+            # LOAD DATA LOCAL INFILE 批量写入需要客户端开启 local_infile
+            connect_args={"local_infile": True} if config.mysql_bulk_method == "load_data" else {},
         )
     return _mysql_engine
 
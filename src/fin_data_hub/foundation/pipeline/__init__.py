@@ -0,0 +1,5 @@
+from .fetch_write_pipeline import run_pipeline
+
+__all__ = [
+    "run_pipeline",
+]
@@ -0,0 +1,195 @@
+"""
+拉取/写入流水线
+
+一组拉取线程从任务迭代器中取任务执行 ``fetch``，结果放入队列，
+由独立的写入线程执行 ``write``，使第 N+1 个任务的网络拉取与第 N 个任务的入库重叠。
+在途任务数（已开始拉取但尚未写入完成）受限；等待写入的结果按字节计量，
+超过内存上限时拉取线程暂停领取新任务，直到写入线程消费（背压）。
+"""
+import contextvars
+import logging
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+from fin_data_hub.config import config
+from fin_data_hub.foundation.monitoring.ingest_metrics import register_pipeline, unregister_pipeline
+
+logger = logging.getLogger(__name__)
+
+_SENTINEL = object()
+
+
+def run_pipeline(
+    tasks: Iterable[Any],
+    fetch: Callable[[Any], Any],
+    write: Callable[[Any, Any], None],
+    fetch_workers: int | None = None,
+    write_workers: int | None = None,
+    queue_size: int | None = None,
+    ordered: bool = False,
+    name: str = "pipeline",
+    max_buffer_bytes: int | None = None,
+) -> int:
+    """
+    以流水线方式执行拉取和写入
+
+    Args:
+        tasks: 任务迭代器，惰性消费
+        fetch: 拉取函数，返回 None 表示该任务没有数据
+        write: 写入函数，参数为任务和拉取结果
+        fetch_workers: 拉取线程数，默认取配置 backfill_fetch_workers
+        write_workers: 写入线程数，默认取配置 backfill_write_workers
+        queue_size: 等待写入的结果数上限，默认取配置 backfill_queue_size
+        ordered: 是否严格按任务顺序写入。按日期推进数据集水位的任务需要开启，
+            避免中断时水位越过未写入的日期；开启后写入阶段为单线程
+        name: 流水线名称，用于日志
+        max_buffer_bytes: 等待写入的结果占用内存上限（字节），默认取配置 backfill_max_buffer_mb；
+            超过上限时暂停拉取，单个结果超过上限时仍会被写入
+
+    Returns:
+        完成的任务数
+
+    任一拉取或写入抛出异常时，停止派发新任务，等待在途任务结束后重新抛出该异常。
+    """
+    fetch_workers = fetch_workers or config.backfill_fetch_workers
+    write_workers = 1 if ordered else (write_workers or config.backfill_write_workers)
+    queue_size = queue_size or config.backfill_queue_size
+    max_buffer_bytes = max_buffer_bytes or config.backfill_max_buffer_mb * 1024 * 1024
+
+    task_iter: Iterator[tuple[int, Any]] = enumerate(tasks)
+    task_lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(queue_size + fetch_workers)
+    results: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    errors: list[BaseException] = []
+    completed = [0]
+    completed_lock = threading.Lock()
+    # 等待写入的结果字节数及峰值
+    buffered = [0, 0]
+    buffer_cond = threading.Condition()
+    # ordered 模式下已拉取、等待前序任务写入的结果
+    pending_writes: dict[int, tuple[Any, Any, int]] = {}
+
+    def fail(e: BaseException):
+        with completed_lock:
+            errors.append(e)
+        stop.set()
+
+    def fetch_worker():
+        while not stop.is_set():
+            if not in_flight.acquire(timeout=0.5):
+                continue
+            with buffer_cond:
+                while buffered[0] >= max_buffer_bytes and not stop.is_set():
+                    buffer_cond.wait(timeout=0.5)
+            # 等待期间其他任务失败或被中断时不再拉取，避免多调用一次接口
+            if stop.is_set():
+                in_flight.release()
+                return
+            with task_lock:
+                item = next(task_iter, None)
+            if item is None:
+                in_flight.release()
+                return
+            seq, task = item
+            try:
+                result = fetch(task)
+            except BaseException as e:
+                logger.error(f"[{name}] 拉取任务 {task} 失败: {e}")
+                in_flight.release()
+                fail(e)
+                return
+            size = result_nbytes(result)
+            with buffer_cond:
+                buffered[0] += size
+                buffered[1] = max(buffered[1], buffered[0])
+            results.put((seq, task, result, size))
+
+    def release(size: int):
+        with buffer_cond:
+            buffered[0] -= size
+            buffer_cond.notify_all()
+        in_flight.release()
+
+    def write_one(task: Any, result: Any, size: int):
+        try:
+            if result is not None and not stop.is_set():
+                write(task, result)
+                with completed_lock:
+                    completed[0] += 1
+        except BaseException as e:
+            logger.error(f"[{name}] 写入任务 {task} 失败: {e}")
+            fail(e)
+        finally:
+            release(size)
+
+    def write_worker():
+        while True:
+            item = results.get()
+            if item is _SENTINEL:
+                return
+            _, task, result, size = item
+            write_one(task, result, size)
+
+    def ordered_write_worker():
+        next_seq = 0
+        while True:
+            item = results.get()
+            if item is _SENTINEL:
+                # 异常中断时丢弃无法按序写入的结果
+                for _, _, size in list(pending_writes.values()):
+                    release(size)
+                pending_writes.clear()
+                return
+            seq, task, result, size = item
+            pending_writes[seq] = (task, result, size)
+            while next_seq in pending_writes:
+                write_one(*pending_writes.pop(next_seq))
+                next_seq += 1
+
+    def depth() -> tuple[int, int]:
+        with buffer_cond:
+            return results.qsize() + len(pending_writes), buffered[0]
+
+    # 工作线程继承调用方的上下文（如指标中的任务名）
+    def spawn(target: Callable[[], None], thread_name: str) -> threading.Thread:
+        return threading.Thread(target=contextvars.copy_context().run, args=(target,), name=thread_name, daemon=True)
+
+    start_time = time.time()
+    fetchers = [spawn(fetch_worker, f"{name}-fetch-{i}") for i in range(fetch_workers)]
+    writer_target = ordered_write_worker if ordered else write_worker
+    writers = [spawn(writer_target, f"{name}-write-{i}") for i in range(write_workers)]
+    register_pipeline(name, depth)
+    try:
+        for thread in fetchers + writers:
+            thread.start()
+        for thread in fetchers:
+            thread.join()
+        for _ in writers:
+            results.put(_SENTINEL)
+        for thread in writers:
+            thread.join()
+    finally:
+        unregister_pipeline(name)
+
+    elapsed = time.time() - start_time
+    logger.info(
+        f"[{name}] 流水线结束，完成 {completed[0]} 个任务，耗时 {elapsed:.1f} 秒"
+        f"（拉取线程 {fetch_workers}，写入线程 {write_workers}，待写入数据峰值 {buffered[1] / 1024 / 1024:.1f} MB）"
+    )
+    if errors:
+        raise errors[0]
+    return completed[0]
+
+
+def result_nbytes(result: Any) -> int:
+    """估算拉取结果占用的内存，DataFrame 按实际占用（含字符串内容）计算"""
+    if result is None:
+        return 0
+    memory_usage = getattr(result, 'memory_usage', None)
+    if callable(memory_usage):
+        return int(memory_usage(index=True, deep=True).sum())
+    return sys.getsizeof(result)
@@ -0,0 +1,5 @@
+from .token_bucket import TokenBucket
+
+__all__ = [
+    "TokenBucket",
+]
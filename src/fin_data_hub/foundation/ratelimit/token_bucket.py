@@ -0,0 +1,68 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+
+    按每分钟速率补充令牌，``acquire`` 采用预约方式扣减令牌：令牌不足时允许余额为负，
+    调用方按欠额睡眠，因此并发调用按到达顺序排队，整体速率恰好等于配置上限。
+    """
+
+    def __init__(self, calls_per_minute: float, burst: float = 1):
+        """
+        Args:
+            calls_per_minute: 每分钟补充的令牌数
+            burst: 令牌桶容量，即空闲后允许的突发调用数
+        """
+        assert calls_per_minute > 0, "calls_per_minute 必须大于 0"
+        self._rate = calls_per_minute / 60.0
+        self._capacity = max(float(burst), 1.0)
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def calls_per_minute(self) -> float:
+        return self._rate * 60.0
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        获取令牌，必要时阻塞等待
+
+        Args:
+            tokens: 本次调用消耗的令牌数（权重）
+
+        Returns:
+            实际等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            wait = max(self._paused_until - now, 0.0)
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self._rate)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """
+        暂停发放令牌（用于触发限流后的退避），并清空已积累的令牌
+
+        Args:
+            seconds: 暂停秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
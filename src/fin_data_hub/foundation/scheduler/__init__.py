@@ -1,7 +1,11 @@
+from .job_lease import LeaseLostError, check_lease, leased_job
 from .scheduler_manager import start_scheduler, stop_scheduler, get_scheduler
 
 __all__ = [
     "start_scheduler",
     "stop_scheduler",
     "get_scheduler",
+    "leased_job",
+    "check_lease",
+    "LeaseLostError",
 ]
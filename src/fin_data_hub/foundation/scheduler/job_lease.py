@@ -0,0 +1,271 @@
+"""
+跨进程的任务租约
+
+每个 uvicorn 工作进程（以及每个节点）都会启动自己的调度器，同一个定时任务会在每个进程中触发。
+任务执行前先在 MySQL 租约表中获取该任务本次运行的租约，整个集群中只有一个进程执行：
+
+- 租约按 (任务名, 运行键) 区分，运行键默认取调度器中该任务本次应触发的时间（不是各进程的当前时间），
+  进程间时钟有偏差或错过触发后延迟执行时仍得到相同的运行键，同一次触发的其他进程直接跳过
+- 持有者在执行期间定期心跳续约；进程退出或卡死后租约过期，下一个进程自动接管
+- 续约失败（租约被接管或超过有效期无法续约）时标记租约已丢失，任务在步骤之间调用 ``check_lease()``
+  中止执行，避免与接管的进程同时执行
+- 执行完成后标记本次运行已完成，晚到的进程不会重复执行
+"""
+import functools
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import text
+
+from fin_data_hub.config import config
+from fin_data_hub.foundation.mysql.mysql_engine import mysql_engine
+
+logger = logging.getLogger(__name__)
+
+JOB_LEASE_TABLE = 'scheduler_job_lease'
+
+# 本进程的持有者标识
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# 计算运行键时在错过触发的宽限期之外再往前查找的秒数，覆盖进程间的时钟偏差
+_RUN_KEY_LOOKBACK_SECONDS = 60
+
+_table_ready = False
+_table_lock = threading.Lock()
+
+# 当前线程正在执行的租约任务，租约丢失时置位
+_current = threading.local()
+
+
+class LeaseLostError(RuntimeError):
+    """任务执行期间租约丢失"""
+
+
+def ensure_lease_table():
+    """创建租约表（如不存在）"""
+    global _table_ready
+    if _table_ready:
+        return
+    with _table_lock:
+        if _table_ready:
+            return
+        ddl = f"""
+        CREATE TABLE IF NOT EXISTS {JOB_LEASE_TABLE} (
+            job_name VARCHAR(128) NOT NULL,
+            run_key VARCHAR(64) NOT NULL DEFAULT '',
+            holder VARCHAR(128) NOT NULL DEFAULT '',
+            finished TINYINT NOT NULL DEFAULT 0,
+            heartbeat_at DATETIME(3) NULL,
+            expires_at DATETIME(3) NOT NULL,
+            PRIMARY KEY (job_name)
+        )
+        """
+        with mysql_engine().begin() as conn:
+            conn.execute(text(ddl))
+        _table_ready = True
+
+
+def acquire_lease(job_name: str, run_key: str, ttl_seconds: float, holder: str = HOLDER_ID) -> bool:
+    """
+    获取任务本次运行的租约
+
+    以下情况获取失败：
+    - 其他持有者的租约尚未过期
+    - 本次运行已由其他进程执行完成
+
+    Args:
+        job_name: 任务名
+        run_key: 运行键，同一次触发的各进程使用相同的运行键
+        ttl_seconds: 租约有效期，持有者需在过期前心跳续约
+        holder: 持有者标识
+
+    Returns:
+        是否获取成功
+    """
+    ensure_lease_table()
+    with mysql_engine().begin() as conn:
+        conn.execute(
+            text(f"INSERT IGNORE INTO {JOB_LEASE_TABLE} (job_name, expires_at) VALUES (:job_name, '1970-01-02')"),
+            {'job_name': job_name},
+        )
+        row = conn.execute(
+            text(
+                f"SELECT run_key, holder, finished, expires_at < NOW(3) AS expired "
+                f"FROM {JOB_LEASE_TABLE} WHERE job_name = :job_name FOR UPDATE"
+            ),
+            {'job_name': job_name},
+        ).mappings().one()
+        if row['run_key'] == run_key and row['finished']:
+            return False
+        if not row['expired'] and row['holder'] != holder:
+            return False
+        if row['expired'] and row['holder'] and not row['finished']:
+            logger.warning(f"任务 {job_name} 的持有者 {row['holder']} 租约已过期，由 {holder} 接管")
+        conn.execute(
+            text(
+                f"UPDATE {JOB_LEASE_TABLE} SET run_key = :run_key, holder = :holder, finished = 0, "
+                f"heartbeat_at = NOW(3), expires_at = NOW(3) + INTERVAL :ttl SECOND WHERE job_name = :job_name"
+            ),
+            {'job_name': job_name, 'run_key': run_key, 'holder': holder, 'ttl': ttl_seconds},
+        )
+    return True
+
+
+def renew_lease(job_name: str, run_key: str, ttl_seconds: float, holder: str = HOLDER_ID) -> bool:
+    """
+    心跳续约
+
+    Returns:
+        是否仍持有租约
+    """
+    with mysql_engine().begin() as conn:
+        result = conn.execute(
+            text(
+                f"UPDATE {JOB_LEASE_TABLE} SET heartbeat_at = NOW(3), expires_at = NOW(3) + INTERVAL :ttl SECOND "
+                f"WHERE job_name = :job_name AND run_key = :run_key AND holder = :holder AND finished = 0"
+            ),
+            {'job_name': job_name, 'run_key': run_key, 'holder': holder, 'ttl': ttl_seconds},
+        )
+        return result.rowcount > 0
+
+
+def release_lease(job_name: str, run_key: str, holder: str = HOLDER_ID, finished: bool = True):
+    """
+    释放租约
+
+    Args:
+        finished: 是否标记本次运行已完成；为 False 时（如执行失败）同一次运行的其他进程仍可重试
+    """
+    with mysql_engine().begin() as conn:
+        conn.execute(
+            text(
+                f"UPDATE {JOB_LEASE_TABLE} SET finished = :finished, expires_at = NOW(3) "
+                f"WHERE job_name = :job_name AND run_key = :run_key AND holder = :holder"
+            ),
+            {'job_name': job_name, 'run_key': run_key, 'holder': holder, 'finished': int(finished)},
+        )
+
+
+def minute_run_key() -> str:
+    """当前时间所在的分钟，任务不在调度器中（如手动调用）时使用"""
+    return datetime.now().strftime('%Y%m%d%H%M')
+
+
+def scheduled_run_key(func: Callable, now: datetime | None = None) -> str | None:
+    """
+    调度器中执行 ``func`` 的任务最近一次应触发的时间（分钟）
+
+    只在错过触发的宽限期加上时钟偏差余量内查找；找不到任务或触发时间时返回 None
+
+    Args:
+        func: 注册到调度器的函数
+        now: 当前时间，默认取触发器时区的当前时间
+    """
+    from fin_data_hub.foundation.scheduler.scheduler_manager import get_scheduler
+
+    job = next((job for job in get_scheduler().get_jobs() if job.func is func), None)
+    if job is None:
+        return None
+    now = now or datetime.now(getattr(job.trigger, 'timezone', None))
+    grace = job.misfire_grace_time if job.misfire_grace_time is not None else 24 * 3600
+    fire_time = None
+    candidate = job.trigger.get_next_fire_time(None, now - timedelta(seconds=grace + _RUN_KEY_LOOKBACK_SECONDS))
+    while candidate is not None and candidate <= now:
+        fire_time = candidate
+        candidate = job.trigger.get_next_fire_time(candidate, candidate + timedelta(microseconds=1))
+    return None if fire_time is None else fire_time.strftime('%Y%m%d%H%M')
+
+
+def check_lease():
+    """
+    在租约任务的步骤之间调用：租约已丢失时抛出 ``LeaseLostError`` 中止执行；不在租约任务中时不做任何事
+    """
+    lost = getattr(_current, 'lost', None)
+    if lost is not None and lost.is_set():
+        raise LeaseLostError(f"任务 {_current.name} 的租约已丢失，中止执行")
+
+
+def leased_job(
+    job_name: str | None = None,
+    ttl_seconds: float | None = None,
+    run_key: Callable[[], str] | None = None,
+) -> Callable:
+    """
+    定时任务装饰器：获取租约后才执行，未获取到租约时跳过本次执行
+
+    Args:
+        job_name: 任务名，默认使用函数名
+        ttl_seconds: 租约有效期，默认使用配置 ``scheduler_lease_ttl_seconds``；执行期间每 1/3 有效期心跳一次
+        run_key: 生成运行键的函数，默认取调度器中本次应触发的时间，不在调度器中时取当前分钟
+    """
+    def decorator(func: Callable) -> Callable:
+        name = job_name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            ttl = ttl_seconds or config.scheduler_lease_ttl_seconds
+            try:
+                key = run_key() if run_key is not None else (scheduled_run_key(wrapper) or minute_run_key())
+            except Exception as e:
+                logger.error(f"计算任务 {name} 的运行键失败，跳过本次执行: {e}")
+                return None
+            try:
+                acquired = acquire_lease(name, key, ttl)
+            except Exception as e:
+                logger.error(f"获取任务 {name} 的租约失败，跳过本次执行: {e}")
+                return None
+            if not acquired:
+                logger.info(f"任务 {name}（{key}）由其他进程执行，跳过")
+                return None
+
+            stop = threading.Event()
+            lost = threading.Event()
+            heartbeat = threading.Thread(
+                target=_heartbeat, args=(name, key, ttl, stop, lost), name=f"lease-{name}", daemon=True
+            )
+            heartbeat.start()
+            previous = (getattr(_current, 'name', None), getattr(_current, 'lost', None))
+            _current.name, _current.lost = name, lost
+            finished = False
+            try:
+                result = func(*args, **kwargs)
+                finished = not lost.is_set()
+                if lost.is_set():
+                    logger.warning(f"任务 {name}（{key}）执行期间租约丢失，不标记为完成")
+                return result
+            finally:
+                _current.name, _current.lost = previous
+                stop.set()
+                heartbeat.join()
+                try:
+                    release_lease(name, key, finished=finished)
+                except Exception as e:
+                    logger.error(f"释放任务 {name} 的租约失败，将在过期后自动释放: {e}")
+
+        return wrapper
+
+    return decorator
+
+
+def _heartbeat(job_name: str, run_key: str, ttl_seconds: float, stop: threading.Event, lost: threading.Event):
+    """执行期间定期续约；租约被接管或超过有效期仍未续约成功时置位 ``lost``"""
+    renewed_at = time.monotonic()
+    while not stop.wait(ttl_seconds / 3):
+        try:
+            if not renew_lease(job_name, run_key, ttl_seconds):
+                logger.warning(f"任务 {job_name} 的租约已被其他进程接管")
+                lost.set()
+                return
+            renewed_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"任务 {job_name} 续约失败: {e}")
+            if time.monotonic() - renewed_at >= ttl_seconds:
+                logger.warning(f"任务 {job_name} 超过租约有效期未能续约，租约视为已丢失")
+                lost.set()
+                return
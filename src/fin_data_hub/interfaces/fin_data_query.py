@@ -1,4 +1,32 @@
-from fastapi import APIRouter
+import json
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare.tushare_data_cache import get_stock_universe
+from fin_data_hub.data.tushare.tushare_query import (
+    MAX_PAGE_SIZE,
+    bar_arrow_schema,
+    bar_table,
+    get_bar_cache,
+    iter_bars,
+    query_bars,
+    refresh_bar_cache,
+    resolve_bar_fields,
+)
+from fin_data_hub.data.tushare.tushare_schema import DATE_COLUMNS
+from fin_data_hub.foundation.mysql.mysql_async_engine import get_async_session
+from fin_data_hub.foundation.utils.date_utils import current_date_ymd
+from fin_data_hub.interfaces.streaming import (
+    ARROW_STREAM_MEDIA_TYPE,
+    arrow_stream,
+    json_default,
+    ndjson_stream,
+    negotiate_stream_media_type,
+)
 
 router = APIRouter(
     prefix="/fin-data",
@@ -6,14 +34,93 @@ router = APIRouter(
 )
 
 @router.get(
-    "/query",
-    summary="查询金融数据",
-    description="根据条件查询金融数据",
+    "/bars",
+    summary="查询行情数据",
+    description=(
+        "按股票代码和日期范围查询日/周/月线行情，使用游标（键集）分页，只返回请求的字段。"
+        "日线可通过 adj 查询预先生成的前复权/后复权行情。"
+        "Accept 为 application/x-ndjson 或 application/vnd.apache.arrow.stream 时"
+        "流式返回从游标开始的全部结果，忽略 limit。分页结果会被缓存，数据写入后自动失效"
+    ),
+)
+async def query_bars_data(
+    ts_code: str = Query(..., description="股票代码，多个用逗号分隔"),
+    start_date: str | None = Query(None, pattern=r"^\d{8}$", description="开始日期 YYYYMMDD"),
+    end_date: str | None = Query(None, pattern=r"^\d{8}$", description="结束日期 YYYYMMDD"),
+    fields: str | None = Query(None, description="返回的字段，多个用逗号分隔，为空时返回全部字段"),
+    freq: str = Query("D", description="行情频率：D 日线、W 周线、M 月线"),
+    adj: str | None = Query(None, description="复权方式：qfq 前复权、hfq 后复权，为空时不复权，只支持日线"),
+    limit: int = Query(1000, ge=1, le=MAX_PAGE_SIZE, description="每页行数"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    accept: str | None = Header(None),
+    session: AsyncSession = Depends(get_async_session),
+):
+    ts_codes = [code.strip() for code in ts_code.split(",") if code.strip()]
+    if not ts_codes:
+        raise HTTPException(status_code=400, detail="ts_code 不能为空")
+    media_type = negotiate_stream_media_type(accept)
+    try:
+        columns = resolve_bar_fields(freq, fields, adj)
+        if media_type is not None:
+            batches = iter_bars(ts_codes, start_date, end_date, columns, freq, cursor, adj=adj)
+            # 先取第一批，游标等参数错误在开始输出前以 400 返回
+            first = await anext(batches, [])
+            batches = _prepend(first, batches)
+        else:
+            return await _query_bars_page(session, ts_codes, start_date, end_date, columns, freq, limit, cursor, adj)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if media_type == ARROW_STREAM_MEDIA_TYPE:
+        return StreamingResponse(arrow_stream(bar_arrow_schema(freq, columns, adj), batches), media_type=media_type)
+    return StreamingResponse(ndjson_stream(columns, batches, DATE_COLUMNS), media_type=media_type)
+
+
+async def _query_bars_page(session, ts_codes, start_date, end_date, columns, freq, limit, cursor, adj=None) -> Response:
+    """
+    查询一页行情，结果按规范化的查询条件缓存序列化后的响应体
+
+    结束日期早于今天的历史区间不设过期时间，只在该区间的数据被重新写入时失效；
+    其余查询按配置的 TTL 过期。其他进程写入的数据不会发布本进程的失效事件，
+    先读取变更日志移除与其日期范围重叠的条目，读取失败时不使用缓存
+    """
+    cache = get_bar_cache() if config.query_cache_enabled else None
+    # 版本在查询数据之前读取，查询期间提交的变更会在之后读取变更日志时移除该条目
+    version = await refresh_bar_cache(session) if cache is not None else None
+    if version is None:
+        cache = None
+    key = ("bars", freq, adj, tuple(sorted(set(ts_codes))), start_date, end_date, tuple(columns), limit, cursor)
+    body = cache.get(key) if cache is not None else None
+    if body is None:
+        page = await query_bars(session, ts_codes, start_date, end_date, columns, freq, limit, cursor, adj)
+        payload = {"fields": page.fields, "items": page.rows, "next_cursor": page.next_cursor}
+        body = json.dumps(payload, ensure_ascii=False, default=json_default).encode("utf-8")
+        if cache is not None:
+            historical = end_date is not None and end_date < current_date_ymd()
+            cache.put(
+                key, body, len(body), bar_table(freq, adj), start_date, end_date, persistent=historical, version=version
+            )
+    return Response(content=body, media_type="application/json")
+
+
+@router.get(
+    "/stocks/search",
+    summary="搜索股票",
+    description="按名称、拼音首字母、代码前缀或完整 ts_code 搜索股票，用于输入联想",
 )
-async def query_fin_data(
-    query: str,
-    page: int = 1,
-    page_size: int = 10,
+async def search_stocks(
+    q: str = Query(..., min_length=1, description="搜索关键字"),
+    limit: int = Query(10, ge=1, le=100, description="最多返回的条数"),
+    status: str | None = Query(None, pattern=r"^[LDP]$", description="上市状态：L 上市、D 退市、P 暂停上市"),
 ):
-    return {"message": "Hello, World!"}
+    # 股票池索引首次使用时需要从数据库加载
+    universe = await run_in_threadpool(get_stock_universe)
+    if universe is None:
+        return {"items": []}
+    return {"items": universe.search(q, limit, status)}
+
 
+async def _prepend(first, rest):
+    yield first
+    async for batch in rest:
+        yield batch
@@ -0,0 +1,123 @@
+"""
+查询结果的流式编码
+
+按批次把行数据编码为 NDJSON 或 Arrow IPC 流，每批编码后立即输出，
+响应以分块传输发送，不在内存中拼装完整结果。
+"""
+import json
+from decimal import Decimal
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+import pyarrow as pa
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+STREAM_MEDIA_TYPES = (NDJSON_MEDIA_TYPE, ARROW_STREAM_MEDIA_TYPE)
+
+
+def negotiate_stream_media_type(accept: str | None) -> str | None:
+    """
+    根据 Accept 请求头选择流式响应格式
+
+    Returns:
+        流式响应的媒体类型，客户端没有请求流式格式时返回 None
+    """
+    if not accept:
+        return None
+    best, best_quality = None, 0.0
+    for item in accept.split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        if media_type not in STREAM_MEDIA_TYPES:
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def json_default(value):
+    """JSON 序列化数据库返回的 Decimal"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"无法序列化的类型: {type(value)}")
+
+
+async def ndjson_stream(
+    fields: list[str],
+    batches: AsyncIterable[list[tuple]],
+    date_fields: Iterable[str] = (),
+) -> AsyncIterator[bytes]:
+    """
+    把批次编码为 NDJSON，每行一个 JSON 对象，每批输出一个分块
+
+    Args:
+        fields: 列名，与行元组顺序一致
+        batches: 行数据批次
+        date_fields: INT 日期列，输出为 'YYYYMMDD' 字符串
+    """
+    date_positions = [i for i, field in enumerate(fields) if field in set(date_fields)]
+    async for batch in batches:
+        lines = []
+        for row in batch:
+            values = list(row)
+            for i in date_positions:
+                values[i] = str(values[i]) if values[i] else None
+            lines.append(json.dumps(dict(zip(fields, values)), ensure_ascii=False, default=json_default))
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink:
+    """收集 Arrow IPC 写入的字节，每批写完后取出"""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def arrow_stream(schema: pa.Schema, batches: AsyncIterable[list[tuple]]) -> AsyncIterator[bytes]:
+    """
+    把批次编码为 Arrow IPC 流（schema 消息 + 每批一个 RecordBatch 消息 + 结束标记）
+
+    Args:
+        schema: 结果的 Arrow schema，列顺序与行元组一致
+        batches: 行数据批次
+    """
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema) as writer:
+        yield sink.take()
+        async for batch in batches:
+            if not batch:
+                continue
+            columns = list(zip(*batch))
+            arrays = [
+                pa.array([None if v is None else float(v) for v in column], type=field.type)
+                if pa.types.is_floating(field.type)
+                else pa.array(column, type=field.type)
+                for column, field in zip(columns, schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.take()
+    yield sink.take()
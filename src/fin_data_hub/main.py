@@ -13,12 +13,29 @@ async def lifespan(app: FastAPI):
     # -- Startup --
     logger.info("FastAPI Lifespan: 初始化中...")
 
+    # 只创建缺失的表、补充列和分区；无主键旧表的迁移耗时较长，由补全脚本执行
+    from fin_data_hub.data.tushare.tushare_schema import ensure_schemas
+    ensure_schemas(migrate=False, lock_timeout=30)
+    # 查询缓存通过变更日志发现其他进程写入的数据
+    from fin_data_hub.data.tushare.tushare_change_log import ensure_change_log_table
+    ensure_change_log_table()
+
+    # 从磁盘快照热启动股票列表和交易日历缓存
+    from fin_data_hub.data.tushare.tushare_data_cache import init_cache, start_cache_refresh
+    init_cache()
+    start_cache_refresh()
+
     from fin_data_hub.foundation.scheduler import start_scheduler, stop_scheduler
 
+    # 导入时注册 Tushare 同步任务
+    import fin_data_hub.data.tushare.tushare_data  # noqa: F401
     start_scheduler()
 
     from fin_data_hub.foundation.monitoring import setup_telemetry
     setup_telemetry(app)
+
+    from fin_data_hub.foundation.mysql.mysql_async_engine import dispose_async_engine, register_pool_metrics
+    register_pool_metrics()
     
     include_routers(app)
 
@@ -28,6 +45,8 @@ async def lifespan(app: FastAPI):
 
     stop_scheduler()
 
+    await dispose_async_engine()
+
     logger.info("FastAPI Lifespan: 关闭完成")
 
 
@@ -0,0 +1,54 @@
+import unittest
+
+from benchmark.fake_tushare import FakeProApi
+
+
+class TestFakeProApi(unittest.TestCase):
+    """离线 Tushare 客户端测试"""
+
+    def setUp(self):
+        self.api = FakeProApi(stocks=50, years=2, end_date='20240628')
+
+    def test_deterministic(self):
+        """同样的参数返回同样的数据"""
+        other = FakeProApi(stocks=50, years=2, end_date='20240628')
+        first = self.api.daily(trade_date='20240628')
+        self.assertFalse(first.empty)
+        self.assertTrue(first.equals(other.daily(trade_date='20240628')))
+
+    def test_cross_section_matches_range(self):
+        """截面请求与按股票区间请求得到的行情一致"""
+        section = self.api.daily(trade_date='20240628').set_index('ts_code')
+        ts_code = section.index[0]
+        history = self.api.daily(ts_code=ts_code, start_date='20240601', end_date='20240628')
+        row = history[history['trade_date'] == '20240628'].iloc[0]
+        self.assertAlmostEqual(row['close'], section.loc[ts_code, 'close'])
+
+    def test_non_trading_day_empty(self):
+        """非交易日没有行情"""
+        self.assertTrue(self.api.daily(trade_date='20240629').empty)
+
+    def test_adj_factor(self):
+        """复权因子与日线覆盖相同的 (股票, 交易日)，大部分交易日与前一日相同"""
+        daily = self.api.daily(trade_date='20240628')
+        factors = self.api.adj_factor(trade_date='20240628')
+        self.assertEqual(list(factors['ts_code']), list(daily['ts_code']))
+        history = self.api.adj_factor(ts_code=factors['ts_code'].iloc[0], start_date='20230701', end_date='20240628')
+        self.assertGreater(history['adj_factor'].nunique(), 1)
+        self.assertLess(history['adj_factor'].nunique(), len(history) // 10)
+
+    def test_rate_limit(self):
+        """超过每分钟调用上限时抛出限流错误"""
+        api = FakeProApi(stocks=10, years=1, end_date='20240628', calls_per_minute=2)
+        api.daily(trade_date='20240628')
+        api.daily(trade_date='20240627')
+        with self.assertRaisesRegex(Exception, '每分钟最多访问该接口2次'):
+            api.daily(trade_date='20240626')
+        self.assertEqual(api.calls['daily'], 2)
+        self.assertEqual(api.rejected['daily'], 1)
+        # 其他接口单独计数
+        api.daily_basic(trade_date='20240628')
+
+
+if __name__ == '__main__':
+    unittest.main()
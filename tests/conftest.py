@@ -8,7 +8,9 @@ import sys
 # os.path.join(..., '..') 获取 tests 的上级目录，即项目根目录
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
-# 插入到 sys.path 的开头，优先查找项目内的模块
+# 插入到 sys.path 的开头，优先查找项目内的模块；
+# src 目录下的 fin_data_hub 在未安装包时也能导入，benchmark 等根目录下的模块从项目根目录导入
 sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
 
 print(f"Added {project_root} to sys.path")
@@ -0,0 +1,51 @@
+import unittest
+
+import pandas as pd
+
+from fin_data_hub.data.tushare.tushare_adjust import adjust_prices
+
+DAILY = pd.DataFrame({
+    'ts_code': ['000001.SZ', '000001.SZ', '600000.SH'],
+    'trade_date': [20240102, 20240103, 20240103],
+    'open': [10.0, 9.0, 7.0],
+    'high': [10.5, 9.5, 7.2],
+    'low': [9.8, 8.8, 6.9],
+    'close': [10.0, 9.2, 7.1],
+    'pre_close': [9.9, 9.0, 7.0],
+    'pct_chg': [1.0101, 2.2222, 1.4286],
+    'vol': [100.0, 120.0, 50.0],
+    'amount': [1000.0, 1100.0, 350.0],
+    # 000001.SZ 在 20240103 除权，因子从 1.0 变为 1.1
+    'adj_factor': [1.0, 1.1, 2.0],
+})
+
+
+class TestAdjustPrices(unittest.TestCase):
+    """复权价格计算测试"""
+
+    def test_hfq(self):
+        """后复权：价格乘以当日因子，涨跌幅和成交量不变"""
+        hfq = adjust_prices(DAILY)
+        self.assertAlmostEqual(hfq.loc[1, 'close'], 10.12)
+        self.assertAlmostEqual(hfq.loc[1, 'pre_close'], 9.9)
+        self.assertAlmostEqual(hfq.loc[1, 'change'], 0.22)
+        self.assertAlmostEqual(hfq.loc[2, 'open'], 14.0)
+        self.assertEqual(hfq['pct_chg'].tolist(), DAILY['pct_chg'].tolist())
+        self.assertEqual(hfq['vol'].tolist(), DAILY['vol'].tolist())
+
+    def test_qfq(self):
+        """前复权：价格乘以当日因子与最新因子之比，最新一天的价格不变"""
+        latest = pd.Series({'000001.SZ': 1.1, '600000.SH': 2.0})
+        qfq = adjust_prices(DAILY, latest)
+        self.assertAlmostEqual(qfq.loc[0, 'close'], 9.0909)
+        self.assertAlmostEqual(qfq.loc[1, 'close'], 9.2)
+        self.assertAlmostEqual(qfq.loc[2, 'close'], 7.1)
+
+    def test_qfq_skips_stocks_without_latest_factor(self):
+        """没有最新因子的股票不计算前复权"""
+        qfq = adjust_prices(DAILY, pd.Series({'600000.SH': 2.0}))
+        self.assertEqual(qfq['ts_code'].tolist(), ['600000.SH'])
+
+
+if __name__ == '__main__':
+    unittest.main()
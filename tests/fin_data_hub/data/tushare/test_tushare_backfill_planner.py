@@ -0,0 +1,110 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from fin_data_hub.data.tushare import tushare_backfill_planner
+from fin_data_hub.data.tushare.tushare_backfill_planner import (
+    BackfillRequest,
+    _checked_checkpoint,
+    _drop_checked,
+    _merge_ranges,
+    estimate_plan,
+    plan_backfill,
+)
+from fin_data_hub.data.tushare.tushare_trading_calendar import TradingCalendar
+
+
+class TestMergeRanges(unittest.TestCase):
+    """按股票缺口合并为区间请求"""
+
+    def setUp(self):
+        self.trade_days = np.array([20240102, 20240103, 20240104, 20240105, 20240108, 20240109], dtype=np.int64)
+
+    def test_consecutive_trade_days_merge_across_weekend(self):
+        """跨周末的连续交易日合并为一个区间"""
+        gaps = pd.DataFrame({'ts_code': ['000001.SZ'] * 3, 'trade_date': [20240105, 20240108, 20240104]})
+        requests = _merge_ranges('daily', gaps, self.trade_days)
+        self.assertEqual(requests, [
+            BackfillRequest('daily', ts_code='000001.SZ', start_date='20240104', end_date='20240108'),
+        ])
+
+    def test_split_on_gap_and_stock(self):
+        """交易日不连续或股票变化时拆分区间"""
+        gaps = pd.DataFrame({
+            'ts_code': ['000001.SZ', '000001.SZ', '600000.SH'],
+            'trade_date': [20240102, 20240104, 20240104],
+        })
+        requests = _merge_ranges('daily', gaps, self.trade_days)
+        self.assertEqual([(r.ts_code, r.start_date, r.end_date) for r in requests], [
+            ('000001.SZ', '20240102', '20240102'),
+            ('000001.SZ', '20240104', '20240104'),
+            ('600000.SH', '20240104', '20240104'),
+        ])
+
+    def test_empty(self):
+        """没有缺口时不生成请求"""
+        gaps = pd.DataFrame({'ts_code': [], 'trade_date': []})
+        self.assertEqual(_merge_ranges('daily', gaps, self.trade_days), [])
+
+
+class TestCheckedWindows(unittest.TestCase):
+    """已向接口确认过的窗口"""
+
+    def test_drop_checked(self):
+        """只去掉同一股票已确认窗口内的缺口"""
+        gaps = pd.DataFrame({
+            'ts_code': ['000001.SZ', '000001.SZ', '600000.SH'],
+            'trade_date': [20240103, 20240108, 20240104],
+        })
+        windows = pd.DataFrame({'unit': ['000001.SZ'], 'start': [20240102], 'end': [20240105]})
+        result = _drop_checked(gaps, windows)
+        self.assertEqual(list(zip(result['ts_code'], result['trade_date'])), [
+            ('000001.SZ', 20240108), ('600000.SH', 20240104),
+        ])
+
+    def test_recent_window_not_checked(self):
+        """最近的窗口数据可能尚未发布，不记录为已确认"""
+        request = BackfillRequest('daily', ts_code='000001.SZ', start_date='20240102', end_date='20240105')
+        self.assertEqual(_checked_checkpoint('tushare_daily', request, '20240110').unit, '000001.SZ')
+        self.assertIsNone(_checked_checkpoint('tushare_daily', request, '20240104'))
+        day = BackfillRequest('daily', trade_date='20240105')
+        self.assertEqual(_checked_checkpoint('tushare_daily', day, '20240110').window_start, '20240105')
+
+    def test_plan_converges(self):
+        """没有数据的交易日和停牌区间确认过后不再出现在计划中"""
+        calendar = TradingCalendar([20240102, 20240103, 20240104, 20240105], [1, 1, 1, 1])
+        stored = pd.Series({20240102: 2, 20240103: 1, 20240104: 1}, dtype=np.int64)
+        gaps = pd.DataFrame({'ts_code': ['000001.SZ', '000001.SZ'], 'trade_date': [20240103, 20240104]})
+        checked = pd.DataFrame({
+            'unit': ['*', '000001.SZ'],
+            'start': [20240105, 20240103],
+            'end': [20240105, 20240104],
+        })
+        with mock.patch.object(tushare_backfill_planner, 'get_trading_calendar', return_value=calendar), \
+                mock.patch.object(tushare_backfill_planner, '_stored_dates', return_value=stored), \
+                mock.patch.object(tushare_backfill_planner, '_stock_gaps', return_value=gaps) as stock_gaps, \
+                mock.patch.object(tushare_backfill_planner, '_checked_windows', return_value=checked):
+            self.assertEqual(plan_backfill('daily', '20240102', '20240105'), [])
+            # 已截面确认的交易日不再按股票计算缺口
+            self.assertEqual(list(stock_gaps.call_args.args[3]), [20240105])
+            self.assertEqual(len(plan_backfill('daily', '20240102', '20240105', recheck=True)), 2)
+
+
+class TestEstimatePlan(unittest.TestCase):
+    """补全计划的调用次数估算"""
+
+    def test_empty_plan(self):
+        self.assertEqual(estimate_plan([]), (0, 0.0))
+
+    def test_calls_per_request(self):
+        """北向十大成交股每个交易日需要请求沪、深两次"""
+        plan = [BackfillRequest('hsgt_top10', trade_date='20240102'), BackfillRequest('hsgt_top10', trade_date='20240103')]
+        calls, seconds = estimate_plan(plan)
+        self.assertEqual(calls, 4)
+        self.assertGreater(seconds, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
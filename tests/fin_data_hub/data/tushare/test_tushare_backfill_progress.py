@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from fin_data_hub.data.tushare import tushare_backfill_progress
+from fin_data_hub.data.tushare.tushare_backfill_progress import (
+    BackfillRun,
+    BackfillRunActiveError,
+    Checkpoint,
+    start_run,
+    year_windows,
+)
+
+
+class TestYearWindows(unittest.TestCase):
+    """补全窗口切分"""
+
+    def test_windows_cover_range_without_overlap(self):
+        """窗口首尾相接，覆盖整个区间"""
+        windows = year_windows('19910403', '20241018')
+        self.assertEqual(windows, [('19910403', '20110403'), ('20110404', '20241018')])
+
+    def test_windows_are_stable(self):
+        """相同的起止日期得到相同的窗口，恢复任务时可以按开始日期跳过"""
+        self.assertEqual(year_windows('20000101', '20241018', 5), year_windows('20000101', '20241018', 5))
+
+    def test_trailing_single_day(self):
+        """最后只剩一天时也作为一个窗口"""
+        self.assertEqual(year_windows('20000101', '20200102'), [('20000101', '20200101'), ('20200102', '20200102')])
+
+    def test_single_day_range(self):
+        """起止日期相同时得到单日窗口，结束日期当天上市的股票不会被跳过"""
+        self.assertEqual(year_windows('20241018', '20241018'), [('20241018', '20241018')])
+
+    def test_empty_range(self):
+        """开始日期晚于结束日期时没有窗口"""
+        self.assertEqual(year_windows('20241019', '20241018'), [])
+
+
+class TestCheckpoint(unittest.TestCase):
+    """进度点"""
+
+    def test_single_day_checkpoint(self):
+        """截面日期的进度点窗口起止相同"""
+        run = BackfillRun('tushare_daily_basic-20241018', 'tushare_daily_basic', '20241017')
+        self.assertEqual(
+            run.checkpoint('*', '20241017'),
+            Checkpoint('tushare_daily_basic-20241018', '*', '20241017', '20241017'),
+        )
+
+
+class TestResumeRun(unittest.TestCase):
+    """恢复补全任务"""
+
+    def _start(self, status, idle_seconds, claimed=1):
+        latest = pd.DataFrame([{
+            'run_id': 'tushare_daily-20241018090000', 'end_date': '20241018', 'status': status,
+            'updated_at': pd.Timestamp('2024-10-18 09:30:00'), 'idle_seconds': idle_seconds,
+        }])
+        conn = mock.MagicMock()
+        conn.execute.return_value.rowcount = claimed
+        engine = mock.Mock()
+        engine.begin.return_value.__enter__ = mock.Mock(return_value=conn)
+        engine.begin.return_value.__exit__ = mock.Mock(return_value=False)
+        with mock.patch.object(tushare_backfill_progress, 'ensure_progress_tables'), \
+                mock.patch.object(tushare_backfill_progress, 'mysql_engine', return_value=engine), \
+                mock.patch.object(tushare_backfill_progress.pd, 'read_sql', return_value=latest), \
+                mock.patch.object(tushare_backfill_progress.config, 'backfill_run_stale_seconds', 1800):
+            return start_run('tushare_daily', '20241020', resume=True), conn
+
+    def test_resume_failed_run(self):
+        """失败的任务可以恢复，沿用原结束日期"""
+        run, conn = self._start('failed', 60)
+        self.assertEqual((run.run_id, run.end_date), ('tushare_daily-20241018090000', '20241018'))
+        self.assertEqual(conn.execute.call_args[0][1]['status'], 'failed')
+
+    def test_refuse_active_run(self):
+        """仍有进度的 running 任务不能恢复，也不会修改其状态"""
+        with self.assertRaises(BackfillRunActiveError) as ctx:
+            self._start('running', 60)
+        self.assertEqual(ctx.exception.run_id, 'tushare_daily-20241018090000')
+        self.assertIn('tushare_daily-20241018090000', str(ctx.exception))
+
+    def test_resume_stale_running_run(self):
+        """长时间没有进度的 running 任务视为进程已退出，可以恢复"""
+        run, _ = self._start('running', 7200)
+        self.assertEqual(run.run_id, 'tushare_daily-20241018090000')
+
+    def test_concurrent_claim(self):
+        """另一个进程先接管了任务时拒绝恢复"""
+        with self.assertRaises(BackfillRunActiveError):
+            self._start('failed', 60, claimed=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
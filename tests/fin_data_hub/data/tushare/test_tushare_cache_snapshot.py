@@ -0,0 +1,104 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare import tushare_data_cache
+from fin_data_hub.data.tushare.constants import STOCK_BASIC_TABLE, TRADE_CALENDAR_TABLE
+from fin_data_hub.data.tushare.tushare_cache_snapshot import (
+    current_generation,
+    read_snapshot,
+    snapshot_path,
+    write_snapshot,
+)
+
+
+def _stock_basic() -> pd.DataFrame:
+    return pd.DataFrame({
+        'ts_code': ['000001.SZ', '600000.SH'],
+        'symbol': ['000001', '600000'],
+        'name': ['平安银行', '浦发银行'],
+        'industry': ['银行', '银行'],
+        'cnspell': ['payh', 'pfyh'],
+        'list_date': ['19910403', '19991110'],
+        'status': ['L', 'L'],
+    })
+
+
+def _trade_calendar() -> pd.DataFrame:
+    return pd.DataFrame({'cal_date': ['20250101', '20250102'], 'is_open': [0, 1]})
+
+
+class TestCacheSnapshot(unittest.TestCase):
+    """缓存快照测试"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = patch.object(config, 'cache_snapshot_dir', self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_round_trip_keeps_category_and_version(self):
+        df = _stock_basic().astype({'industry': 'category'})
+        generation = write_snapshot('stock_basic', df, 'v1')
+        loaded, version, loaded_generation = read_snapshot('stock_basic')
+        self.assertEqual((version, loaded_generation), ('v1', generation))
+        self.assertEqual(str(loaded['industry'].dtype), 'category')
+        self.assertEqual(loaded['ts_code'].tolist(), ['000001.SZ', '600000.SH'])
+
+    def test_missing_or_corrupt_snapshot(self):
+        self.assertIsNone(read_snapshot('missing'))
+        snapshot_path('corrupt', 1).write_bytes(b'not arrow')
+        self.assertIsNone(read_snapshot('corrupt', 1))
+
+    def test_generation_swap_keeps_previous(self):
+        """发布新一代后当前代号切换，只保留最近两代文件"""
+        generations = [write_snapshot('calendar', _trade_calendar(), f'v{i}') for i in range(3)]
+        self.assertEqual(current_generation('calendar'), generations[-1])
+        self.assertEqual(read_snapshot('calendar').version, 'v2')
+        self.assertFalse(snapshot_path('calendar', generations[0]).exists())
+        self.assertTrue(snapshot_path('calendar', generations[1]).exists())
+
+    def test_attach_snapshot_published_by_other_worker(self):
+        """其他进程发布新一代快照后，本进程直接映射，不查询数据库"""
+        write_snapshot(TRADE_CALENDAR_TABLE, _trade_calendar(), 'v1')
+        tushare_data_cache.attach_latest_snapshots()
+        self.assertFalse(tushare_data_cache.get_trading_calendar().is_open('20250103'))
+        fresh = pd.DataFrame({'cal_date': ['20250101', '20250102', '20250103'], 'is_open': [0, 1, 1]})
+        write_snapshot(TRADE_CALENDAR_TABLE, fresh, 'v2')
+        with patch.object(tushare_data_cache, 'get_trade_calendar_from_db') as loader:
+            tushare_data_cache.attach_latest_snapshots()
+        loader.assert_not_called()
+        self.assertTrue(tushare_data_cache.get_trading_calendar().is_open('20250103'))
+
+    def test_init_from_snapshot_without_db_reload(self):
+        """快照版本与数据库一致时不查询数据表"""
+        write_snapshot(STOCK_BASIC_TABLE, _stock_basic(), 'v1')
+        write_snapshot(TRADE_CALENDAR_TABLE, _trade_calendar(), 'v2')
+        versions = {STOCK_BASIC_TABLE: 'v1', TRADE_CALENDAR_TABLE: 'v2'}
+        with patch.object(tushare_data_cache, 'get_db_version', side_effect=versions.get), \
+                patch.object(tushare_data_cache, 'refresh_cache') as refresh:
+            tushare_data_cache.init_cache()
+        refresh.assert_not_called()
+        self.assertEqual(tushare_data_cache.get_stock_universe().resolve('600000'), '600000.SH')
+        self.assertTrue(tushare_data_cache.get_trading_calendar().is_open('20250102'))
+
+    def test_refresh_when_version_changed(self):
+        """版本戳变化时从数据库重新加载并更新快照"""
+        write_snapshot(TRADE_CALENDAR_TABLE, _trade_calendar(), 'v1')
+        tushare_data_cache._cache_versions[TRADE_CALENDAR_TABLE] = 'v1'
+        fresh = pd.DataFrame({'cal_date': ['20250101', '20250102', '20250103'], 'is_open': [0, 1, 1]})
+        loaders = dict(tushare_data_cache._CACHES)
+        loaders[TRADE_CALENDAR_TABLE] = (lambda: fresh, *tushare_data_cache._CACHES[TRADE_CALENDAR_TABLE][1:])
+        with patch.object(tushare_data_cache, 'get_db_version', return_value='v2'), \
+                patch.dict(tushare_data_cache._CACHES, loaders):
+            tushare_data_cache.refresh_cache([TRADE_CALENDAR_TABLE])
+        self.assertTrue(tushare_data_cache.get_trading_calendar().is_open('20250103'))
+        self.assertEqual(read_snapshot(TRADE_CALENDAR_TABLE)[1], 'v2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from fin_data_hub.data.tushare import tushare_change_log
+from fin_data_hub.data.tushare.tushare_change_log import record_change
+
+
+class TestRecordChange(unittest.TestCase):
+    """变更日志记录测试"""
+
+    def setUp(self):
+        mock.patch.object(tushare_change_log, 'ensure_change_log_table').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _record(self, dates):
+        conn = mock.Mock()
+        record_change(conn, 'tushare_daily', dates)
+        return conn.execute.call_args[0][1]
+
+    def test_date_range(self):
+        """记录写入日期的最小值和最大值"""
+        params = self._record(pd.Series([20250107, 20241231, None, 20250103], dtype='Int64'))
+        self.assertEqual((params['start_date'], params['end_date']), ('20241231', '20250107'))
+
+    def test_whole_dataset(self):
+        """没有日期列时记录为整个数据集"""
+        params = self._record(None)
+        self.assertEqual((params['start_date'], params['end_date']), (None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from unittest import mock
+
+from fin_data_hub.data.tushare import tushare_client
+from fin_data_hub.data.tushare.tushare_client import RateLimitedClient
+
+
+class TestRateLimitedClient(unittest.TestCase):
+    """Tushare 限流客户端测试"""
+
+    def setUp(self):
+        patcher = mock.patch.object(tushare_client.TokenBucket, 'acquire', return_value=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pause = mock.patch.object(tushare_client.TokenBucket, 'pause').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_retry_after_rate_limit_error(self):
+        """触发限流后退避并重试，退避时间指数增长"""
+        raw = mock.MagicMock()
+        raw.daily.side_effect = [
+            Exception('抱歉，您每分钟最多访问该接口500次'),
+            Exception('抱歉，您每分钟最多访问该接口500次'),
+            'ok',
+        ]
+        client = RateLimitedClient(raw)
+        self.assertEqual(client.daily(trade_date='20250102'), 'ok')
+        self.assertEqual(raw.daily.call_count, 3)
+        backoffs = [c.args[0] for c in self.pause.call_args_list]
+        self.assertEqual(backoffs, [5.0, 10.0])
+
+    def test_other_errors_are_raised(self):
+        """非限流错误直接抛出"""
+        raw = mock.MagicMock()
+        raw.daily.side_effect = ValueError('参数错误')
+        with self.assertRaises(ValueError):
+            RateLimitedClient(raw).daily(trade_date='20250102')
+        self.assertEqual(raw.daily.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
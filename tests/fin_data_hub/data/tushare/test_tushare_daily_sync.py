@@ -0,0 +1,103 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from fin_data_hub.data.tushare import tushare_data, tushare_data_cache
+from fin_data_hub.foundation.scheduler import LeaseLostError, job_lease
+
+
+class TestSyncDailyDataByTradeDate(unittest.TestCase):
+    """日线行情按交易日切片同步测试"""
+
+    def setUp(self):
+        tushare_data_cache.update_trade_calendar_cache(pd.DataFrame({
+            'cal_date': ['20250103', '20250104', '20250105', '20250106', '20250107'],
+            'is_open': [1, 0, 0, 1, 1],
+        }))
+        tushare_data_cache.update_stock_basic_cache(pd.DataFrame({
+            'ts_code': ['000001.SZ', '000002.SZ', '600000.SH'],
+            'symbol': ['000001', '000002', '600000'],
+            'name': ['平安银行', '万科A', '浦发银行'],
+            'area': ['深圳', '深圳', '上海'],
+            'industry': ['银行', '全国地产', '银行'],
+            'market': ['主板', '主板', '主板'],
+            'list_date': ['19910403', '19910129', '19991110'],
+            'status': ['L', 'L', 'L'],
+        }))
+        self.client = mock.MagicMock()
+        self.client.daily.side_effect = lambda **kwargs: pd.DataFrame({'ts_code': ['x'], 'trade_date': ['y']})
+
+    def _run(self, last_dates: dict[str, str]):
+        with mock.patch.object(tushare_data, 'get_tushare_client', return_value=self.client), \
+                mock.patch.object(tushare_data, 'get_watermarks', return_value=last_dates), \
+                mock.patch.object(tushare_data, 'current_date_ymd', return_value='20250107'), \
+                mock.patch.object(tushare_data, 'save_data'):
+            tushare_data.sync_daily_data()
+
+    def test_fetch_missing_trade_days_as_cross_sections(self):
+        """只对缺失的交易日各调用一次截面接口"""
+        self._run({'000001.SZ': '20250103', '000002.SZ': '20250103', '600000.SH': '20250103'})
+        calls = [c.kwargs for c in self.client.daily.call_args_list]
+        self.assertEqual(calls, [{'trade_date': '20250106'}, {'trade_date': '20250107'}])
+
+    def test_fallback_to_ts_code_for_stock_without_data(self):
+        """库中没有数据的股票回退为按股票拉取到全表最新交易日"""
+        self._run({'000001.SZ': '20250103', '000002.SZ': '20250103'})
+        calls = [c.kwargs for c in self.client.daily.call_args_list]
+        self.assertEqual(calls[0], {'ts_code': '600000.SH', 'start_date': '19991110', 'end_date': '20250103'})
+        self.assertEqual(len(calls), 3)
+
+
+
+def _lose_lease(*args, **kwargs):
+    """在租约任务中模拟租约被其他进程接管"""
+    job_lease._current.lost.set()
+    return 0
+
+
+class TestLostLeaseAbortsScheduledJob(unittest.TestCase):
+    """定时任务执行中途租约丢失测试"""
+
+    def setUp(self):
+        patch_lease = [
+            mock.patch.object(job_lease, 'acquire_lease', return_value=True),
+            mock.patch.object(job_lease, 'renew_lease', return_value=True),
+            mock.patch.object(job_lease, 'release_lease'),
+            mock.patch.object(job_lease, 'scheduled_run_key', return_value='202501071703'),
+        ]
+        for patcher in patch_lease:
+            patcher.start()
+        self.export = mock.patch.object(tushare_data, 'export_parquet').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_statements_stop_after_lost_lease(self):
+        """同步报表期间租约丢失时不再拉取后续报表，也不导出镜像"""
+        with mock.patch.object(tushare_data, 'open_periods', return_value=['20241231']), \
+                mock.patch.object(tushare_data, 'sync_open_periods', side_effect=_lose_lease) as sync:
+            with self.assertRaises(LeaseLostError):
+                tushare_data.scheduled_sync_financial_statements()
+        self.assertEqual(sync.call_count, 1)
+        self.export.assert_not_called()
+
+    def test_daily_stops_after_lost_lease(self):
+        """日线同步期间租约丢失时不导出日线镜像，也不执行后续步骤"""
+        with mock.patch.object(tushare_data, 'sync_daily_data', side_effect=_lose_lease), \
+                mock.patch.object(tushare_data, 'sync_weekly_data') as weekly:
+            with self.assertRaises(LeaseLostError):
+                tushare_data.scheduled_sync_daily()
+        weekly.assert_not_called()
+        self.export.assert_not_called()
+
+    def test_wrapped_function_reraises(self):
+        """wrap_tushare 只记录其他异常，租约丢失向上抛出"""
+        @tushare_data.wrap_tushare
+        def step():
+            raise LeaseLostError('lost')
+
+        with self.assertRaises(LeaseLostError):
+            step()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from fin_data_hub.config import config
+from fin_data_hub.data.tushare import tushare_parquet
+from fin_data_hub.data.tushare.constants import DAILY_TABLE, STOCK_BASIC_TABLE
+
+
+class TestParquetReader(unittest.TestCase):
+    """Parquet 镜像读取测试"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = patch.object(config, 'parquet_root', self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+        df = pd.DataFrame({
+            'ts_code': ['000001.SZ', '600000.SH', '000001.SZ', '600000.SH', '000001.SZ'],
+            'trade_date': [20240130, 20240130, 20240201, 20240201, 20240301],
+            'close': [9.1, 7.2, 9.3, 7.4, 9.5],
+        })
+        for month, part in df.groupby(df['trade_date'] // 100):
+            tushare_parquet._write_parquet(part, tushare_parquet._partition_path(DAILY_TABLE, str(month)))
+
+    def test_partition_pruning(self):
+        """只读取日期范围覆盖的月份分区"""
+        files = tushare_parquet._partition_files(DAILY_TABLE, '20240201', '20240229')
+        self.assertEqual([f.parent.name for f in files], ['month=02'])
+        self.assertEqual(len(tushare_parquet._partition_files(DAILY_TABLE)), 3)
+
+    def test_read_with_filters(self):
+        """按日期范围和股票过滤，只返回需要的列"""
+        df = tushare_parquet.read_table(
+            DAILY_TABLE, columns=['ts_code', 'close'], start_date='20240131', ts_codes=['000001.SZ']
+        )
+        self.assertEqual(list(df.columns), ['ts_code', 'close'])
+        self.assertEqual(df['close'].tolist(), [9.3, 9.5])
+
+    def test_read_as_arrow(self):
+        table = tushare_parquet.read_table(DAILY_TABLE, end_date='20240131', as_arrow=True)
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column('trade_date').to_pylist(), [20240130, 20240130])
+
+    def test_read_missing_table(self):
+        """镜像不存在时返回空结果"""
+        df = tushare_parquet.read_table(STOCK_BASIC_TABLE, columns=['ts_code'])
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ['ts_code'])
+
+
+    def test_rebuild_removes_stale_partitions(self):
+        """重建从最早的日期开始，没有数据的月份和更早月份的分区文件被删除"""
+        february = pd.DataFrame({'ts_code': ['000001.SZ'], 'trade_date': [20240201], 'close': [9.8]})
+
+        def read_sql(statement, engine, params):
+            return february if params['start'] == 20240201 else february.iloc[0:0]
+
+        with patch.object(tushare_parquet, 'table_exists_and_not_empty', return_value=True), \
+                patch.object(tushare_parquet, 'get_dataset_watermark', return_value='20240331'), \
+                patch.object(tushare_parquet, '_min_date', return_value='20240201'), \
+                patch.object(tushare_parquet, 'mysql_engine'), \
+                patch.object(tushare_parquet, 'update_watermarks'), \
+                patch.object(tushare_parquet.pd, 'read_sql', side_effect=read_sql) as mock_read:
+            rows = tushare_parquet.export_tables([DAILY_TABLE], rebuild=True)
+
+        self.assertEqual(rows, 1)
+        self.assertEqual(mock_read.call_count, 2)
+        files = tushare_parquet._partition_files(DAILY_TABLE)
+        self.assertEqual([f.parent.name for f in files], ['month=02'])
+        self.assertEqual(tushare_parquet.read_table(DAILY_TABLE)['close'].tolist(), [9.8])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import asyncio
+import datetime
+import unittest
+from unittest import mock
+
+from fin_data_hub.data.tushare import tushare_query
+from fin_data_hub.data.tushare.constants import DAILY_QFQ_TABLE, DAILY_TABLE
+from fin_data_hub.data.tushare.tushare_query import (
+    _build_bars_sql,
+    bar_arrow_schema,
+    bar_table,
+    decode_cursor,
+    encode_cursor,
+    refresh_bar_cache,
+    resolve_bar_fields,
+)
+from fin_data_hub.foundation.cache import ResultCache
+
+
+class TestBarQuery(unittest.TestCase):
+    """行情查询测试"""
+
+    def test_resolve_fields(self):
+        """分页键排在最前，重复字段只保留一次"""
+        self.assertEqual(resolve_bar_fields('D', 'close,trade_date,close,vol'), ['ts_code', 'trade_date', 'close', 'vol'])
+        self.assertIn('amount', resolve_bar_fields('W', None))
+
+    def test_resolve_fields_rejects_unknown(self):
+        with self.assertRaises(ValueError):
+            resolve_bar_fields('D', 'close,1;drop table')
+        with self.assertRaises(ValueError):
+            resolve_bar_fields('Y', None)
+
+    def test_adjusted_table(self):
+        """复权行情只支持日线"""
+        self.assertEqual(bar_table('D'), DAILY_TABLE)
+        self.assertEqual(bar_table('D', 'qfq'), DAILY_QFQ_TABLE)
+        self.assertIn('adj_factor', resolve_bar_fields('D', None, 'hfq'))
+        with self.assertRaises(ValueError):
+            bar_table('W', 'qfq')
+        with self.assertRaises(ValueError):
+            bar_table('D', 'none')
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor('600000.SH', '20240102')
+        self.assertEqual(decode_cursor(cursor), ('600000.SH', 20240102))
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+
+    def test_keyset_sql(self):
+        """带游标时从上一页最后的键之后开始，多取一行判断下一页"""
+        sql, params = _build_bars_sql(
+            DAILY_TABLE, ['000001.SZ'], '20240101', None, ['ts_code', 'trade_date', 'close'], 100,
+            encode_cursor('000001.SZ', '20240105'),
+        )
+        statement = str(sql)
+        self.assertIn("SELECT `ts_code`, `trade_date`, `close` FROM tushare_daily", statement)
+        self.assertIn("ts_code = :last_code AND trade_date > :last_date", statement)
+        self.assertNotIn("OFFSET", statement)
+        self.assertEqual(params['limit'], 101)
+        self.assertEqual((params['last_code'], params['last_date'], params['start_date']), ('000001.SZ', 20240105, 20240101))
+
+    def test_stream_sql_without_limit(self):
+        """流式查询不限制行数"""
+        sql, params = _build_bars_sql(DAILY_TABLE, ['000001.SZ'], None, None, ['ts_code', 'trade_date'], None)
+        self.assertNotIn("LIMIT", str(sql))
+        self.assertNotIn('limit', params)
+
+    def test_arrow_schema(self):
+        schema = bar_arrow_schema('D', ['ts_code', 'trade_date', 'close'])
+        self.assertEqual([str(t) for t in schema.types], ['string', 'int32', 'double'])
+
+
+class _ChangeLogSession:
+    """返回固定数据库时间和变更日志的异步会话"""
+
+    def __init__(self, now, changes=()):
+        self.now = now
+        self.changes = list(changes)
+        self.since = None
+
+    async def execute(self, sql, params=None):
+        result = mock.Mock()
+        if 'NOW(6)' in str(sql):
+            result.scalar_one.return_value = self.now
+        else:
+            self.since = params['since']
+            result.mappings.return_value.all.return_value = [
+                change for change in self.changes if change['changed_at'] >= params['since']
+            ]
+        return result
+
+
+class TestRefreshBarCache(unittest.TestCase):
+    """按变更日志移除其他进程写入影响的缓存条目"""
+
+    def setUp(self):
+        self.cache = ResultCache(max_bytes=1000)
+        patchers = [
+            mock.patch.object(tushare_query, '_bar_cache', self.cache),
+            mock.patch.object(tushare_query, '_changes_read_at', None),
+            mock.patch.object(tushare_query.config, 'query_cache_change_poll_seconds', 0),
+        ]
+        for patcher in patchers:
+            patcher.start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _refresh(self, session):
+        return asyncio.run(refresh_bar_cache(session))
+
+    def test_new_trade_date_keeps_past_year(self):
+        """新交易日的写入只移除覆盖该日期的条目，历史年份的缓存页保留"""
+        t0 = datetime.datetime(2025, 1, 7, 16, 0)
+        version = self._refresh(_ChangeLogSession(t0))
+        self.assertEqual(version, t0)
+        self.cache.put('2020', 'history', 1, DAILY_TABLE, '20200101', '20201231', persistent=True, version=version)
+        self.cache.put('recent', 'recent', 1, DAILY_TABLE, '20250101', None, version=version)
+        sync = {'dataset': DAILY_TABLE, 'start_date': '20250107', 'end_date': '20250107',
+                'changed_at': t0 + datetime.timedelta(hours=1, minutes=3)}
+        self._refresh(_ChangeLogSession(t0 + datetime.timedelta(hours=2), [sync]))
+        self.assertEqual(self.cache.get('2020'), 'history')
+        self.assertIsNone(self.cache.get('recent'))
+
+    def test_rewrite_of_past_year_evicts(self):
+        """复权重算等重写历史区间时移除重叠的历史缓存页"""
+        t0 = datetime.datetime(2025, 1, 7, 16, 0)
+        version = self._refresh(_ChangeLogSession(t0))
+        self.cache.put('2020', 'history', 1, DAILY_QFQ_TABLE, '20200101', '20201231', persistent=True, version=version)
+        self.cache.put('daily', 'daily', 1, DAILY_TABLE, '20200101', '20201231', persistent=True, version=version)
+        rebuild = {'dataset': DAILY_QFQ_TABLE, 'start_date': '19910403', 'end_date': '20250107',
+                   'changed_at': t0 + datetime.timedelta(minutes=5)}
+        self._refresh(_ChangeLogSession(t0 + datetime.timedelta(minutes=10), [rebuild]))
+        self.assertIsNone(self.cache.get('2020'))
+        self.assertEqual(self.cache.get('daily'), 'daily')
+
+    def test_entries_after_change_kept(self):
+        """变更提交后才查询的条目不因回看再次读到的变更被移除"""
+        t0 = datetime.datetime(2025, 1, 7, 16, 0)
+        change = {'dataset': DAILY_TABLE, 'start_date': '20250107', 'end_date': '20250107', 'changed_at': t0}
+        self._refresh(_ChangeLogSession(t0 + datetime.timedelta(minutes=5)))
+        version = self._refresh(_ChangeLogSession(t0 + datetime.timedelta(minutes=10), [change]))
+        self.cache.put('recent', 'recent', 1, DAILY_TABLE, '20250101', None, version=version)
+        session = _ChangeLogSession(t0 + datetime.timedelta(minutes=10, seconds=1), [change])
+        self._refresh(session)
+        # 从上次读取时间往前回看，仍会读到该变更
+        self.assertLessEqual(session.since, t0 + datetime.timedelta(minutes=10))
+        self.assertEqual(self.cache.get('recent'), 'recent')
+
+    def test_read_failure_disables_cache(self):
+        """读取变更日志失败时返回 None"""
+        session = mock.Mock()
+        session.execute = mock.AsyncMock(side_effect=RuntimeError('down'))
+        self.assertIsNone(self._refresh(session))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from fin_data_hub.data.tushare import tushare_resample
+from fin_data_hub.data.tushare.tushare_resample import resample_bars, verify_resampled
+
+
+def _daily(rows):
+    return pd.DataFrame(rows, columns=['ts_code', 'trade_date', 'open', 'high', 'low', 'close', 'pre_close', 'vol', 'amount'])
+
+
+DAILY = _daily([
+    # 第一周：周五（20240105）为周期末
+    ('000001.SZ', 20240102, 10.0, 10.5, 9.8, 10.2, 9.9, 100.0, 1000.0),
+    ('000001.SZ', 20240103, 10.2, 10.8, 10.1, 10.6, 10.2, 200.0, 2100.0),
+    ('000001.SZ', 20240105, 10.6, 10.7, 10.0, 10.1, 10.6, 150.0, 1500.0),
+    ('600000.SH', 20240104, 7.0, 7.2, 6.9, 7.1, 7.0, 50.0, 350.0),
+    # 第二周：000001.SZ 停牌
+    ('600000.SH', 20240108, 7.1, 7.5, 7.1, 7.4, 7.1, 60.0, 440.0),
+    # 尚未结束的周期
+    ('600000.SH', 20240115, 7.4, 7.6, 7.3, 7.5, 7.4, 70.0, 520.0),
+])
+
+
+class TestResampleBars(unittest.TestCase):
+    """周期 K 线聚合测试"""
+
+    def test_weekly_bars(self):
+        """按周期末聚合 OHLCV，停牌股票没有该周期数据，未结束的周期不生成"""
+        bars = resample_bars(DAILY.sample(frac=1, random_state=1), [20240105, 20240112])
+        self.assertEqual(list(zip(bars['trade_date'], bars['ts_code'])), [
+            (20240105, '000001.SZ'), (20240105, '600000.SH'), (20240112, '600000.SH'),
+        ])
+        first = bars.iloc[0]
+        self.assertEqual(first['open'], 10.0)
+        self.assertEqual(first['high'], 10.8)
+        self.assertEqual(first['low'], 9.8)
+        self.assertEqual(first['close'], 10.1)
+        self.assertEqual(first['pre_close'], 9.9)
+        self.assertEqual(first['vol'], 450.0)
+        self.assertEqual(first['amount'], 4600.0)
+        self.assertAlmostEqual(first['change'], 0.2)
+        self.assertAlmostEqual(first['pct_chg'], 2.0202)
+
+    def test_empty(self):
+        """没有日线时返回空结果"""
+        self.assertTrue(resample_bars(DAILY.iloc[:0], [20240105]).empty)
+
+
+class TestVerifyResampled(unittest.TestCase):
+    """重采样结果校验测试"""
+
+    def setUp(self):
+        mock.patch.object(tushare_resample, 'completed_period_ends', return_value=['20231229', '20240105']).start()
+        mock.patch.object(tushare_resample, 'load_daily', return_value=DAILY[DAILY['trade_date'] <= 20240105]).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_reports_mismatches(self):
+        """逐列比较，报告不一致的列和只在一侧存在的股票"""
+        local = resample_bars(DAILY, ['20240105'])
+        api = local.assign(trade_date='20240105')
+        api.loc[api['ts_code'] == '600000.SH', 'close'] = 7.3
+        api = pd.concat([api, api.iloc[[0]].assign(ts_code='000002.SZ')], ignore_index=True)
+        client = mock.MagicMock()
+        client.weekly.return_value = api
+
+        result = verify_resampled('W', '20240105', client)
+        self.assertEqual(dict(zip(result['ts_code'], result['mismatch'])), {
+            '600000.SH': 'close',
+            '000002.SZ': 'missing_local',
+        })
+        client.weekly.assert_called_once_with(trade_date='20240105')
+
+    def test_rejects_non_period_end(self):
+        """不是周期末的日期报错"""
+        with self.assertRaises(ValueError):
+            verify_resampled('W', '20240104', mock.MagicMock())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from fin_data_hub.data.tushare import tushare_response_cache
+from fin_data_hub.data.tushare.tushare_response_cache import (
+    CachedClient,
+    ResponseCache,
+    cache_key,
+    is_cacheable,
+    normalize_params,
+)
+
+
+class TestCacheRules(unittest.TestCase):
+    """缓存键和可缓存规则测试"""
+
+    def test_key_ignores_order_and_empty_params(self):
+        """参数顺序、空值和 fields 中的空白不影响缓存键"""
+        a = normalize_params({'ts_code': '000001.SZ', 'start_date': '20200101', 'end_date': '20201231', 'adj': None})
+        b = normalize_params({'end_date': '20201231', 'start_date': 20200101, 'ts_code': '000001.SZ', 'fields': ''})
+        self.assertEqual(cache_key('daily', a), cache_key('daily', b))
+        self.assertNotEqual(cache_key('daily', a), cache_key('weekly', a))
+        self.assertEqual(normalize_params({'fields': 'ts_code, trade_date'}), {'fields': 'ts_code,trade_date'})
+
+    def test_cacheable_windows(self):
+        """只缓存早于最近交易日的已结束区间"""
+        cutoff = '20250101'
+        self.assertTrue(is_cacheable('daily', {'trade_date': '20240102'}, cutoff))
+        self.assertTrue(is_cacheable('daily', {'start_date': '20200101', 'end_date': '20241231'}, cutoff))
+        self.assertFalse(is_cacheable('daily', {'trade_date': '20250102'}, cutoff))
+        # 只有开始日期或没有日期参数
+        self.assertFalse(is_cacheable('daily', {'ts_code': '000001.SZ', 'start_date': '20200101'}, cutoff))
+        self.assertFalse(is_cacheable('stock_basic', {'list_status': 'L'}, cutoff))
+
+    def test_statement_lag(self):
+        """财务报表在报告期结束后一段时间内不缓存"""
+        self.assertFalse(is_cacheable('income_vip', {'period': '20240630'}, '20250101'))
+        self.assertTrue(is_cacheable('income_vip', {'period': '20220630'}, '20250101'))
+
+
+class TestCachedClient(unittest.TestCase):
+    """带缓存的客户端测试"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = ResponseCache(self.tmp.name, max_bytes=1024 * 1024)
+        patcher = mock.patch.object(tushare_response_cache, 'recent_cutoff', return_value='20250101')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.raw = mock.MagicMock()
+        self.raw.daily.side_effect = lambda **kwargs: pd.DataFrame(
+            {'ts_code': ['000001.SZ'], 'trade_date': [kwargs['trade_date']], 'close': [10.5]}
+        )
+
+    def test_hit_skips_api(self):
+        """历史区间第二次请求从缓存读取"""
+        client = CachedClient(self.raw, self.cache)
+        first = client.daily(trade_date='20240102')
+        second = client.daily(trade_date='20240102')
+        self.assertEqual(self.raw.daily.call_count, 1)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_recent_window_not_cached(self):
+        """涉及最近交易日的请求每次都调用接口"""
+        client = CachedClient(self.raw, self.cache)
+        client.daily(trade_date='20250102')
+        client.daily(trade_date='20250102')
+        self.assertEqual(self.raw.daily.call_count, 2)
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_eviction(self):
+        """超过上限时淘汰最久未使用的响应"""
+        cache = self.cache
+        df = pd.DataFrame({'close': [1.0]})
+        cache.put('daily', 'aa01', df)
+        old_path = cache._path('daily', 'aa01')
+        os.utime(old_path, (0, 0))
+        cache.max_bytes = old_path.stat().st_size * 2
+        cache.put('daily', 'bb02', df)
+        cache.put('daily', 'cc03', df)
+        self.assertIsNone(cache.get('daily', 'aa01'))
+        self.assertIsNotNone(cache.get('daily', 'cc03'))
+        self.assertLessEqual(cache.size(), cache.max_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from fin_data_hub.data.tushare import tushare_schema
+from fin_data_hub.data.tushare.constants import DAILY_TABLE, INCOME_TABLE
+from fin_data_hub.data.tushare.tushare_schema import (
+    SCHEMAS,
+    compact_frame,
+    ensure_schema,
+    ensure_schemas,
+    normalize_date_columns,
+)
+
+
+class TestTableSchema(unittest.TestCase):
+    """数据表结构声明测试"""
+
+    def test_daily_table_ddl(self):
+        """日线表：紧凑类型、复合主键、按年分区"""
+        sql = SCHEMAS[DAILY_TABLE].create_sql()
+        self.assertIn("`ts_code` CHAR(9) NOT NULL", sql)
+        self.assertIn("`trade_date` INT UNSIGNED NOT NULL DEFAULT 0", sql)
+        self.assertIn("PRIMARY KEY (`ts_code`, `trade_date`)", sql)
+        self.assertIn("KEY idx_trade_date (`trade_date`)", sql)
+        self.assertIn("PARTITION BY RANGE (trade_date)", sql)
+        self.assertIn("PARTITION p2000 VALUES LESS THAN (20010101)", sql)
+        self.assertIn("PARTITION pmax VALUES LESS THAN MAXVALUE", sql)
+
+    def test_statement_table_key(self):
+        """财务报表以 (ts_code, end_date, report_type, f_ann_date) 为主键"""
+        schema = SCHEMAS[INCOME_TABLE]
+        self.assertEqual(schema.primary_key, ('ts_code', 'end_date', 'report_type', 'f_ann_date'))
+        self.assertIn('n_income_attr_p', schema.column_names)
+        self.assertNotIn('PARTITION', schema.create_sql())
+
+    def test_normalize_date_columns(self):
+        """INT 日期转回字符串，0 和空值视为缺失"""
+        df = normalize_date_columns(pd.DataFrame({
+            'ts_code': ['000001.SZ', '000002.SZ', '600000.SH'],
+            'list_date': [19910403, 0, None],
+        }))
+        self.assertEqual(df['list_date'].iloc[0], '19910403')
+        self.assertTrue(df['list_date'].iloc[1:].isna().all())
+
+
+
+class TestEnsureSchemas(unittest.TestCase):
+    """创建和迁移数据表测试（数据库已替换）"""
+
+    def setUp(self):
+        self.engine = mock.patch.object(tushare_schema, 'mysql_engine').start()
+        mock.patch.object(tushare_schema, 'table_exists', return_value=True).start()
+        mock.patch.object(tushare_schema, '_has_primary_key', return_value=False).start()
+        self.migrate = mock.patch.object(tushare_schema, '_migrate_legacy_table').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_legacy_table_not_migrated_without_flag(self):
+        """API 启动时不迁移无主键的旧表，补全脚本中迁移"""
+        ensure_schema(SCHEMAS[DAILY_TABLE], migrate=False)
+        self.migrate.assert_not_called()
+        ensure_schema(SCHEMAS[DAILY_TABLE])
+        self.migrate.assert_called_once_with(SCHEMAS[DAILY_TABLE])
+
+    def test_skips_when_lock_not_acquired(self):
+        """其他进程持有表结构锁时，等待超时后跳过"""
+        lock_conn = self.engine.return_value.connect.return_value.__enter__.return_value
+        lock_conn.execute.return_value.scalar.return_value = 0
+        with mock.patch.object(tushare_schema, 'ensure_schema') as ensure:
+            ensure_schemas(lock_timeout=0)
+        ensure.assert_not_called()
+
+    def test_releases_lock(self):
+        """持有锁期间检查所有表，完成后释放锁"""
+        lock_conn = self.engine.return_value.connect.return_value.__enter__.return_value
+        lock_conn.execute.return_value.scalar.return_value = 1
+        with mock.patch.object(tushare_schema, 'ensure_schema') as ensure:
+            ensure_schemas(migrate=False)
+        self.assertEqual(ensure.call_count, len(SCHEMAS))
+        self.assertTrue(all(call.args[1] is False for call in ensure.call_args_list))
+        self.assertIn('RELEASE_LOCK', str(lock_conn.execute.call_args.args[0]))
+
+
+class TestCompactFrame(unittest.TestCase):
+    """拉取数据的紧凑类型转换"""
+
+    def test_compact_dtypes(self):
+        """代码列转 category，日期列转 int32，能精确还原的价格列转 float32"""
+        df = pd.DataFrame({
+            'ts_code': ['000001.SZ', '600000.SH'],
+            'trade_date': ['20240102', '20240103'],
+            'close': [10.5, 11.25],
+            'open': [12.34, 1234.5678],
+            'vol': [123456.78, 1.5],
+        })
+        compact = compact_frame(df, DAILY_TABLE)
+        self.assertIsInstance(compact['ts_code'].dtype, pd.CategoricalDtype)
+        self.assertEqual(compact['trade_date'].dtype, 'int32')
+        self.assertEqual(compact['close'].dtype, 'float32')
+        # float32 无法按 4 位小数还原的列保持 float64
+        self.assertEqual(compact['open'].dtype, 'float64')
+        self.assertEqual(compact['vol'].dtype, 'float64')
+        self.assertEqual(compact['trade_date'].tolist(), [20240102, 20240103])
+
+    def test_nullable_dates(self):
+        """日期列存在空值时使用可空整数"""
+        df = pd.DataFrame({'ts_code': ['000001.SZ', '600000.SH'], 'list_date': ['19910403', None]})
+        compact = compact_frame(df, 'unknown_table')
+        self.assertEqual(str(compact['list_date'].dtype), 'Int32')
+        self.assertTrue(pd.isna(compact['list_date'].iloc[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
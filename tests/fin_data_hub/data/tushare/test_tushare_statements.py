@@ -0,0 +1,96 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from fin_data_hub.data.tushare import tushare_statements
+from fin_data_hub.data.tushare.constants import INCOME_TABLE
+from fin_data_hub.data.tushare.tushare_backfill_progress import CROSS_SECTION_UNIT, Checkpoint
+from fin_data_hub.data.tushare.tushare_statements import dedupe_restatements, fetch_period, open_periods, sync_periods
+
+
+def _income(rows):
+    return pd.DataFrame(rows, columns=['ts_code', 'ann_date', 'f_ann_date', 'end_date', 'report_type', 'update_flag', 'revenue'])
+
+
+class _PagedClient:
+    """按 limit / offset 分页返回固定数据的客户端"""
+
+    def __init__(self, data: dict[str, pd.DataFrame]):
+        self.data = data
+        self.calls = []
+
+    def income_vip(self, period, limit, offset):
+        self.calls.append((period, limit, offset))
+        df = self.data.get(period, _income([]))
+        return df.iloc[offset:offset + limit].reset_index(drop=True)
+
+
+class TestOpenPeriods(unittest.TestCase):
+    """可能仍有更正的报告期测试"""
+
+    def test_open_periods(self):
+        """只包含报告期结束后不超过 statement_restatement_days 天的报告期"""
+        with mock.patch.object(tushare_statements.config, 'statement_restatement_days', 400):
+            self.assertEqual(open_periods('20250515'), ['20240630', '20240930', '20241231', '20250331'])
+        with mock.patch.object(tushare_statements.config, 'statement_restatement_days', 30):
+            self.assertEqual(open_periods('20250515'), [])
+
+
+class TestDedupeRestatements(unittest.TestCase):
+    """更正报告去重测试"""
+
+    def test_keeps_updated_report(self):
+        """同一主键同时有原始报告和更正后的报告时保留更正后的报告，不同实际公告日期的报告都保留"""
+        df = _income([
+            ('000001.SZ', '20240420', '20240420', '20240331', '1', '1', 110.0),
+            ('000001.SZ', '20240420', '20240420', '20240331', '1', '0', 100.0),
+            ('000001.SZ', '20240420', '20240830', '20240331', '1', '0', 120.0),
+            ('600000.SH', '20240425', '20240425', '20240331', '1', None, 50.0),
+        ])
+        result = dedupe_restatements(df, INCOME_TABLE)
+        self.assertEqual(list(result['revenue']), [110.0, 120.0, 50.0])
+
+
+class TestFetchPeriod(unittest.TestCase):
+    """按报告期分页拉取测试"""
+
+    def test_pages_until_short_page(self):
+        """返回满页时继续请求下一页，不足一页时停止"""
+        rows = [(f'{i:06d}.SZ', '20240420', '20240420', '20240331', '1', '0', float(i)) for i in range(5)]
+        client = _PagedClient({'20240331': _income(rows)})
+        with mock.patch.object(tushare_statements, 'PAGE_SIZE', 2):
+            df = fetch_period(client, 'income', '20240331')
+        self.assertEqual(len(df), 5)
+        self.assertEqual(client.calls, [('20240331', 2, 0), ('20240331', 2, 2), ('20240331', 2, 4)])
+        self.assertEqual(df['end_date'].iloc[0], 20240331)
+
+    def test_empty_period(self):
+        """没有数据的报告期返回空 DataFrame"""
+        df = fetch_period(_PagedClient({}), 'income', '20240331')
+        self.assertTrue(df.empty)
+
+
+class TestSyncPeriods(unittest.TestCase):
+    """按报告期写入测试"""
+
+    def test_skips_completed_periods(self):
+        """补全任务中已完成的报告期不再请求，没有数据的报告期也记录进度"""
+        run = mock.Mock()
+        run.completed.return_value = {(CROSS_SECTION_UNIT, '20231231')}
+        run.checkpoint.side_effect = lambda unit, start: Checkpoint('run', unit, start, start)
+        client = _PagedClient({
+            '20240331': _income([('000001.SZ', '20240420', '20240420', '20240331', '1', '0', 1.0)]),
+        })
+        with mock.patch.object(tushare_statements, 'save_data', side_effect=lambda df, *a, **k: len(df)) as save:
+            rows = sync_periods('income', ['20231231', '20240331', '20240630'], run, client)
+        self.assertEqual(rows, 1)
+        self.assertEqual([call[0] for call in client.calls], ['20240331', '20240630'])
+        self.assertEqual(
+            [call.kwargs['checkpoint'].window_start for call in save.call_args_list], ['20240331', '20240630']
+        )
+        self.assertTrue(all(call.kwargs['date_column'] == 'end_date' for call in save.call_args_list))
+
+
+if __name__ == '__main__':
+    unittest.main()
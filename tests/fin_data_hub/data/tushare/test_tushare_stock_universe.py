@@ -0,0 +1,69 @@
+import unittest
+
+import pandas as pd
+
+from fin_data_hub.data.tushare.tushare_stock_universe import PrefixTrie, StockUniverse
+
+
+def _build_universe() -> StockUniverse:
+    return StockUniverse(pd.DataFrame({
+        'ts_code': ['600000.SH', '000001.SZ', '600001.SH', '600036.SH'],
+        'symbol': ['600000', '000001', '600001', '600036'],
+        'name': ['浦发银行', '平安银行', '邯郸钢铁', '招商银行'],
+        'area': ['上海', '深圳', '河北', '深圳'],
+        'industry': ['银行', '银行', '普钢', '银行'],
+        'cnspell': ['pfyh', 'payh', 'hdgt', 'zsyh'],
+        'market': ['主板'] * 4,
+        'list_date': ['19991110', '19910403', '19980122', '20020409'],
+        'status': ['L', 'L', 'D', 'L'],
+        'act_name': ['忽略的列'] * 4,
+    }))
+
+
+class TestStockUniverse(unittest.TestCase):
+    """股票池索引测试"""
+
+    def setUp(self):
+        self.universe = _build_universe()
+
+    def test_lookup(self):
+        self.assertEqual(self.universe.get('600036.SH')['name'], '招商银行')
+        self.assertIsNone(self.universe.get('688000.SH'))
+        self.assertEqual(self.universe.resolve('000001'), '000001.SZ')
+        self.assertEqual(self.universe.resolve('600000.SH'), '600000.SH')
+        self.assertIsNone(self.universe.resolve('999999'))
+
+    def test_categorical_columns(self):
+        self.assertEqual(str(self.universe.frame['industry'].dtype), 'category')
+        self.assertNotIn('act_name', self.universe.frame.columns)
+        self.assertIn('cnspell', self.universe.frame.columns)
+
+    def test_filter(self):
+        df = self.universe.filter(industry='银行', area=['深圳', '河北'])
+        self.assertEqual(df['ts_code'].tolist(), ['000001.SZ', '600036.SH'])
+        self.assertTrue(self.universe.filter(industry='证券').empty)
+        self.assertEqual(len(self.universe.filter(status=None)), 4)
+
+    def test_search(self):
+        """拼音、名称和代码前缀均可搜索，上市股票在前"""
+        self.assertEqual([r['ts_code'] for r in self.universe.search('P')], ['000001.SZ', '600000.SH'])
+        self.assertEqual([r['ts_code'] for r in self.universe.search('招商')], ['600036.SH'])
+        self.assertEqual([r['ts_code'] for r in self.universe.search('6000', limit=5)], ['600000.SH', '600036.SH', '600001.SH'])
+        self.assertEqual([r['ts_code'] for r in self.universe.search('6000', status='D')], ['600001.SH'])
+        self.assertEqual(self.universe.search('600036.sh')[0]['industry'], '银行')
+        self.assertEqual(self.universe.search('xyz'), [])
+
+
+class TestPrefixTrie(unittest.TestCase):
+
+    def test_positions_unique(self):
+        trie = PrefixTrie()
+        trie.insert('st', 0)
+        trie.insert('st金', 0)
+        trie.insert('sz', 1)
+        self.assertEqual(trie.search('s'), [0, 1])
+        self.assertEqual(trie.search('st'), [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
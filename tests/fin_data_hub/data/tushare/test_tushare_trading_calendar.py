@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fin_data_hub.data.tushare.tushare_trading_calendar import TradingCalendar
+
+
+def _build_calendar() -> TradingCalendar:
+    """2024-12-25 ~ 2025-02-10，周末和元旦休市"""
+    days = pd.date_range('2024-12-25', '2025-02-10')
+    return TradingCalendar(
+        [d.strftime('%Y%m%d') for d in days],
+        [int(d.weekday() < 5 and d.strftime('%m%d') != '0101') for d in days],
+    )
+
+
+class TestTradingCalendar(unittest.TestCase):
+    """交易日历索引测试"""
+
+    def setUp(self):
+        self.calendar = _build_calendar()
+
+    def test_is_open(self):
+        self.assertFalse(self.calendar.is_open('20250101'))
+        self.assertTrue(self.calendar.is_open('20250102'))
+        self.assertFalse(self.calendar.is_open('20300101'))
+        np.testing.assert_array_equal(
+            self.calendar.is_open([20250104, 20250106, 19900101]), [False, True, False]
+        )
+
+    def test_next_and_prev_open(self):
+        self.assertEqual(self.calendar.next_open('20250103'), '20250106')
+        self.assertEqual(self.calendar.next_open('20241231'), '20250102')
+        self.assertEqual(self.calendar.prev_open('20250106'), '20250103')
+        self.assertEqual(self.calendar.prev_open('20250102'), '20241231')
+        self.assertIsNone(self.calendar.prev_open('20241225'))
+        self.assertIsNone(self.calendar.next_open('20250210'))
+        np.testing.assert_array_equal(
+            self.calendar.next_open(['20250103', '20250104', '20300101']), [20250106, 20250106, 0]
+        )
+
+    def test_trading_days(self):
+        self.assertEqual(
+            self.calendar.trading_days('20250104', '20250110'),
+            ['20250106', '20250107', '20250108', '20250109', '20250110'],
+        )
+        self.assertEqual(self.calendar.trading_days('20250111', '20250112'), [])
+        self.assertEqual(self.calendar.count_trading_days('20241230', '20250103'), 4)
+        np.testing.assert_array_equal(
+            self.calendar.count_trading_days(['20250101', '20250106'], ['20250110', '20250105']), [7, 0]
+        )
+
+    def test_period_ends(self):
+        """周期最后一个交易日，未结束的周期不计入"""
+        self.assertEqual(
+            self.calendar.period_ends('20241225', '20250115', 'W'),
+            ['20241227', '20250103', '20250110'],
+        )
+        self.assertEqual(self.calendar.period_ends('20241225', '20250205', 'M'), ['20241231', '20250131'])
+
+
+if __name__ == '__main__':
+    unittest.main()
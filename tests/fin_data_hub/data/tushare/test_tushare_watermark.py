@@ -0,0 +1,60 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from fin_data_hub.data.tushare import tushare_watermark
+from fin_data_hub.data.tushare.tushare_schema import compact_frame
+from fin_data_hub.data.tushare.tushare_watermark import DATASET_WATERMARK_KEY, update_watermarks
+
+
+class TestUpdateWatermarks(unittest.TestCase):
+    """水位推进测试"""
+
+    def setUp(self):
+        patcher = mock.patch.object(tushare_watermark, 'ensure_watermark_table')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.conn = mock.MagicMock()
+
+    def _rows(self) -> dict[str, str]:
+        rows = self.conn.execute.call_args.args[1]
+        self.assertTrue(all(row['dataset'] == 'tushare_daily' for row in rows))
+        return {row['ts_code']: row['last_date'] for row in rows}
+
+    def test_per_ts_code_and_dataset_watermark(self):
+        """按股票取最大日期，并推进数据集整体水位"""
+        df = pd.DataFrame({
+            'ts_code': ['000001.SZ', '000001.SZ', '600000.SH'],
+            'trade_date': ['20250102', '20250103', '20250102'],
+        })
+        update_watermarks(self.conn, 'tushare_daily', df)
+        self.assertEqual(self._rows(), {
+            '000001.SZ': '20250103',
+            '600000.SH': '20250102',
+            DATASET_WATERMARK_KEY: '20250103',
+        })
+
+    def test_compacted_frame(self):
+        """ts_code 为 category 时，未出现的类别和空代码不会写入水位"""
+        df = compact_frame(pd.DataFrame({
+            'ts_code': ['000001.SZ', '600000.SH', None],
+            'trade_date': ['20250102', '20250103', '20250106'],
+        }), 'tushare_daily')
+        df['ts_code'] = df['ts_code'].cat.add_categories(['300001.SZ'])
+        update_watermarks(self.conn, 'tushare_daily', df)
+        self.assertEqual(self._rows(), {
+            '000001.SZ': '20250102',
+            '600000.SH': '20250103',
+            DATASET_WATERMARK_KEY: '20250106',
+        })
+
+    def test_without_date_column(self):
+        """全量替换的维表以当天日期作为数据集水位"""
+        with mock.patch.object(tushare_watermark, 'current_date_ymd', return_value='20250107'):
+            update_watermarks(self.conn, 'tushare_daily', pd.DataFrame({'ts_code': ['000001.SZ']}), None)
+        self.assertEqual(self._rows(), {DATASET_WATERMARK_KEY: '20250107'})
+
+
+if __name__ == '__main__':
+    unittest.main()
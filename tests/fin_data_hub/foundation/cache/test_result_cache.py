@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import patch
+
+from fin_data_hub.foundation.cache import ResultCache, publish_invalidation, subscribe_invalidation
+from fin_data_hub.foundation.cache.invalidation import unsubscribe_invalidation
+
+
+class TestResultCache(unittest.TestCase):
+    """查询结果缓存测试"""
+
+    def test_lru_eviction_by_bytes(self):
+        """超出内存预算时淘汰最久未使用的条目"""
+        cache = ResultCache(max_bytes=10)
+        cache.put('a', 'A', 4)
+        cache.put('b', 'B', 4)
+        self.assertEqual(cache.get('a'), 'A')
+        cache.put('c', 'C', 4)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'A')
+        self.assertEqual(cache.stats()['bytes'], 8)
+
+    def test_oversized_value_not_cached(self):
+        cache = ResultCache(max_bytes=10)
+        cache.put('a', 'A', 11)
+        self.assertIsNone(cache.get('a'))
+
+    def test_ttl_and_persistent(self):
+        """默认 TTL 到期后移除，持久条目不过期"""
+        cache = ResultCache(max_bytes=100, default_ttl=60)
+        with patch('fin_data_hub.foundation.cache.result_cache.time.monotonic', return_value=1000.0):
+            cache.put('recent', 1, 1)
+            cache.put('history', 2, 1, persistent=True)
+        with patch('fin_data_hub.foundation.cache.result_cache.time.monotonic', return_value=1061.0):
+            self.assertIsNone(cache.get('recent'))
+            self.assertEqual(cache.get('history'), 2)
+
+    def test_invalidate_by_date_range(self):
+        """只移除日期范围覆盖了变化日期的条目"""
+        cache = ResultCache(max_bytes=100)
+        cache.put('history', 1, 1, 'tushare_daily', '20200101', '20201231')
+        cache.put('open_ended', 2, 1, 'tushare_daily', '20240101', None)
+        cache.put('other', 3, 1, 'tushare_daily_basic', None, None)
+        self.assertEqual(cache.invalidate('tushare_daily', ['20240105']), 1)
+        self.assertIsNone(cache.get('open_ended'))
+        self.assertEqual(cache.get('history'), 1)
+        self.assertEqual(cache.get('other'), 3)
+        self.assertEqual(cache.invalidate('tushare_daily'), 1)
+
+    def test_invalidate_range(self):
+        """只移除日期范围与变化范围重叠、且版本不晚于给定值的条目"""
+        cache = ResultCache(max_bytes=100)
+        cache.put('2020', 1, 1, 'tushare_daily', '20200101', '20201231', persistent=True, version=10)
+        cache.put('open_ended', 2, 1, 'tushare_daily', '20240101', None, version=10)
+        cache.put('newer', 3, 1, 'tushare_daily', '20240101', '20250131', version=30)
+        self.assertEqual(cache.invalidate_range('tushare_daily', '20250107', '20250107', before=20), 1)
+        self.assertEqual(cache.get('2020'), 1)
+        self.assertIsNone(cache.get('open_ended'))
+        self.assertEqual(cache.get('newer'), 3)
+        # 整个数据集变化时移除所有版本不晚于给定值的条目
+        self.assertEqual(cache.invalidate_range('tushare_daily', None, None, before=20), 1)
+        self.assertEqual(cache.get('newer'), 3)
+
+    def test_publish_invalidation(self):
+        """订阅方收到去重排序后的日期，异常不向外抛出"""
+        events = []
+
+        def failing(dataset, dates):
+            raise RuntimeError('boom')
+
+        def listener(dataset, dates):
+            events.append((dataset, dates))
+
+        subscribe_invalidation(failing)
+        subscribe_invalidation(listener)
+        try:
+            publish_invalidation('tushare_daily', ['20240103', '20240102', '20240103'])
+            publish_invalidation('tushare_stock_basic')
+        finally:
+            unsubscribe_invalidation(failing)
+            unsubscribe_invalidation(listener)
+        self.assertEqual(events, [('tushare_daily', ['20240102', '20240103']), ('tushare_stock_basic', None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
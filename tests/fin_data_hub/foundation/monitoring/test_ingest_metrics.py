@@ -0,0 +1,64 @@
+import threading
+import unittest
+from unittest import mock
+
+from fin_data_hub.foundation.monitoring import ingest_metrics
+from fin_data_hub.foundation.monitoring.ingest_metrics import current_job, job_context, record_api_call
+from fin_data_hub.foundation.pipeline import run_pipeline
+
+
+class TestJobContext(unittest.TestCase):
+    """任务上下文"""
+
+    def test_pipeline_threads_inherit_job(self):
+        """流水线的拉取和写入线程继承调用方的任务名"""
+        seen = set()
+        lock = threading.Lock()
+
+        def fetch(x):
+            with lock:
+                seen.add(('fetch', current_job()))
+            return x
+
+        def write(task, result):
+            with lock:
+                seen.add(('write', current_job()))
+
+        with job_context('sync_daily_data'):
+            run_pipeline(range(5), fetch, write, fetch_workers=2, write_workers=1)
+        self.assertEqual(seen, {('fetch', 'sync_daily_data'), ('write', 'sync_daily_data')})
+        self.assertEqual(current_job(), ingest_metrics.UNKNOWN_JOB)
+
+
+class TestRecordApiCall(unittest.TestCase):
+    """接口调用指标"""
+
+    def setUp(self):
+        self.errors = mock.patch.object(ingest_metrics, 'api_errors').start()
+        self.rows = mock.patch.object(ingest_metrics, 'api_rows').start()
+        self.duration = mock.patch.object(ingest_metrics, 'api_call_duration').start()
+        mock.patch.object(ingest_metrics, 'api_throttle_wait').start()
+        mock.patch.object(ingest_metrics, 'api_payload_bytes').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_success(self):
+        """成功的调用记录耗时和行数"""
+        with job_context('sync_daily_data'):
+            record_api_call('daily', 0.2, 0.05, rows=5000, payload_bytes=1024)
+        self.duration.record.assert_called_once_with(
+            200.0, attributes={'endpoint': 'daily', 'job_name': 'sync_daily_data', 'success': 'True'}
+        )
+        self.rows.record.assert_called_once_with(5000, attributes={'endpoint': 'daily', 'job_name': 'sync_daily_data'})
+        self.errors.add.assert_not_called()
+
+    def test_error(self):
+        """失败的调用按错误类型计数，不记录行数"""
+        record_api_call('daily', 0.1, 0.0, error='rate_limit')
+        self.errors.add.assert_called_once_with(
+            1, attributes={'endpoint': 'daily', 'job_name': 'unknown', 'kind': 'rate_limit'}
+        )
+        self.rows.record.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from fin_data_hub.foundation.mysql import bulk_writer
+from fin_data_hub.foundation.mysql.bulk_writer import bulk_upsert
+
+
+class TestBulkUpsert(unittest.TestCase):
+    """批量写入测试"""
+
+    def setUp(self):
+        mock.patch.object(bulk_writer, 'ensure_table').start()
+        mock.patch.object(
+            bulk_writer, 'get_table_columns',
+            return_value={'ts_code': 'char', 'trade_date': 'int', 'close': 'decimal', 'change': 'decimal'},
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+        self.conn = mock.MagicMock()
+        self.cursor = self.conn.connection.cursor.return_value
+        self.df = pd.DataFrame({
+            'ts_code': ['000001.SZ', '000002.SZ', '600000.SH'],
+            'trade_date': ['20250102', '20250102', '20250102'],
+            'close': [11.2, np.nan, 9.8],
+            'change': [0.1, 0.2, 0.3],
+            'new_field': [1, 2, 3],
+        })
+
+    def test_insert_on_duplicate_key_update_in_chunks(self):
+        """按批执行 upsert，键列之外的列被更新，未知列被忽略，NaN 写为 NULL"""
+        rows = bulk_upsert(self.df, 'tushare_daily', ('ts_code', 'trade_date'),
+                           conn=self.conn, chunk_size=2, method='insert')
+        self.assertEqual(rows, 3)
+        self.assertEqual(self.cursor.executemany.call_count, 2)
+
+        sql, params = self.cursor.executemany.call_args_list[0].args
+        self.assertIn("INSERT INTO tushare_daily (`ts_code`, `trade_date`, `close`, `change`)", sql)
+        self.assertIn("ON DUPLICATE KEY UPDATE `close` = VALUES(`close`), `change` = VALUES(`change`)", sql)
+        self.assertNotIn('new_field', sql)
+        self.assertEqual(params[1], ('000002.SZ', '20250102', None, 0.2))
+
+    def test_load_data(self):
+        """load_data 方式通过临时文件 REPLACE 导入"""
+        bulk_upsert(self.df, 'tushare_daily', ('ts_code', 'trade_date'), conn=self.conn, method='load_data')
+        sql = self.conn.exec_driver_sql.call_args.args[0]
+        self.assertIn("LOAD DATA LOCAL INFILE", sql)
+        self.assertIn("REPLACE INTO TABLE tushare_daily", sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import asyncio
+import unittest
+
+from fin_data_hub.config import config
+from fin_data_hub.foundation.mysql import mysql_async_engine
+from fin_data_hub.foundation.mysql.mysql_async_engine import (
+    async_mysql_engine,
+    async_session_factory,
+    dispose_async_engine,
+    pool_status,
+)
+
+
+class TestAsyncEngine(unittest.TestCase):
+    """异步引擎测试（不连接数据库）"""
+
+    def tearDown(self):
+        asyncio.run(dispose_async_engine())
+
+    def test_engine_uses_own_pool(self):
+        engine = async_mysql_engine()
+        self.assertIs(engine, async_mysql_engine())
+        self.assertEqual(engine.url.drivername, 'mysql+aiomysql')
+        self.assertEqual(pool_status(engine.pool), {
+            'size': config.mysql_async_pool_size, 'checked_out': 0, 'checked_in': 0, 'overflow': 0,
+        })
+
+    def test_dispose_resets_engine_and_factory(self):
+        factory = async_session_factory()
+        asyncio.run(dispose_async_engine())
+        self.assertIsNone(mysql_async_engine._async_engine)
+        self.assertIsNot(async_session_factory(), factory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import random
+import threading
+import time
+import unittest
+
+from fin_data_hub.foundation.pipeline import run_pipeline
+
+
+class TestRunPipeline(unittest.TestCase):
+    """拉取/写入流水线测试"""
+
+    def test_all_tasks_written(self):
+        """所有有数据的任务都被写入，返回 None 的任务跳过"""
+        written = []
+        lock = threading.Lock()
+
+        def write(task, result):
+            with lock:
+                written.append(result)
+
+        count = run_pipeline(
+            range(20),
+            lambda x: None if x % 5 == 0 else x * 10,
+            write,
+            fetch_workers=4,
+            write_workers=2,
+            queue_size=3,
+        )
+        self.assertEqual(count, 16)
+        self.assertEqual(sorted(written), [x * 10 for x in range(20) if x % 5 != 0])
+
+    def test_ordered_write(self):
+        """ordered 模式下即使拉取乱序完成，也按任务顺序写入"""
+        written = []
+
+        def fetch(x):
+            time.sleep(random.random() / 100)
+            return x
+
+        run_pipeline(range(30), fetch, lambda task, result: written.append(result),
+                     fetch_workers=6, queue_size=2, ordered=True)
+        self.assertEqual(written, list(range(30)))
+
+    def test_fetch_overlaps_write(self):
+        """拉取与写入重叠执行"""
+        def fetch(x):
+            time.sleep(0.05)
+            return x
+
+        start = time.time()
+        run_pipeline(range(6), fetch, lambda task, result: time.sleep(0.05),
+                     fetch_workers=1, write_workers=1, queue_size=2)
+        # 串行执行需要 0.6 秒，流水线约 0.35 秒
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_error_is_raised(self):
+        """拉取异常时停止派发新任务并抛出异常"""
+        fetched = []
+
+        def fetch(x):
+            fetched.append(x)
+            if x == 3:
+                raise RuntimeError('boom')
+            return x
+
+        with self.assertRaises(RuntimeError):
+            run_pipeline(range(1000), fetch, lambda task, result: None,
+                         fetch_workers=1, queue_size=1, ordered=True)
+        self.assertLess(len(fetched), 10)
+
+    def test_no_fetch_after_stop(self):
+        """写入失败后，等待内存上限的拉取线程不再拉取新任务"""
+        fetched = []
+        lock = threading.Lock()
+
+        def fetch(x):
+            with lock:
+                fetched.append(x)
+            return bytearray(1000)
+
+        def write(task, result):
+            time.sleep(0.05)
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            run_pipeline(range(100), fetch, write, fetch_workers=3, write_workers=1,
+                         queue_size=10, max_buffer_bytes=500)
+        # 只有失败前已开始的拉取（每个拉取线程至多一个）
+        self.assertLessEqual(len(fetched), 3)
+
+    def test_memory_ceiling_applies_backpressure(self):
+        """待写入数据超过内存上限时暂停拉取，峰值不超过上限加一个在途结果"""
+        buffered = [0, 0]
+        lock = threading.Lock()
+
+        def fetch(x):
+            with lock:
+                buffered[0] += 1
+                buffered[1] = max(buffered[1], buffered[0])
+            return bytearray(1000)
+
+        def write(task, result):
+            time.sleep(0.005)
+            with lock:
+                buffered[0] -= 1
+
+        count = run_pipeline(range(40), fetch, write, fetch_workers=4, write_workers=1,
+                             queue_size=20, max_buffer_bytes=2500)
+        self.assertEqual(count, 40)
+        # 上限约 2 个结果，加上 4 个拉取线程各自在途的一个
+        self.assertLessEqual(buffered[1], 2 + 1 + 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
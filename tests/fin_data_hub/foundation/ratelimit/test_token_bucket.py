@@ -0,0 +1,50 @@
+import unittest
+from unittest import mock
+
+from fin_data_hub.foundation.ratelimit import token_bucket
+from fin_data_hub.foundation.ratelimit.token_bucket import TokenBucket
+
+
+class FakeClock:
+    """可控的单调时钟，sleep 直接推进时间"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    """令牌桶测试"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.multiple(token_bucket.time, monotonic=self.clock.monotonic, sleep=self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_calls_are_spaced_at_configured_rate(self):
+        """每分钟 120 次，即每 0.5 秒放行一次"""
+        bucket = TokenBucket(120)
+        waits = [bucket.acquire() for _ in range(5)]
+        self.assertEqual(waits, [0, 0.5, 0.5, 0.5, 0.5])
+
+    def test_weighted_acquire(self):
+        """权重为 3 的调用需要等待 3 个令牌"""
+        bucket = TokenBucket(60)
+        bucket.acquire()
+        self.assertAlmostEqual(bucket.acquire(3), 3.0)
+
+    def test_pause_blocks_and_drains_tokens(self):
+        """退避期间不放行，且已积累的令牌被清空"""
+        bucket = TokenBucket(60, burst=10)
+        bucket.pause(5)
+        self.assertAlmostEqual(bucket.acquire(), 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
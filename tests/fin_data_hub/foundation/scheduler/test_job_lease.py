@@ -0,0 +1,120 @@
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from fin_data_hub.foundation.scheduler import job_lease
+from fin_data_hub.foundation.scheduler.job_lease import LeaseLostError, check_lease, leased_job, scheduled_run_key
+
+
+class TestLeasedJob(unittest.TestCase):
+    """定时任务租约装饰器测试（租约存储已替换）"""
+
+    def setUp(self):
+        self.acquire = patch.object(job_lease, 'acquire_lease', return_value=True).start()
+        self.renew = patch.object(job_lease, 'renew_lease', return_value=True).start()
+        self.release = patch.object(job_lease, 'release_lease').start()
+        self.addCleanup(patch.stopall)
+
+    def test_runs_when_lease_acquired(self):
+        @leased_job(ttl_seconds=30, run_key=lambda: '202501021703')
+        def job():
+            return 'done'
+
+        self.assertEqual(job(), 'done')
+        self.acquire.assert_called_once_with('job', '202501021703', 30)
+        self.release.assert_called_once_with('job', '202501021703', finished=True)
+
+    def test_skips_when_other_process_holds_lease(self):
+        self.acquire.return_value = False
+        calls = []
+
+        @leased_job('sync_daily')
+        def job():
+            calls.append(1)
+
+        self.assertIsNone(job())
+        self.assertEqual(calls, [])
+        self.release.assert_not_called()
+
+    def test_failed_run_can_be_retried(self):
+        """执行失败时不标记完成，同一次运行的其他进程仍可接管"""
+        @leased_job(run_key=lambda: 'k')
+        def job():
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            job()
+        self.release.assert_called_once_with('job', 'k', finished=False)
+
+    def test_heartbeat_while_running(self):
+        """执行时间超过 1/3 有效期时心跳续约"""
+        @leased_job(ttl_seconds=0.06, run_key=lambda: 'k')
+        def job():
+            time.sleep(0.1)
+
+        job()
+        self.assertGreaterEqual(self.renew.call_count, 1)
+        self.renew.assert_called_with('job', 'k', 0.06)
+
+    def test_lease_store_unavailable(self):
+        """无法访问租约表时跳过执行，避免多个进程同时执行"""
+        self.acquire.side_effect = RuntimeError('db down')
+
+        @leased_job()
+        def job():
+            raise AssertionError('should not run')
+
+        self.assertIsNone(job())
+
+    def test_lost_lease_aborts_job(self):
+        """续约失败后 check_lease 中止任务，本次运行不标记为完成"""
+        self.renew.return_value = False
+
+        @leased_job(ttl_seconds=0.03, run_key=lambda: 'k')
+        def job():
+            time.sleep(0.05)
+            check_lease()
+
+        with self.assertRaises(LeaseLostError):
+            job()
+        self.release.assert_called_once_with('job', 'k', finished=False)
+        # 任务结束后不再处于租约任务中
+        check_lease()
+
+
+class TestScheduledRunKey(unittest.TestCase):
+    """运行键测试"""
+
+    def setUp(self):
+        self.tz = ZoneInfo('Asia/Shanghai')
+        self.scheduler = BackgroundScheduler(timezone=self.tz)
+        patcher = patch('fin_data_hub.foundation.scheduler.scheduler_manager.get_scheduler', return_value=self.scheduler)
+        patcher.start()
+        self.addCleanup(patch.stopall)
+
+        def job():
+            pass
+
+        self.job = job
+        self.scheduler.add_job(job, CronTrigger(hour=17, minute=3, timezone=self.tz), misfire_grace_time=30)
+
+    def test_key_is_scheduled_fire_time(self):
+        """各进程的当前时间不同（时钟偏差、延迟执行），运行键都是本次应触发的时间"""
+        for now in ('17:03:00', '17:03:59', '17:04:20'):
+            current = datetime.strptime(f'2025-01-02 {now}', '%Y-%m-%d %H:%M:%S').replace(tzinfo=self.tz)
+            self.assertEqual(scheduled_run_key(self.job, current), '202501021703')
+
+    def test_no_fire_time_in_window(self):
+        """宽限期之外或任务不在调度器中时返回 None"""
+        current = datetime(2025, 1, 2, 18, 0, tzinfo=self.tz)
+        self.assertIsNone(scheduled_run_key(self.job, current))
+        self.assertIsNone(scheduled_run_key(lambda: None, current))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import unittest
+from decimal import Decimal
+
+import pyarrow as pa
+
+from fin_data_hub.interfaces.streaming import (
+    ARROW_STREAM_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    arrow_stream,
+    ndjson_stream,
+    negotiate_stream_media_type,
+)
+
+
+def _collect(stream) -> list[bytes]:
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+async def _batches(batches):
+    for batch in batches:
+        yield batch
+
+
+class TestStreaming(unittest.TestCase):
+    """流式编码测试"""
+
+    def setUp(self):
+        self.fields = ['ts_code', 'trade_date', 'close']
+        self.batches = [
+            [('000001.SZ', 20240102, Decimal('9.3900')), ('000001.SZ', 20240103, None)],
+            [],
+            [('600000.SH', 20240102, Decimal('7.1200'))],
+        ]
+
+    def test_negotiate(self):
+        self.assertIsNone(negotiate_stream_media_type(None))
+        self.assertIsNone(negotiate_stream_media_type('application/json, */*'))
+        self.assertEqual(negotiate_stream_media_type('application/x-ndjson'), NDJSON_MEDIA_TYPE)
+        self.assertEqual(
+            negotiate_stream_media_type('application/x-ndjson;q=0.5, application/vnd.apache.arrow.stream'),
+            ARROW_STREAM_MEDIA_TYPE,
+        )
+
+    def test_ndjson_chunk_per_batch(self):
+        """每个非空批次输出一个分块，日期转为字符串"""
+        chunks = _collect(ndjson_stream(self.fields, _batches(self.batches), ['trade_date']))
+        self.assertEqual(len(chunks), 2)
+        rows = [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+        self.assertEqual(rows[0], {'ts_code': '000001.SZ', 'trade_date': '20240102', 'close': 9.39})
+        self.assertIsNone(rows[1]['close'])
+        self.assertEqual(len(rows), 3)
+
+    def test_arrow_stream_round_trip(self):
+        schema = pa.schema([('ts_code', pa.string()), ('trade_date', pa.int32()), ('close', pa.float64())])
+        data = b''.join(_collect(arrow_stream(schema, _batches(self.batches))))
+        table = pa.ipc.open_stream(data).read_all()
+        self.assertEqual(table.schema, schema)
+        self.assertEqual(table.column('close').to_pylist(), [9.39, None, 7.12])
+
+    def test_arrow_stream_empty(self):
+        """没有数据时仍然输出合法的空流"""
+        schema = pa.schema([('ts_code', pa.string())])
+        table = pa.ipc.open_stream(b''.join(_collect(arrow_stream(schema, _batches([]))))).read_all()
+        self.assertEqual(table.num_rows, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()